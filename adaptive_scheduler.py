@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Adaptive sequential evaluation (--adaptive)
+Used by evaluate_single_bot_aoai_robust.py and evaluate_single_bot_no_gt.py
+
+Instead of judging every response, the scheduler judges each bot's queries
+in a seeded random order and keeps a confidence interval of its mean overall
+score (including results saved by earlier runs). After a warm-up of
+--min-queries per bot, each judge call goes to the bot where one more score
+shrinks the overlap between its interval and its neighbours' in the ranking
+the most. A bot stops once its interval no longer overlaps its neighbours,
+is narrower than --precision, or it runs out of queries; the whole run stops
+at --budget judge calls.
+
+Calls are dispatched in rounds of --concurrency and results are recorded in
+dispatch order, so the same seed, saved results and judge scores (e.g. from
+the judge cache) always pick the same queries.
+"""
+
+import asyncio
+import math
+import random
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from rate_limiter import CircuitOpenError
+
+DEFAULT_MIN_QUERIES = 10
+DEFAULT_PRECISION = 0.1
+DEFAULT_CONFIDENCE = 0.95
+
+# Floor for the score spread, so a bot that got the same score on its first
+# few queries doesn't look certain
+MIN_STD = 0.25
+
+
+class AdaptiveScheduler:
+    """Picks which (bot, query) jobs to judge next, one round at a time"""
+
+    def __init__(self, jobs: List[Dict[str, Any]], observed: Dict[str, List[float]],
+                 confidence: float = DEFAULT_CONFIDENCE, min_queries: int = DEFAULT_MIN_QUERIES,
+                 precision: float = DEFAULT_PRECISION, budget: Optional[int] = None, seed: int = 0):
+        """
+        jobs: candidate jobs (dicts with 'bot_name' and 'query_index')
+        observed: overall scores each bot already has from saved results
+        """
+        rng = random.Random(seed)
+        query_indices = sorted({job['query_index'] for job in jobs})
+        rng.shuffle(query_indices)
+        query_rank = {query_index: rank for rank, query_index in enumerate(query_indices)}
+
+        bots = sorted({job['bot_name'] for job in jobs} | set(observed))
+        rng.shuffle(bots)
+        # Shuffled once so ties don't always favour the same bot
+        self.bot_order = bots
+        self.pending: Dict[str, List[Dict[str, Any]]] = {bot: [] for bot in bots}
+        for job in sorted(jobs, key=lambda job: query_rank[job['query_index']]):
+            self.pending[job['bot_name']].append(job)
+        self.scores: Dict[str, List[float]] = {bot: list(observed.get(bot, [])) for bot in bots}
+        self.population = {bot: len(self.scores[bot]) + len(self.pending[bot]) for bot in bots}
+        self.failed: Dict[str, int] = {bot: 0 for bot in bots}
+
+        self.z = statistics.NormalDist().inv_cdf(0.5 + confidence / 2)
+        self.confidence = confidence
+        self.min_queries = max(2, min_queries)
+        self.precision = precision
+        self.budget = budget
+        self.dispatched = 0
+        self.candidates = len(jobs)
+
+    def half_width(self, bot: str, n: Optional[int] = None) -> float:
+        """Half-width of the bot's interval with n scores (default: the ones it has)"""
+        scores = self.scores[bot]
+        n = len(scores) if n is None else n
+        if len(scores) < 2 or n < 1:
+            return math.inf
+        std = max(statistics.stdev(scores), MIN_STD)
+        # The target is the mean over this finite set of queries, so the
+        # interval closes once all of them are judged
+        population = self.population[bot]
+        fpc = math.sqrt(max(population - n, 0) / (population - 1)) if population > 1 else 0.0
+        return self.z * std / math.sqrt(n) * fpc
+
+    def interval(self, bot: str) -> Tuple[float, float, float]:
+        """(mean, lower, upper) of the bot's overall score so far"""
+        scores = self.scores[bot]
+        if not scores:
+            return 0.0, -math.inf, math.inf
+        mean = sum(scores) / len(scores)
+        half_width = self.half_width(bot)
+        return mean, mean - half_width, mean + half_width
+
+    def neighbours(self, bot: str) -> List[str]:
+        """The bots ranked directly above and below by current mean"""
+        ranking = sorted(self.bot_order, key=lambda b: self.interval(b)[0], reverse=True)
+        position = ranking.index(bot)
+        return ranking[max(0, position - 1):position] + ranking[position + 1:position + 2]
+
+    def overlap(self, bot: str) -> float:
+        """Total overlap (points) of the bot's interval with its neighbours'"""
+        _, lower, upper = self.interval(bot)
+        total = 0.0
+        for other in self.neighbours(bot):
+            _, other_lower, other_upper = self.interval(other)
+            total += max(0.0, min(upper, other_upper) - max(lower, other_lower))
+        return total
+
+    def status(self, bot: str) -> str:
+        """Why the bot needs more judge calls, or why it doesn't"""
+        if len(self.scores[bot]) < self.min_queries and self.pending[bot]:
+            return "warm-up"
+        if self.half_width(bot) <= self.precision:
+            return "precise"
+        if self.overlap(bot) == 0:
+            return "separated"
+        if not self.pending[bot]:
+            return "exhausted"
+        return "unresolved"
+
+    def priority(self, bot: str, in_flight: int) -> Tuple[int, float]:
+        """Warm-up bots first (fewest scores first), then by expected overlap reduction"""
+        n = len(self.scores[bot]) + in_flight
+        if len(self.scores[bot]) < self.min_queries:
+            return 1, -n
+        shrink = self.half_width(bot, n) - self.half_width(bot, n + 1)
+        return 0, self.overlap(bot) * shrink
+
+    def next_round(self, size: int) -> List[Dict[str, Any]]:
+        """Up to `size` jobs to judge next; empty when every bot is resolved or the budget is spent"""
+        in_flight = {bot: 0 for bot in self.bot_order}
+        unresolved = [bot for bot in self.bot_order if self.status(bot) in ("warm-up", "unresolved")]
+        round_jobs = []
+        while len(round_jobs) < size and (self.budget is None or self.dispatched < self.budget):
+            candidates = [bot for bot in unresolved if len(self.pending[bot]) > in_flight[bot]]
+            if not candidates:
+                break
+            bot = max(candidates, key=lambda b: self.priority(b, in_flight[b]))
+            round_jobs.append(self.pending[bot][in_flight[bot]])
+            in_flight[bot] += 1
+            self.dispatched += 1
+        for bot, count in in_flight.items():
+            del self.pending[bot][:count]
+        return round_jobs
+
+    def record(self, job: Dict[str, Any], evaluation: Dict[str, Any]):
+        """Add a finished evaluation; failures don't count towards the interval"""
+        score = evaluation.get('overall_score')
+        if 'error' in evaluation or not score:
+            self.failed[job['bot_name']] += 1
+        else:
+            self.scores[job['bot_name']].append(float(score))
+
+    def print_summary(self):
+        ranking = sorted(self.bot_order, key=lambda b: self.interval(b)[0], reverse=True)
+        print(f"\n   Adaptive evaluation ({self.confidence:.0%} intervals of overall score):")
+        for bot in ranking:
+            mean, lower, upper = self.interval(bot)
+            judged = len(self.scores[bot])
+            status = self.status(bot)
+            if status in ("warm-up", "unresolved") and self.budget is not None and self.dispatched >= self.budget:
+                status = "budget reached"
+            interval = f"{mean:5.2f} [{lower:5.2f}, {upper:5.2f}]" if judged >= 2 else f"{'-':>20s}"
+            print(f"   {bot:24s} {interval}  {judged:3d}/{self.population[bot]} queries  {status}")
+        saved = self.candidates - self.dispatched
+        if self.candidates:
+            print(f"   Judge calls: {self.dispatched} of {self.candidates} "
+                  f"({saved} skipped, {saved / self.candidates:.0%})")
+
+
+async def run_adaptive_queue(
+    scheduler: AdaptiveScheduler,
+    evaluate_job: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+    save_job: Callable[[Dict[str, Any], Dict[str, Any]], None],
+    concurrency: int,
+    status: Optional[Callable[[], str]] = None
+) -> Dict[str, int]:
+    """
+    Judge the jobs the scheduler picks, up to `concurrency` at a time, until
+    it has nothing left to pick. Same callbacks and return value as
+    evaluation_engine.run_evaluation_queue.
+    """
+    done = 0
+    evaluated_by_bot: Dict[str, int] = {}
+    start_time = time.monotonic()
+    endpoint_down = False
+
+    async def evaluate(job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        nonlocal endpoint_down
+        try:
+            return await evaluate_job(job)
+        except CircuitOpenError:
+            endpoint_down = True
+            return None
+        except Exception as e:
+            print(f"Error evaluating query {job['query_index']}: {e}")
+            return {"overall_score": 0.0, "dimension_scores": {}, "error": str(e)}
+
+    while not endpoint_down:
+        # One call first so the rubric prefix is in the provider's prompt cache
+        round_jobs = scheduler.next_round(concurrency if done else 1)
+        if not round_jobs:
+            break
+        evaluations = await asyncio.gather(*(evaluate(job) for job in round_jobs))
+
+        for job, evaluation in zip(round_jobs, evaluations):
+            if evaluation is None:
+                continue
+            save_job(job, evaluation)
+            scheduler.record(job, evaluation)
+
+            done += 1
+            bot_name = job['bot_name']
+            evaluated_by_bot[bot_name] = evaluated_by_bot.get(bot_name, 0) + 1
+            outcome = "error" if 'error' in evaluation else f"{evaluation.get('overall_score', 0)}"
+            state = f" [{status()}]" if status else ""
+            print(f"   [{done}]{state} {bot_name} query {job['query_index']} ({outcome}): "
+                  f"{job['user_query'][:50]}...")
+
+    if endpoint_down:
+        print("\n✗ Stopped early: judge endpoint is down; re-run the same command to continue.")
+
+    if done:
+        elapsed = time.monotonic() - start_time
+        print(f"\n   Finished {done} evaluations in {elapsed:.1f}s "
+              f"({done / elapsed if elapsed > 0 else 0:.2f}/s)")
+    scheduler.print_summary()
+
+    return evaluated_by_bot
+
+
+def add_adaptive_arguments(parser):
+    """Add --adaptive / --min-queries / --precision / --budget / --seed to an argparse parser"""
+    parser.add_argument('--adaptive', action='store_true',
+                        help='Judge only as many queries per bot as needed to separate it from its '
+                             'neighbours in the ranking')
+    parser.add_argument('--min-queries', type=int, default=DEFAULT_MIN_QUERIES,
+                        help=f'With --adaptive, queries judged per bot before it can stop (default: {DEFAULT_MIN_QUERIES})')
+    parser.add_argument('--precision', type=float, default=DEFAULT_PRECISION,
+                        help=f'With --adaptive, stop a bot once its interval is within ± this many points '
+                             f'(default: {DEFAULT_PRECISION})')
+    parser.add_argument('--budget', type=int,
+                        help='With --adaptive, maximum judge calls for this run (default: unlimited)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='With --adaptive, random seed for the query order (default: 0)')
+
+
+def adaptive_scheduler_from_args(args, jobs: List[Dict[str, Any]],
+                                 observed: Dict[str, List[float]]) -> AdaptiveScheduler:
+    """Build an AdaptiveScheduler from the arguments added by add_adaptive_arguments"""
+    return AdaptiveScheduler(jobs, observed, min_queries=args.min_queries, precision=args.precision,
+                             budget=args.budget, seed=args.seed)
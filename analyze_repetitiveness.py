@@ -7,30 +7,32 @@ Usage: python analyze_repetitiveness.py <bot_name>
 Example: python analyze_repetitiveness.py KimiBotTuned
 """
 
-import json
 import sys
 import re
 from collections import Counter, defaultdict
 from pathlib import Path
 from typing import List, Dict, Tuple
 
+from jsonl_io import iter_jsonl_fields
+from local_scorer import EMOJI_PATTERN
+from response_dataset import open_dataset
+
 BOT_RESPONSES_DIR = "bot_responses"
 
 
 def load_responses(bot_name: str) -> List[Dict]:
     """Load all responses for a bot"""
-    filepath = f"{BOT_RESPONSES_DIR}/Output - {bot_name} Responses.jsonl"
+    dataset = open_dataset()
+    if dataset and dataset.has_bot(bot_name):
+        return list(dataset.iter_responses(bot_name))
 
+    filepath = f"{BOT_RESPONSES_DIR}/Output - {bot_name} Responses.jsonl"
     if not Path(filepath).exists():
         print(f"Error: Response file not found: {filepath}")
         sys.exit(1)
 
-    responses = []
-    with open(filepath, 'r', encoding='utf-8') as f:
-        for line in f:
-            responses.append(json.loads(line))
-
-    return responses
+    # Only the text is analyzed; _trace and other fields are skipped unparsed
+    return list(iter_jsonl_fields(filepath, ('response',)))
 
 
 def extract_opening(text: str, num_words: int = 5) -> str:
@@ -159,9 +161,9 @@ def find_formulaic_patterns(responses: List[str]) -> Dict:
             patterns['thats_adjective'].append((i, match.group(1), response[:50]))
 
         # Check for emoji in first 50 chars
-        if re.search(r'[😅😊💙🫂]', response[:50]):
-            emoji = re.search(r'[😅😊💙🫂]', response[:50]).group(0)
-            patterns['emoji_in_opening'].append((i, emoji))
+        emoji = EMOJI_PATTERN.search(response[:50])
+        if emoji:
+            patterns['emoji_in_opening'].append((i, emoji.group(0)))
 
     return patterns
 
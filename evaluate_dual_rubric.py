@@ -0,0 +1,590 @@
+#!/usr/bin/env python3
+"""
+Evaluate one or more bots with BOTH rubrics (with and without ground truth)
+in a single judge call per response
+Saves to the evaluation_results and evaluation_results_no_gt runs of the
+results store, exactly as the two single-rubric evaluators would, and reports
+how often the two rubrics disagree.
+
+Usage: python evaluate_dual_rubric.py <bot_name> [<bot_name> ...]
+Example: python evaluate_dual_rubric.py KimiBotTuned GPT4oRaw
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+from openai import AsyncAzureOpenAI
+
+from evaluation_engine import (
+    ACTUAL_CLAUDE_BOT,
+    COMPACT_INSTRUCTIONS,
+    COMPACT_MAX_TOKENS,
+    DEFAULT_CONCURRENCY,
+    JUDGE_SAMPLING_PARAMS,
+    MAX_EVALUATION_TOKENS,
+    RUBRICS,
+    adopt_legacy_result,
+    check_already_evaluated,
+    check_evaluation_failed,
+    evaluate_response,
+    extract_json_from_response,
+    get_bot_file_path,
+    get_result_cache_key,
+    is_legacy_key,
+    is_verbose_sample,
+    judge_key_params,
+    judged_key,
+    load_bot_responses,
+    load_evaluation_prompt,
+    load_prompts,
+    run_evaluation_queue,
+    save_individual_result,
+)
+from gather_responses import is_error_response
+from judge_cache import add_cache_arguments, judge_cache_from_args, judge_cache_key
+from json_recovery import is_complete, recover_json
+from judge_schema import (
+    SchemaChecker,
+    add_schema_arguments,
+    evaluation_schema,
+    judge_completion,
+    object_schema,
+    schema_checker_from_args,
+)
+from local_scorer import SUBJECTIVE_ONLY_INSTRUCTIONS, merge_local_scores, score_locally
+from rate_limiter import (
+    CircuitOpenError,
+    RateLimiter,
+    add_rate_limit_arguments,
+    combine_usage,
+    format_limiter_stats,
+    format_prompt_cache_stats,
+    prompt_cache_usage,
+    rate_limiter_from_args,
+    split_usage,
+)
+from results_store import ResultsStore, add_store_arguments, ensure_imported, results_store_from_args, store_flag
+from rubric import DIMENSIONS
+
+# Keys of the two evaluations in the judge's reply
+GT_KEY = "with_ground_truth"
+NO_GT_KEY = "no_ground_truth"
+
+# Whether each side's rubric uses ground truth (its key in RUBRICS)
+SIDE_GROUND_TRUTH = {GT_KEY: True, NO_GT_KEY: False}
+
+# Name of the combined output schema in JSON Schema mode (--structured-output)
+SCHEMA_NAME = "dual_rubric_evaluation"
+
+# Overall scores further apart than this (points, 0-10 scale) count as a disagreement
+DEFAULT_DISAGREEMENT_THRESHOLD = 1.0
+
+
+def create_dual_system_prompt(gt_rubric: str, no_gt_rubric: str) -> str:
+    """Both rubrics in one system prompt"""
+    return f"""You apply two evaluation rubrics to the same response and return both evaluations.
+
+# RUBRIC 1 ({GT_KEY}): compare against the Ground Truth
+
+{gt_rubric}
+
+# RUBRIC 2 ({NO_GT_KEY}): judge the response on its own
+
+{no_gt_rubric}"""
+
+
+def create_dual_evaluation_request(
+    user_query: str,
+    ground_truth: str,
+    response_to_evaluate: str,
+    subjective_only: bool = False,
+    compact: bool = False
+) -> str:
+    """Create the evaluation request for both rubrics"""
+    request = f"""**User Query:**
+{user_query}
+
+**Ground Truth Response (Claude's actual response):**
+{ground_truth}
+
+**Response to Evaluate:**
+{response_to_evaluate}
+
+---
+
+Please evaluate the "Response to Evaluate" twice:
+1. "{GT_KEY}": against Claude's character as defined in RUBRIC 1, using the Ground Truth as a reference.
+2. "{NO_GT_KEY}": against the ideal teen support bot character as defined in RUBRIC 2, judging the response on its own exactly as if the Ground Truth had not been shown.
+
+Return ONLY valid JSON of the form {{"{GT_KEY}": {{...}}, "{NO_GT_KEY}": {{...}}}}, each evaluation in the exact format its rubric specifies. Do not include any text before or after the JSON."""
+    if subjective_only:
+        request += "\n\n" + SUBJECTIVE_ONLY_INSTRUCTIONS
+    if compact:
+        request += "\n\n" + COMPACT_INSTRUCTIONS
+    return request
+
+
+def parse_dual_evaluations(json_str: str) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Split a dual-rubric judge reply into its two evaluations
+    Returns None if either evaluation is missing
+    """
+    try:
+        parsed, report = json.loads(json_str), None
+    except json.JSONDecodeError:
+        parsed, report = recover_json(json_str)
+
+    if not isinstance(parsed, dict):
+        return None
+    evaluations = {key: parsed.get(key) for key in (GT_KEY, NO_GT_KEY)}
+    if not all(isinstance(e, dict) and 'dimension_scores' in e for e in evaluations.values()):
+        return None
+    if report:
+        # A reply cut off in the middle of either evaluation's scores is retried
+        if not all(is_complete(report, [key, 'dimension_scores']) and is_complete(report, [key, 'overall_score'])
+                   for key in evaluations):
+            return None
+        evaluations = {key: {**e, "json_recovery": report} for key, e in evaluations.items()}
+    return evaluations
+
+
+async def evaluate_response_dual(
+    client: AsyncAzureOpenAI,
+    dual_prompt: str,
+    gt_prompt: str,
+    no_gt_prompt: str,
+    user_query: str,
+    ground_truth: str,
+    response_to_evaluate: str,
+    deployment_name: str,
+    limiter: RateLimiter,
+    subjective_only: bool = False,
+    compact: bool = False,
+    checker: Optional[SchemaChecker] = None
+) -> Tuple[Dict[str, Dict[str, Any]], Optional[Dict[str, int]]]:
+    """
+    Evaluate one response with both rubrics in one API call
+    Returns ({GT_KEY: evaluation, NO_GT_KEY: evaluation}, token usage of
+    every call made for the pair). Missing or invalid scores are
+    asked for again in the same conversation. Falls back to one call per
+    rubric if the reply can't be split.
+    """
+    evaluation_request = create_dual_evaluation_request(
+        user_query, ground_truth, response_to_evaluate, subjective_only, compact)
+    max_tokens = (COMPACT_MAX_TOKENS if compact else MAX_EVALUATION_TOKENS) * 2
+
+    checker = checker or SchemaChecker()
+    schemas = {
+        key: evaluation_schema(RUBRICS[has_ground_truth].narrative_fields, subjective_only, compact)
+        for key, has_ground_truth in SIDE_GROUND_TRUTH.items()
+    }
+    complete = judge_completion(client, deployment_name, limiter, JUDGE_SAMPLING_PARAMS)
+    messages = [
+        {"role": "system", "content": dual_prompt},
+        {"role": "user", "content": evaluation_request}
+    ]
+
+    try:
+        response = await checker.create(complete, messages, object_schema(schemas), SCHEMA_NAME, max_tokens)
+        usage = prompt_cache_usage(response)
+        if usage:
+            usage["dual"] = True
+
+        response_text = response.choices[0].message.content
+        json_str = extract_json_from_response(response_text) if response_text else None
+        evaluations = parse_dual_evaluations(json_str) if json_str else None
+        if evaluations is not None:
+            for key, schema in schemas.items():
+                evaluations[key] = await checker.check(evaluations[key], schema, f"{SCHEMA_NAME}_{key}", complete,
+                                                       messages, response_text, f'"{key}" evaluation')
+            return evaluations, usage
+
+        print("Dual-rubric evaluation could not be split, evaluating each rubric separately")
+
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        print(f"Error in dual-rubric evaluation, evaluating each rubric separately: {e}")
+
+    gt_evaluation, gt_usage = await evaluate_response(
+        client, gt_prompt, user_query, ground_truth, response_to_evaluate,
+        deployment_name, limiter, subjective_only, compact, checker)
+    no_gt_evaluation, no_gt_usage = await evaluate_response(
+        client, no_gt_prompt, user_query, None, response_to_evaluate,
+        deployment_name, limiter, subjective_only, compact, checker)
+    return {GT_KEY: gt_evaluation, NO_GT_KEY: no_gt_evaluation}, combine_usage(gt_usage, no_gt_usage)
+
+
+def load_saved_evaluation(store: ResultsStore, run: str, bot_name: str, query_index: int) -> Optional[Dict[str, Any]]:
+    """A saved evaluation, or None if missing or failed"""
+    result = store.get(run, bot_name, query_index)
+    if result is None:
+        return None
+    evaluation = result.get('evaluation', {})
+    if 'error' in evaluation or not evaluation.get('overall_score'):
+        return None
+    return evaluation
+
+
+def report_rubric_disagreement(store: ResultsStore, bot_names: List[str], query_count: int, threshold: float):
+    """
+    Compare saved with-GT and no-GT scores for each bot
+    Prints mean scores, mean |difference| and the share of responses whose
+    overall scores differ by more than `threshold`, per bot and per dimension.
+    """
+    diffs_by_dim: Dict[str, List[float]] = {dim: [] for dim in DIMENSIONS}
+    rows = []
+    for bot_name in bot_names:
+        gt_scores = []
+        no_gt_scores = []
+        for query_index in range(1, query_count + 1):
+            gt = load_saved_evaluation(store, RUBRICS[True].output_dir, bot_name, query_index)
+            no_gt = load_saved_evaluation(store, RUBRICS[False].output_dir, bot_name, query_index)
+            if gt is None or no_gt is None:
+                continue
+            gt_scores.append(float(gt['overall_score']))
+            no_gt_scores.append(float(no_gt['overall_score']))
+            for dim in DIMENSIONS:
+                gt_dim = gt.get('dimension_scores', {}).get(dim)
+                no_gt_dim = no_gt.get('dimension_scores', {}).get(dim)
+                if gt_dim is not None and no_gt_dim is not None:
+                    diffs_by_dim[dim].append(abs(float(gt_dim) - float(no_gt_dim)))
+        if gt_scores:
+            diffs = [abs(a - b) for a, b in zip(gt_scores, no_gt_scores)]
+            rows.append((bot_name, len(diffs), sum(gt_scores) / len(diffs), sum(no_gt_scores) / len(diffs),
+                         sum(diffs) / len(diffs), sum(1 for d in diffs if d > threshold) / len(diffs)))
+
+    if not rows:
+        print("No responses scored with both rubrics yet")
+        return
+
+    print(f"\n{'Bot':24s} {'Pairs':>6s} {'With GT':>8s} {'No GT':>8s} {'Mean |diff|':>12s} {'Disagree':>9s}")
+    print("-" * 72)
+    for bot_name, pairs, gt_mean, no_gt_mean, mean_diff, disagree in rows:
+        print(f"{bot_name:24s} {pairs:6d} {gt_mean:8.2f} {no_gt_mean:8.2f} {mean_diff:12.2f} {disagree:9.0%}")
+
+    total_pairs = sum(row[1] for row in rows)
+    total_disagree = sum(row[1] * row[5] for row in rows)
+    print(f"\nOverall scores disagree by more than {threshold} points on "
+          f"{total_disagree / total_pairs:.0%} of {total_pairs} responses")
+
+    print(f"\n{'Dimension':30s} {'Mean |diff|':>12s}")
+    print("-" * 43)
+    for dim, diffs in diffs_by_dim.items():
+        if diffs:
+            print(f"{dim:30s} {sum(diffs) / len(diffs):12.2f}")
+
+    if len(rows) > 1:
+        gt_ranking = [row[0] for row in sorted(rows, key=lambda row: -row[2])]
+        no_gt_ranking = [row[0] for row in sorted(rows, key=lambda row: -row[3])]
+        if gt_ranking == no_gt_ranking:
+            print("\n✓ Both rubrics rank the bots in the same order")
+        else:
+            print(f"\n⚠ Rankings differ: with GT {' > '.join(gt_ranking)}")
+            print(f"                   no GT   {' > '.join(no_gt_ranking)}")
+
+
+def main():
+    """Main evaluation pipeline scoring both rubrics per judge call"""
+    parser = argparse.ArgumentParser(
+        description="Evaluate bot responses with and without ground truth in one judge call per response",
+        epilog="Bot names should match the response file: bot_responses/Output - <bot_name> Responses.jsonl"
+    )
+    parser.add_argument('bot_names', nargs='+', metavar='bot_name',
+                        help='Bot(s) to evaluate (e.g., KimiBotTuned)')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help='Only re-evaluate queries that failed previously (in either results directory)')
+    parser.add_argument('--concurrency', '-c', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Maximum judge calls in flight; the actual limit adapts below this (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--local-scoring', action='store_true',
+                        help='Score prose vs. bullets, emoji and length locally; the judge scores only the subjective dimensions')
+    parser.add_argument('--compact', action='store_true',
+                        help='Ask the judge for scores and rationale codes only, not the narrative fields')
+    parser.add_argument('--verbose-sample', type=float, default=0.0, metavar='FRACTION',
+                        help='With --compact, fraction of queries that still get the full narrative (default: 0)')
+    parser.add_argument('--disagreement-threshold', type=float, default=DEFAULT_DISAGREEMENT_THRESHOLD,
+                        help=f'Overall score difference that counts as the rubrics disagreeing '
+                             f'(default: {DEFAULT_DISAGREEMENT_THRESHOLD})')
+    parser.add_argument('--recheck-legacy', action='store_true',
+                        help='Re-evaluate results saved before the judge cache, whose rubric and judge are unknown')
+    add_rate_limit_arguments(parser)
+    add_cache_arguments(parser)
+    add_store_arguments(parser)
+    add_schema_arguments(parser)
+    args = parser.parse_args()
+
+    bot_names = args.bot_names
+    retry_failed_only = args.retry_failed
+
+    mode = "RETRY FAILED" if retry_failed_only else "FULL"
+    print(f"Evaluating: {', '.join(bot_names)} (Mode: {mode}, WITH AND WITHOUT GROUND TRUTH)")
+    print("=" * 80)
+
+    # Setup Azure OpenAI
+    azure_endpoint = os.environ.get('AZURE_OPENAI_ENDPOINT')
+    api_key = os.environ.get('AZURE_OPENAI_API_KEY')
+    deployment_name = os.environ.get('AZURE_OPENAI_DEPLOYMENT', 'kimi-2-5')
+
+    if not azure_endpoint or not api_key:
+        print("Error: Azure OpenAI credentials not set")
+        print("Required environment variables:")
+        print("  - AZURE_OPENAI_ENDPOINT")
+        print("  - AZURE_OPENAI_API_KEY")
+        print("  - AZURE_OPENAI_DEPLOYMENT (optional, defaults to 'kimi-2-5')")
+        sys.exit(1)
+
+    client = AsyncAzureOpenAI(
+        azure_endpoint=azure_endpoint,
+        api_key=api_key,
+        api_version="2024-08-01-preview",
+        max_retries=0
+    )
+
+    print(f"Using Azure OpenAI deployment: {deployment_name}")
+    limiter = rate_limiter_from_args(args, args.concurrency)
+    checker = schema_checker_from_args(args)
+    print(f"Concurrency: {args.concurrency}")
+    if args.local_scoring:
+        print("Local scoring: prose_vs_bullets, emoji_usage, length_conciseness (judge scores the rest)")
+    if args.compact:
+        print(f"Compact output: scores and rationale codes ({args.verbose_sample:.0%} of queries get the full narrative)")
+    print(f"Rate limits: {limiter.describe()}")
+
+    # Create output directories
+    for rubric in RUBRICS.values():
+        Path(rubric.output_dir).mkdir(exist_ok=True)
+
+    for bot_name in bot_names:
+        bot_file = get_bot_file_path(bot_name)
+        if not os.path.exists(bot_file):
+            print(f"\nError: Response file not found: {bot_file}")
+            print(f"Expected file: {bot_file}")
+            sys.exit(1)
+
+    # Load data
+    print("\nLoading data...")
+    gt_prompt = load_evaluation_prompt(True)
+    no_gt_prompt = load_evaluation_prompt(False)
+    dual_prompt = create_dual_system_prompt(gt_prompt, no_gt_prompt)
+    prompts = load_prompts()
+    actual_claude = load_bot_responses(ACTUAL_CLAUDE_BOT, prompts)
+    print(f"   - {len(prompts)} prompts loaded")
+    store = results_store_from_args(args)
+    for rubric in RUBRICS.values():
+        ensure_imported(store, rubric.output_dir)
+    # Every skip/retry decision below is made from one scan per run
+    manifests = {rubric.output_dir: store.manifest(rubric.output_dir) for rubric in RUBRICS.values()}
+
+    # Each side is keyed (and skipped) exactly as its single-rubric evaluator would
+    sides = {
+        GT_KEY: (RUBRICS[True].output_dir, gt_prompt),
+        NO_GT_KEY: (RUBRICS[False].output_dir, no_gt_prompt),
+    }
+    all_key_params = [judge_key_params(*mode) for mode in itertools.product((False, True), repeat=4)]
+
+    jobs = []
+    skipped_by_bot = {}
+    cached_by_bot = {}
+    stale_count = 0
+    adopted_count = 0
+    legacy_count = 0
+    judge_cache = judge_cache_from_args(args)
+
+    for bot_name in bot_names:
+        bot_responses = load_bot_responses(bot_name, prompts)
+        print(f"   - {sum(entry is not None for entry in bot_responses)} {bot_name} responses")
+
+        skipped_count = 0
+        cached_count = 0
+        errored_count = 0
+        missing_count = 0
+        for i, (prompt, actual, bot_resp) in enumerate(zip(prompts, actual_claude, bot_responses)):
+            query_idx = i + 1
+            if bot_resp is None or actual is None:
+                missing_count += 1
+                continue
+
+            if is_error_response(bot_resp) or is_error_response(actual):
+                errored_count += 1
+                continue
+
+            compact = args.compact and not is_verbose_sample(prompt, args.verbose_sample)
+            # Keys for scoring a side alongside the other rubric, or on its own
+            cache_keys = {}
+            pending = []
+            reused_from_cache = False
+            for key, (run, rubric) in sides.items():
+                manifest = manifests[run]
+                ground_truth = actual['response'] if SIDE_GROUND_TRUTH[key] else None
+                cache_keys[key] = {
+                    dual: judge_cache_key(
+                        rubric, prompt, ground_truth, bot_resp['response'], deployment_name,
+                        judge_key_params(False, args.local_scoring, compact, dual)
+                    )
+                    for dual in (True, False)
+                }
+
+                if retry_failed_only:
+                    if not check_evaluation_failed(manifest, bot_name, query_idx):
+                        continue
+                elif check_already_evaluated(manifest, bot_name, query_idx) \
+                        and not check_evaluation_failed(manifest, bot_name, query_idx):
+                    stored_key = get_result_cache_key(manifest, bot_name, query_idx)
+                    if stored_key is None and not args.recheck_legacy:
+                        stored_key = adopt_legacy_result(store, run, bot_name, query_idx, cache_keys[key][True])
+                        adopted_count += 1
+                    if args.recheck_legacy and is_legacy_key(stored_key):
+                        legacy_count += 1
+                    elif judged_key(stored_key) in cache_keys[key].values() or any(
+                        judged_key(stored_key) == judge_cache_key(rubric, prompt, ground_truth, bot_resp['response'],
+                                                                  deployment_name, params)
+                        for params in all_key_params
+                    ):
+                        continue
+                    else:
+                        stale_count += 1
+
+                cached = None
+                if judge_cache:
+                    for dual, cache_key in cache_keys[key].items():
+                        cached = judge_cache.get(cache_key)
+                        if cached is not None:
+                            save_individual_result(store, run, bot_name, query_idx, prompt, cached, cache_key)
+                            cached_count += 1
+                            reused_from_cache = True
+                            break
+                if cached is not None:
+                    continue
+
+                pending.append(key)
+
+            if not pending:
+                if not reused_from_cache:
+                    skipped_count += 1
+                continue
+
+            # Both sides pending: one dual-rubric call. One side: its single-rubric call
+            dual = len(pending) == len(sides)
+            jobs.append({
+                "bot_name": bot_name,
+                "query_index": query_idx,
+                "user_query": prompt,
+                "ground_truth": actual['response'],
+                "response": bot_resp['response'],
+                "cache_keys": {key: cache_keys[key][dual] for key in pending},
+                "sides": pending,
+                "compact": compact
+            })
+
+        skipped_by_bot[bot_name] = skipped_count
+        cached_by_bot[bot_name] = cached_count
+        if missing_count:
+            print(f"   ⚠ {missing_count} prompts have no {bot_name} response (or ground truth) yet and won't be judged")
+            print(f"     (gather them with: python gather_responses.py {bot_name} ... --resume)")
+        if errored_count:
+            print(f"   ⚠ {errored_count} {bot_name} responses (or their ground truth) are gather errors and won't be judged")
+            print(f"     (regenerate them with: python gather_responses.py {bot_name} ... --resume)")
+
+    if retry_failed_only:
+        print(f"\n   Found {len(jobs)} failed evaluations to retry")
+    else:
+        already_done = sum(skipped_by_bot.values())
+        if already_done > 0:
+            print(f"\n   Found {already_done} responses already evaluated with both rubrics (will skip)")
+    if stale_count:
+        print(f"   Found {stale_count} results whose rubric, response or judge changed (will re-evaluate)")
+    if adopted_count:
+        print(f"   ⚠ Kept {adopted_count} results saved before the judge cache without knowing their rubric or judge")
+        print("     (later changes are detected from now on; re-evaluate them with --recheck-legacy)")
+    if legacy_count:
+        print(f"   Found {legacy_count} results saved before the judge cache (will re-evaluate)")
+    reused = sum(cached_by_bot.values())
+    if reused:
+        print(f"   Reused {reused} evaluations from the judge cache")
+
+    async def evaluate_job(job: Dict[str, Any]) -> Dict[str, Any]:
+        if job['sides'] == [GT_KEY]:
+            evaluation, job['usage'] = await evaluate_response(
+                client, gt_prompt, job['user_query'], job['ground_truth'], job['response'],
+                deployment_name, limiter, args.local_scoring, job['compact'], checker)
+            evaluations = {GT_KEY: evaluation}
+        elif job['sides'] == [NO_GT_KEY]:
+            evaluation, job['usage'] = await evaluate_response(
+                client, no_gt_prompt, job['user_query'], None, job['response'],
+                deployment_name, limiter, args.local_scoring, job['compact'], checker)
+            evaluations = {NO_GT_KEY: evaluation}
+        else:
+            evaluations, job['usage'] = await evaluate_response_dual(
+                client,
+                dual_prompt,
+                gt_prompt,
+                no_gt_prompt,
+                job['user_query'],
+                job['ground_truth'],
+                job['response'],
+                deployment_name,
+                limiter,
+                args.local_scoring,
+                job['compact'],
+                checker
+            )
+        if args.local_scoring:
+            local = score_locally(job['response'])
+            evaluations = {key: merge_local_scores(evaluation, local) for key, evaluation in evaluations.items()}
+        job['evaluations'] = evaluations
+        # The progress line shows the with-GT score when there is one
+        return evaluations[job['sides'][0]]
+
+    def save_job(job: Dict[str, Any], evaluation: Dict[str, Any]):
+        # A failed job only carries the error evaluation
+        evaluations = job.pop('evaluations', None) or {key: evaluation for key in job['sides']}
+        # Each side stores its share so summing usage counts the call once
+        shares = split_usage(job.get('usage'), len(job['sides']))
+        for key, share in zip(job['sides'], shares):
+            if judge_cache:
+                judge_cache.put(job['cache_keys'][key], evaluations[key])
+            save_individual_result(store, sides[key][0], job['bot_name'], job['query_index'], job['user_query'],
+                                   evaluations[key], job['cache_keys'][key], share)
+
+    # Query-major order keeps the shared rubrics + query prefix in the prompt cache
+    jobs.sort(key=lambda job: job['query_index'])
+
+    print(f"\nStarting dual-rubric evaluation of {len(jobs)} responses...")
+    try:
+        evaluated_by_bot = asyncio.run(
+            run_evaluation_queue(jobs, evaluate_job, save_job, args.concurrency, limiter.status)
+        )
+    except BaseException:
+        # Commit the last batch of results even if the run is interrupted
+        store.close()
+        raise
+
+    print("\n" + "=" * 80)
+    print(f"Evaluation complete for {', '.join(bot_names)}!")
+    print("=" * 80)
+    for bot_name in bot_names:
+        print(f"  {bot_name}: evaluated {evaluated_by_bot.get(bot_name, 0)} responses, "
+              f"reused {cached_by_bot[bot_name]} from cache, skipped {skipped_by_bot[bot_name]}")
+    checker.print_report()
+    print(f"  API calls: {format_limiter_stats(limiter)}")
+    print(f"  Prompt cache: {format_prompt_cache_stats(limiter)}")
+    if judge_cache:
+        print(f"  Judge cache: {judge_cache.format_stats()}")
+        judge_cache.close()
+
+    print("\nAgreement between the two rubrics:")
+    report_rubric_disagreement(store, bot_names, len(prompts), args.disagreement_threshold)
+    store.close()
+
+    print(f"\nResults saved to: {args.results_store} (runs '{RUBRICS[True].output_dir}' and '{RUBRICS[False].output_dir}')")
+    print(f"\nRun 'python merge_results.py{store_flag(args)}' and "
+          f"'python merge_results.py --no-gt{store_flag(args)}' to generate reports")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,326 +1,23 @@
 #!/usr/bin/env python3
 """
-Evaluate a single bot using Azure OpenAI (Kimi-2.5) with robust JSON parsing
-Usage: python evaluate_single_bot_aoai_robust.py <bot_name>
+Evaluate one or more bots using Azure OpenAI (Kimi-2.5) with robust JSON parsing
+Usage: python evaluate_single_bot_aoai_robust.py <bot_name> [<bot_name> ...]
 Example: python evaluate_single_bot_aoai_robust.py ActualClaude
 Available bots: ActualClaude, ClaudeBot, ClaudeBot-v2, GPTBot
+
+The evaluation itself (judge calls, skip and save logic) is in evaluation_engine.py.
 """
 
-import json
-import csv
 import os
 import sys
-import re
-from pathlib import Path
-from typing import Dict, List, Any, Optional
-from openai import AzureOpenAI
-
-# Configuration
-EVALUATION_PROMPT_FILE = "Teen Support Bot Tone Evaluator.md"
-INPUT_PROMPTS_FILE = "input-prompts.csv"
-BOT_RESPONSES_DIR = "bot_responses"
-ACTUAL_CLAUDE_FILE = f"{BOT_RESPONSES_DIR}/Output - ActualClaude Responses.jsonl"
-
-OUTPUT_DIR = "evaluation_results"
-INDIVIDUAL_RESULTS_DIR = f"{OUTPUT_DIR}/individual"
-
-
-def get_bot_file_path(bot_name: str) -> str:
-    """Get the response file path for a given bot name"""
-    return f"{BOT_RESPONSES_DIR}/Output - {bot_name} Responses.jsonl"
-
-
-def load_evaluation_prompt() -> str:
-    """Load the evaluation prompt from markdown file"""
-    with open(EVALUATION_PROMPT_FILE, 'r', encoding='utf-8') as f:
-        return f.read()
-
-
-def load_prompts() -> List[str]:
-    """Load user prompts from CSV"""
-    prompts = []
-    with open(INPUT_PROMPTS_FILE, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            prompts.append(row['userQuery'])
-    return prompts
-
-
-def load_jsonl(filepath: str) -> List[Dict[str, Any]]:
-    """Load responses from JSONL file"""
-    responses = []
-    with open(filepath, 'r', encoding='utf-8') as f:
-        for line in f:
-            responses.append(json.loads(line))
-    return responses
-
-
-def create_evaluation_request(
-    user_query: str,
-    ground_truth: str,
-    response_to_evaluate: str
-) -> str:
-    """Create the full evaluation request text"""
-    return f"""**User Query:**
-{user_query}
-
-**Ground Truth Response (Claude's actual response):**
-{ground_truth}
-
-**Response to Evaluate:**
-{response_to_evaluate}
-
----
-
-Please evaluate the "Response to Evaluate" against Claude's character as defined, using the Ground Truth as a reference. Return your evaluation ONLY as valid JSON in the exact format specified. Do not include any text before or after the JSON."""
-
-
-def clean_json_string(json_str: str) -> str:
-    """
-    Clean and repair common JSON string issues
-    """
-    if not json_str:
-        return "{}"
+from typing import Any, Tuple
+from openai import AsyncAzureOpenAI
 
-    # Remove any text before first { and after last }
-    start = json_str.find('{')
-    end = json_str.rfind('}')
+from evaluation_engine import run_evaluator
 
-    if start == -1 or end == -1:
-        return "{}"
 
-    json_str = json_str[start:end+1]
-
-    # Fix common issues with unescaped quotes in strings
-    # This is a simple heuristic - may not catch all cases
-    json_str = json_str.replace('\n', '\\n')
-    json_str = json_str.replace('\r', '\\r')
-    json_str = json_str.replace('\t', '\\t')
-
-    return json_str
-
-
-def extract_json_from_response(response_text: str) -> Optional[str]:
-    """
-    Extract JSON from response with multiple fallback strategies
-    """
-    if not response_text:
-        return None
-
-    # Strategy 1: Look for ```json code blocks
-    if "```json" in response_text:
-        json_start = response_text.find("```json") + 7
-        json_end = response_text.find("```", json_start)
-        if json_end != -1:
-            return response_text[json_start:json_end].strip()
-
-    # Strategy 2: Look for any ``` code blocks
-    if "```" in response_text:
-        json_start = response_text.find("```") + 3
-        # Skip language identifier if present
-        newline = response_text.find('\n', json_start)
-        if newline != -1:
-            json_start = newline + 1
-        json_end = response_text.find("```", json_start)
-        if json_end != -1:
-            return response_text[json_start:json_end].strip()
-
-    # Strategy 3: Find first { to last }
-    start = response_text.find('{')
-    end = response_text.rfind('}')
-    if start != -1 and end != -1 and end > start:
-        return response_text[start:end+1].strip()
-
-    # Strategy 4: Use the whole response
-    return response_text.strip()
-
-
-def parse_json_robust(json_str: str) -> Dict[str, Any]:
-    """
-    Try multiple strategies to parse JSON
-    """
-    # Try 1: Direct parse
-    try:
-        return json.loads(json_str)
-    except json.JSONDecodeError:
-        pass
-
-    # Try 2: Clean and parse
-    try:
-        cleaned = clean_json_string(json_str)
-        return json.loads(cleaned)
-    except json.JSONDecodeError:
-        pass
-
-    # Try 3: Extract numbers with regex as fallback
-    try:
-        # Extract overall_score
-        overall_match = re.search(r'"overall_score"\s*:\s*([0-9.]+)', json_str)
-        overall_score = float(overall_match.group(1)) if overall_match else 0.0
-
-        # Extract dimension scores
-        dimensions = [
-            'warmth_validation', 'prose_vs_bullets', 'emoji_usage',
-            'conversational_tone', 'practical_advice', 'followup_question',
-            'support_solutions_balance', 'length_conciseness'
-        ]
-
-        dimension_scores = {}
-        for dim in dimensions:
-            match = re.search(rf'"{dim}"\s*:\s*([0-9.]+)', json_str)
-            if match:
-                dimension_scores[dim] = float(match.group(1))
-            else:
-                dimension_scores[dim] = 0
-
-        return {
-            "overall_score": overall_score,
-            "dimension_scores": dimension_scores,
-            "strengths": ["(Partial parse - JSON was malformed)"],
-            "weaknesses": ["(Partial parse - JSON was malformed)"],
-            "most_claude_like": "N/A (parsing error)",
-            "least_claude_like": "N/A (parsing error)",
-            "bullet_point_analysis": {
-                "bullet_count": 0,
-                "prose_percentage": "N/A",
-                "notes": "N/A (parsing error)"
-            },
-            "key_differences_from_ground_truth": ["(Partial parse - JSON was malformed)"],
-            "parse_warning": "JSON was malformed, scores extracted via regex"
-        }
-    except Exception as e:
-        # Complete failure
-        return {
-            "overall_score": 0.0,
-            "dimension_scores": {},
-            "error": f"JSON parse failed completely: {str(e)[:200]}"
-        }
-
-
-def evaluate_response(
-    client: AzureOpenAI,
-    evaluation_prompt: str,
-    user_query: str,
-    ground_truth: str,
-    response_to_evaluate: str,
-    deployment_name: str
-) -> Dict[str, Any]:
-    """
-    Call Azure OpenAI API to evaluate a single response
-    Returns parsed JSON evaluation
-    """
-    evaluation_request = create_evaluation_request(
-        user_query,
-        ground_truth,
-        response_to_evaluate
-    )
-
-    try:
-        response = client.chat.completions.create(
-            model=deployment_name,
-            messages=[
-                {"role": "system", "content": evaluation_prompt},
-                {"role": "user", "content": evaluation_request}
-            ],
-            temperature=0.0,  # Deterministic evaluation
-            max_tokens=4000,
-            response_format={"type": "json_object"}  # Force JSON mode
-        )
-
-        # Extract text content
-        response_text = response.choices[0].message.content
-
-        if not response_text:
-            return {
-                "overall_score": 0.0,
-                "dimension_scores": {},
-                "error": "Empty response from API"
-            }
-
-        # Extract JSON with fallback strategies
-        json_str = extract_json_from_response(response_text)
-
-        if not json_str:
-            return {
-                "overall_score": 0.0,
-                "dimension_scores": {},
-                "error": "Could not extract JSON from response"
-            }
-
-        # Parse JSON with robust error handling
-        evaluation = parse_json_robust(json_str)
-        return evaluation
-
-    except Exception as e:
-        print(f"Error evaluating response: {e}")
-        return {
-            "overall_score": 0.0,
-            "dimension_scores": {},
-            "error": str(e)
-        }
-
-
-def save_individual_result(
-    bot_name: str,
-    query_index: int,
-    user_query: str,
-    evaluation: Dict[str, Any]
-):
-    """Save individual evaluation result as JSON"""
-    result = {
-        "bot_name": bot_name,
-        "query_index": query_index,
-        "user_query": user_query,
-        "evaluation": evaluation
-    }
-
-    filename = f"{INDIVIDUAL_RESULTS_DIR}/{bot_name}_query_{query_index:03d}.json"
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(result, f, indent=2, ensure_ascii=False)
-
-
-def check_already_evaluated(bot_name: str, query_index: int) -> bool:
-    """Check if this bot/query combo has already been evaluated"""
-    filename = f"{INDIVIDUAL_RESULTS_DIR}/{bot_name}_query_{query_index:03d}.json"
-    return os.path.exists(filename)
-
-
-def check_evaluation_failed(bot_name: str, query_index: int) -> bool:
-    """Check if an evaluation exists but failed (has error or overall_score = 0)"""
-    filename = f"{INDIVIDUAL_RESULTS_DIR}/{bot_name}_query_{query_index:03d}.json"
-    if not os.path.exists(filename):
-        return False
-
-    try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            result = json.load(f)
-            evaluation = result.get('evaluation', {})
-            has_error = 'error' in evaluation
-            has_zero_score = evaluation.get('overall_score', 0) == 0.0
-            return has_error or has_zero_score
-    except:
-        return True  # If we can't read it, consider it failed
-
-
-def main():
-    """Main evaluation pipeline for a single bot"""
-    if len(sys.argv) < 2:
-        print("Usage: python evaluate_single_bot_aoai_robust.py <bot_name> [--retry-failed]")
-        print("\nExample: python evaluate_single_bot_aoai_robust.py KimiBotTuned")
-        print("\nBot name should match the response file:")
-        print("  bot_responses/Output - <bot_name> Responses.jsonl")
-        print("\nOptions:")
-        print("  --retry-failed    Only re-evaluate queries that failed previously")
-        sys.exit(1)
-
-    bot_name = sys.argv[1]
-    retry_failed_only = "--retry-failed" in sys.argv
-
-    mode = "RETRY FAILED" if retry_failed_only else "FULL"
-    print(f"Evaluating: {bot_name} (Mode: {mode})")
-    print("=" * 80)
-
-    # Setup Azure OpenAI
+def create_client() -> Tuple[Any, str]:
+    """Azure OpenAI client and judge deployment name from the environment"""
     azure_endpoint = os.environ.get('AZURE_OPENAI_ENDPOINT')
     api_key = os.environ.get('AZURE_OPENAI_API_KEY')
     deployment_name = os.environ.get('AZURE_OPENAI_DEPLOYMENT', 'kimi-2-5')
@@ -333,95 +30,20 @@ def main():
         print("  - AZURE_OPENAI_DEPLOYMENT (optional, defaults to 'kimi-2-5')")
         sys.exit(1)
 
-    client = AzureOpenAI(
+    client = AsyncAzureOpenAI(
         azure_endpoint=azure_endpoint,
         api_key=api_key,
-        api_version="2024-08-01-preview"
+        api_version="2024-08-01-preview",
+        max_retries=0
     )
 
     print(f"Using Azure OpenAI deployment: {deployment_name}")
+    return client, deployment_name
 
-    # Create output directories
-    Path(OUTPUT_DIR).mkdir(exist_ok=True)
-    Path(INDIVIDUAL_RESULTS_DIR).mkdir(exist_ok=True)
-
-    # Load data
-    print("\nLoading data...")
-    evaluation_prompt = load_evaluation_prompt()
-    prompts = load_prompts()
-    actual_claude = load_jsonl(ACTUAL_CLAUDE_FILE)
-
-    # Check if bot file exists
-    bot_file = get_bot_file_path(bot_name)
-    if not os.path.exists(bot_file):
-        print(f"\nError: Response file not found: {bot_file}")
-        print(f"\nMake sure the file exists in the bot_responses/ directory")
-        print(f"Expected file: {bot_file}")
-        sys.exit(1)
-
-    bot_responses = load_jsonl(bot_file)
-
-    print(f"   - {len(prompts)} prompts loaded")
-    print(f"   - {len(bot_responses)} {bot_name} responses")
 
-    # Check what's already done / failed
-    if retry_failed_only:
-        failed_count = sum(1 for i in range(1, len(prompts) + 1)
-                          if check_evaluation_failed(bot_name, i))
-        print(f"\n   Found {failed_count} failed evaluations to retry")
-    else:
-        already_done = sum(1 for i in range(1, len(prompts) + 1)
-                          if check_already_evaluated(bot_name, i))
-        if already_done > 0:
-            print(f"\n   Found {already_done} already evaluated responses (will skip)")
-
-    # Evaluate
-    print(f"\nStarting evaluation...")
-    evaluated_count = 0
-    skipped_count = 0
-
-    for i, (prompt, actual, bot_resp) in enumerate(zip(prompts, actual_claude, bot_responses)):
-        query_idx = i + 1
-
-        # Check skip conditions
-        if retry_failed_only:
-            # Only process if it failed
-            if not check_evaluation_failed(bot_name, query_idx):
-                skipped_count += 1
-                continue
-        else:
-            # Skip if already evaluated successfully
-            if check_already_evaluated(bot_name, query_idx) and not check_evaluation_failed(bot_name, query_idx):
-                skipped_count += 1
-                continue
-
-        evaluated_count += 1
-        print(f"   [{evaluated_count}] Query {query_idx}: {prompt[:60]}...")
-
-        # Get ground truth and response to evaluate
-        ground_truth = actual['response']
-        response_to_eval = bot_resp['response']
-
-        # Evaluate
-        evaluation = evaluate_response(
-            client,
-            evaluation_prompt,
-            prompt,
-            ground_truth,
-            response_to_eval,
-            deployment_name
-        )
-
-        # Save individual result
-        save_individual_result(bot_name, query_idx, prompt, evaluation)
-
-    print("\n" + "=" * 80)
-    print(f"Evaluation complete for {bot_name}!")
-    print("=" * 80)
-    print(f"  Evaluated: {evaluated_count} responses")
-    print(f"  Skipped: {skipped_count}")
-    print(f"\nResults saved to: {INDIVIDUAL_RESULTS_DIR}/{bot_name}_query_*.json")
-    print("\nRun 'python merge_results.py' to generate CSV and summary report")
+def main():
+    """Main evaluation pipeline for one or more bots"""
+    run_evaluator(True, create_client, "Evaluate bot responses against the ActualClaude ground truth")
 
 
 if __name__ == "__main__":
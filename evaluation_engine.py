@@ -0,0 +1,1188 @@
+#!/usr/bin/env python3
+"""
+Shared evaluation engine for both judge rubrics
+Used by evaluate_single_bot_aoai_robust.py (with ground truth),
+evaluate_single_bot_no_gt.py (without) and evaluate_dual_rubric.py (both)
+
+The judge calls, reply parsing and skip/save decisions are the same for
+both rubrics; `ground_truth` picks the rubric's prompt file, results run and
+output fields (RUBRICS), and judge calls take ActualClaude's response, or
+None for the rubric without ground truth.
+
+Every (bot, query) job goes into a single queue that a pool of async workers
+drains, so several bots can be evaluated in one invocation with a bounded
+number of judge calls in flight. In batched mode, jobs for the same query
+are grouped so that one judge call scores several bots' responses.
+"""
+
+import argparse
+import asyncio
+import csv
+import hashlib
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import namedtuple
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from adaptive_scheduler import add_adaptive_arguments, adaptive_scheduler_from_args, run_adaptive_queue
+from gather_responses import align_responses, is_error_response
+from judge_cache import add_cache_arguments, judge_cache_from_args, judge_cache_key
+from judge_cascade import add_cascade_arguments, judge_cascade_from_args
+from json_recovery import is_complete, recover_json, unrecovered_scores
+from jsonl_io import iter_jsonl_fields
+from judge_schema import (
+    STRING,
+    STRING_LIST,
+    SchemaChecker,
+    add_schema_arguments,
+    evaluation_schema,
+    judge_completion,
+    schema_checker_from_args,
+    schema_problems,
+    is_score_problem,
+)
+from local_scorer import (
+    JUDGE_DIMENSIONS,
+    LOCAL_SCORER_VERSION,
+    SUBJECTIVE_ONLY_INSTRUCTIONS,
+    merge_local_scores,
+    score_locally,
+)
+from rate_limiter import (
+    CircuitOpenError,
+    RateLimiter,
+    add_rate_limit_arguments,
+    call_with_retry,
+    combine_usage,
+    estimate_tokens,
+    format_limiter_stats,
+    format_prompt_cache_stats,
+    prompt_cache_usage,
+    rate_limiter_from_args,
+    split_usage,
+)
+from response_dataset import open_dataset
+from results_store import (
+    Manifest,
+    ResultsStore,
+    add_store_arguments,
+    ensure_imported,
+    results_store_from_args,
+    store_flag,
+)
+from rubric import DIMENSIONS
+
+try:
+    from surrogate_judge import prescreen
+    SURROGATE_AVAILABLE = True
+except ImportError:
+    SURROGATE_AVAILABLE = False
+
+# Default number of judge calls in flight (override with --concurrency)
+DEFAULT_CONCURRENCY = 16
+
+# Default max difference (points, 0-10 scale) for batched vs. single scores to "agree"
+DEFAULT_BATCH_TOLERANCE = 1.0
+
+INPUT_PROMPTS_FILE = "input-prompts.csv"
+BOT_RESPONSES_DIR = "bot_responses"
+# The only fields of a saved response the evaluation reads ('query' pairs it with its prompt)
+RESPONSE_FIELDS = ('query', 'response')
+# Whose responses are the ground truth
+ACTUAL_CLAUDE_BOT = "ActualClaude"
+
+MAX_EVALUATION_TOKENS = 4000
+
+# Output token cap of one batched judge call (--batch-size): every response
+# in a batch gets its own MAX_EVALUATION_TOKENS (COMPACT_MAX_TOKENS), and
+# deployments reject larger max_tokens (gpt-4o allows 16,384)
+MAX_BATCH_OUTPUT_TOKENS = 16384
+
+# Marks the judge cache key stamped on a result saved before the judge cache
+# (adopt_legacy_result): the rubric and judge that scored it are unknown
+LEGACY_KEY_PREFIX = "legacy:"
+
+# Sampling parameters for every judge call (also part of the judge cache key)
+JUDGE_SAMPLING_PARAMS = {
+    "temperature": 0.0,
+    "max_tokens": MAX_EVALUATION_TOKENS,
+    "response_format": {"type": "json_object"},
+}
+
+# What the two rubrics differ in, keyed by whether they use ground truth:
+# - prompt_file: the rubric (judge system prompt)
+# - output_dir: run name of the results in the results store
+# - schema_name: name of the output schema in JSON Schema mode (--structured-output)
+# - narrative_fields: narrative fields of the output format (judge_schema adds
+#   the scores and bullet_point_analysis)
+# - standard: what the request asks the judge to evaluate against
+Rubric = namedtuple('Rubric', ['prompt_file', 'output_dir', 'schema_name', 'narrative_fields', 'standard'])
+RUBRICS = {
+    True: Rubric(
+        prompt_file="Teen Support Bot Tone Evaluator.md",
+        output_dir="evaluation_results",
+        schema_name="evaluation_with_ground_truth",
+        narrative_fields={
+            "strengths": STRING_LIST,
+            "weaknesses": STRING_LIST,
+            "most_claude_like": STRING,
+            "least_claude_like": STRING,
+            "key_differences_from_ground_truth": STRING_LIST,
+        },
+        standard="Claude's character as defined, using the Ground Truth as a reference",
+    ),
+    False: Rubric(
+        prompt_file="Teen Support Bot Tone Evaluator - No Ground Truth.md",
+        output_dir="evaluation_results_no_gt",
+        schema_name="evaluation_no_ground_truth",
+        narrative_fields={
+            "strengths": STRING_LIST,
+            "weaknesses": STRING_LIST,
+            "most_ideal_aspect": STRING,
+            "least_ideal_aspect": STRING,
+            "specific_feedback": STRING_LIST,
+        },
+        standard="the ideal teen support bot character as defined in your instructions",
+    ),
+}
+
+# Compact (--compact) judge output: scores plus short codes for the main
+# deductions instead of the narrative fields
+COMPACT_MAX_TOKENS = 300
+RATIONALE_CODES = {
+    "OK": "no major issues",
+    "COLD": "little emotional validation",
+    "BULLETS": "list-heavy or over-formatted",
+    "EMOJI": "too many or badly placed emoji",
+    "FORMAL": "stiff, impersonal or cringey tone",
+    "VAGUE": "generic or unrealistic advice",
+    "NO_FOLLOWUP": "missing or generic follow-up question",
+    "IMBALANCED": "all advice or all validation",
+    "LONG": "too long or repetitive",
+    "SHORT": "too short",
+}
+COMPACT_INSTRUCTIONS = (
+    "Use the COMPACT output format instead of the full one: return only the requested "
+    "scores (overall_score unless told to omit it, and dimension_scores) plus \"rationale\" "
+    "(no strengths, weaknesses, aspects, "
+    "bullet_point_analysis or feedback). \"rationale\" is a comma-separated list of up to 3 "
+    "codes for the main deductions, from: "
+    + ", ".join(f"{code} ({meaning})" for code, meaning in RATIONALE_CODES.items()) + "."
+)
+
+
+def is_verbose_sample(user_query: str, fraction: float) -> bool:
+    """
+    Whether a query gets the full narrative evaluation in compact mode
+    Chosen by a hash of the query text, so every bot and every run gets the
+    full narrative for the same queries
+    """
+    if fraction <= 0:
+        return False
+    digest = hashlib.sha256(user_query.encode('utf-8')).hexdigest()
+    return int(digest[:8], 16) / 0x100000000 < fraction
+
+
+def judge_key_params(batched: bool, local_scoring: bool, compact: bool, dual: bool = False) -> Dict[str, Any]:
+    """
+    Judge cache key params for a judging mode
+    Each mode is cached separately, but a saved result from any mode counts as
+    up to date, so switching modes doesn't re-evaluate existing results
+    """
+    params = dict(JUDGE_SAMPLING_PARAMS)
+    if batched:
+        params["batched"] = True
+    if local_scoring:
+        params["local_scoring"] = LOCAL_SCORER_VERSION
+    if compact:
+        params["compact"] = True
+        params["max_tokens"] = COMPACT_MAX_TOKENS
+    if dual:
+        params["dual"] = True  # scored alongside the other rubric (evaluate_dual_rubric.py)
+    return params
+
+
+def max_batch_responses(compact: bool) -> int:
+    """Most responses one batched judge call can score within MAX_BATCH_OUTPUT_TOKENS"""
+    per_response = COMPACT_MAX_TOKENS if compact else MAX_EVALUATION_TOKENS
+    return max(1, MAX_BATCH_OUTPUT_TOKENS // per_response)
+
+
+def get_bot_file_path(bot_name: str) -> str:
+    """Get the response file path for a given bot name"""
+    return f"{BOT_RESPONSES_DIR}/Output - {bot_name} Responses.jsonl"
+
+
+def load_evaluation_prompt(ground_truth: bool) -> str:
+    """Load a rubric's evaluation prompt from its markdown file"""
+    with open(RUBRICS[ground_truth].prompt_file, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def load_prompts() -> List[str]:
+    """Load user prompts from the response dataset if it's built and current, else from CSV"""
+    dataset = open_dataset()
+    if dataset:
+        return dataset.prompts()
+    prompts = []
+    with open(INPUT_PROMPTS_FILE, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            prompts.append(row['userQuery'])
+    return prompts
+
+
+def load_jsonl(filepath: str) -> Iterator[Dict[str, Any]]:
+    """Stream responses from a JSONL file, decoding only RESPONSE_FIELDS (not _trace)"""
+    return iter_jsonl_fields(filepath, RESPONSE_FIELDS)
+
+
+def load_bot_responses(bot_name: str, prompts: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """
+    A bot's response to each prompt (None where it has none), from the response
+    dataset if it has the bot, else from its JSONL file
+    Responses are matched to prompts by query, not by line; exits if one has no query.
+    """
+    dataset = open_dataset()
+    if dataset and dataset.has_bot(bot_name):
+        entries = dataset.iter_responses(bot_name)
+    else:
+        entries = load_jsonl(get_bot_file_path(bot_name))
+    try:
+        return align_responses(prompts, entries)
+    except ValueError as e:
+        print(f"\nError: {get_bot_file_path(bot_name)}: {e}")
+        sys.exit(1)
+
+
+def ground_truth_section(ground_truth: Optional[str]) -> str:
+    """The ground truth part of an evaluation request (empty for the rubric without it)"""
+    if ground_truth is None:
+        return ""
+    return f"""**Ground Truth Response (Claude's actual response):**
+{ground_truth}
+
+"""
+
+
+def create_evaluation_request(
+    user_query: str,
+    ground_truth: Optional[str],
+    response_to_evaluate: str,
+    subjective_only: bool = False,
+    compact: bool = False
+) -> str:
+    """Create the full evaluation request text (no ground truth section when ground_truth is None)"""
+    reference = ground_truth_section(ground_truth)
+    standard = RUBRICS[ground_truth is not None].standard
+    request = f"""**User Query:**
+{user_query}
+
+{reference}**Response to Evaluate:**
+{response_to_evaluate}
+
+---
+
+Please evaluate the "Response to Evaluate" against {standard}. Return your evaluation ONLY as valid JSON in the exact format specified. Do not include any text before or after the JSON."""
+    if subjective_only:
+        request += "\n\n" + SUBJECTIVE_ONLY_INSTRUCTIONS
+    if compact:
+        request += "\n\n" + COMPACT_INSTRUCTIONS
+    return request
+
+
+def create_batch_evaluation_request(
+    user_query: str,
+    ground_truth: Optional[str],
+    responses_to_evaluate: List[str],
+    subjective_only: bool = False,
+    compact: bool = False
+) -> str:
+    """Create one evaluation request for several responses to the same query"""
+    count = len(responses_to_evaluate)
+    sections = "\n\n".join(
+        f"**Response {n} to Evaluate:**\n{response}"
+        for n, response in enumerate(responses_to_evaluate, 1)
+    )
+    reference = ground_truth_section(ground_truth)
+    standard = RUBRICS[ground_truth is not None].standard
+    request = f"""**User Query:**
+{user_query}
+
+{reference}{sections}
+
+---
+
+Please evaluate each of the {count} responses independently against {standard}. Do not compare the responses with each other; score each one exactly as you would if it were the only response. Return ONLY valid JSON of the form {{"evaluations": [...]}} containing exactly {count} evaluations in response order, each in the exact format specified plus a "response_number" field (1 to {count}). Do not include any text before or after the JSON."""
+    if subjective_only:
+        request += "\n\n" + SUBJECTIVE_ONLY_INSTRUCTIONS
+    if compact:
+        request += "\n\n" + COMPACT_INSTRUCTIONS
+    return request
+
+
+def extract_json_from_response(response_text: str) -> Optional[str]:
+    """Extract JSON from response with multiple fallback strategies"""
+    if not response_text:
+        return None
+
+    # Strategy 1: Look for ```json code blocks
+    if "```json" in response_text:
+        json_start = response_text.find("```json") + 7
+        json_end = response_text.find("```", json_start)
+        if json_end != -1:
+            return response_text[json_start:json_end].strip()
+
+    # Strategy 2: Look for any ``` code blocks
+    if "```" in response_text:
+        json_start = response_text.find("```") + 3
+        # Skip language identifier if present
+        newline = response_text.find('\n', json_start)
+        if newline != -1:
+            json_start = newline + 1
+        json_end = response_text.find("```", json_start)
+        if json_end != -1:
+            return response_text[json_start:json_end].strip()
+
+    # Strategy 3: From the first { on (parse_json_robust ignores text after the
+    # object and keeps replies cut off before the last })
+    start = response_text.find('{')
+    if start != -1:
+        return response_text[start:].strip()
+
+    # Strategy 4: Use the whole response
+    return response_text.strip()
+
+
+def parse_json_robust(json_str: str, subjective_only: bool = False) -> Dict[str, Any]:
+    """
+    Parse the judge's JSON, recovering what it can from malformed or cut-off output
+    Repaired evaluations record what was fixed under "json_recovery" and only get
+    a parse_warning when some of their scores couldn't be recovered (those are
+    left out rather than guessed)
+    """
+    try:
+        return json.loads(json_str)
+    except json.JSONDecodeError:
+        pass
+
+    evaluation, report = recover_json(json_str)
+    if not isinstance(evaluation, dict):
+        return {
+            "overall_score": 0.0,
+            "dimension_scores": {},
+            "error": "JSON parse failed completely: no JSON object in response"
+        }
+
+    missing = unrecovered_scores(evaluation, report, JUDGE_DIMENSIONS if subjective_only else DIMENSIONS,
+                                 expect_overall=not subjective_only)
+    if report["repairs"] or report["truncated_at"] is not None:
+        evaluation["json_recovery"] = report
+    if missing:
+        # A score cut off mid-number can't be trusted; the schema check asks for it again
+        dimension_scores = evaluation.get('dimension_scores')
+        for name in missing:
+            if name == 'overall_score':
+                evaluation.pop('overall_score', None)
+            elif isinstance(dimension_scores, dict):
+                dimension_scores.pop(name, None)
+        evaluation["parse_warning"] = f"JSON was malformed, scores not recovered: {', '.join(missing)}"
+    return evaluation
+
+
+def parse_batch_evaluations(json_str: str, count: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Split a batched judge reply into per-response evaluations
+    Returns None if the reply doesn't hold exactly `count` evaluations
+    """
+    try:
+        parsed, report = json.loads(json_str), None
+    except json.JSONDecodeError:
+        parsed, report = recover_json(json_str)
+
+    path = []
+    if isinstance(parsed, dict):
+        parsed, path = parsed.get('evaluations'), ['evaluations']
+    if not isinstance(parsed, list) or len(parsed) != count:
+        return None
+    if not all(isinstance(item, dict) and 'dimension_scores' in item for item in parsed):
+        return None
+    if report:
+        # A reply cut off in the middle of a response's scores is retried per response
+        if not all(is_complete(report, path + [i, 'dimension_scores'])
+                   and is_complete(report, path + [i, 'overall_score']) for i in range(count)):
+            return None
+        parsed = [{**item, "json_recovery": report} for item in parsed]
+
+    # Map back by response_number when the judge reordered its answers
+    numbers = [item.get('response_number') for item in parsed]
+    if all(isinstance(number, int) for number in numbers) and sorted(numbers) == list(range(1, count + 1)):
+        parsed = sorted(parsed, key=lambda item: item['response_number'])
+    return parsed
+
+
+async def evaluate_response(
+    client,
+    evaluation_prompt: str,
+    user_query: str,
+    ground_truth: Optional[str],
+    response_to_evaluate: str,
+    deployment_name: str,
+    limiter: RateLimiter,
+    subjective_only: bool = False,
+    compact: bool = False,
+    checker: Optional[SchemaChecker] = None
+) -> Tuple[Dict[str, Any], Optional[Dict[str, int]]]:
+    """
+    Call the judge to evaluate a single response against the rubric in
+    `evaluation_prompt` (ground_truth is ActualClaude's response, or None for
+    the rubric without ground truth)
+    Returns (parsed JSON evaluation, token usage); missing or invalid scores are
+    asked for again in a short follow-up turn (judge_schema.py)
+    """
+    rubric = RUBRICS[ground_truth is not None]
+    evaluation_request = create_evaluation_request(
+        user_query,
+        ground_truth,
+        response_to_evaluate,
+        subjective_only,
+        compact
+    )
+    max_tokens = COMPACT_MAX_TOKENS if compact else MAX_EVALUATION_TOKENS
+
+    checker = checker or SchemaChecker()
+    schema = evaluation_schema(rubric.narrative_fields, subjective_only, compact)
+    complete = judge_completion(client, deployment_name, limiter, JUDGE_SAMPLING_PARAMS)
+    messages = [
+        {"role": "system", "content": evaluation_prompt},
+        {"role": "user", "content": evaluation_request}
+    ]
+
+    try:
+        # Deterministic evaluation, forced JSON (or JSON Schema) mode
+        response = await checker.create(complete, messages, schema, rubric.schema_name, max_tokens)
+        usage = prompt_cache_usage(response)
+
+        response_text = response.choices[0].message.content
+
+        if not response_text:
+            return {
+                "overall_score": 0.0,
+                "dimension_scores": {},
+                "error": "Empty response from API"
+            }, usage
+
+        json_str = extract_json_from_response(response_text)
+
+        if not json_str:
+            return {
+                "overall_score": 0.0,
+                "dimension_scores": {},
+                "error": "Could not extract JSON from response"
+            }, usage
+
+        evaluation = parse_json_robust(json_str, subjective_only)
+        evaluation = await checker.check(evaluation, schema, rubric.schema_name, complete, messages, response_text)
+        return evaluation, usage
+
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        print(f"Error evaluating response: {e}")
+        return {
+            "overall_score": 0.0,
+            "dimension_scores": {},
+            "error": str(e)
+        }, None
+
+
+async def evaluate_response_batch(
+    client,
+    evaluation_prompt: str,
+    user_query: str,
+    ground_truth: Optional[str],
+    responses_to_evaluate: List[str],
+    deployment_name: str,
+    limiter: RateLimiter,
+    subjective_only: bool = False,
+    compact: bool = False,
+    checker: Optional[SchemaChecker] = None
+) -> List[Tuple[Dict[str, Any], Optional[Dict[str, int]]]]:
+    """
+    Evaluate several responses to the same query in one API call
+    The rubric, query and ground truth are sent once instead of once per response.
+    Returns (evaluation, token usage) per response; a batched call's usage is
+    split evenly between its responses, so summing over results counts it
+    once. Falls back to one call per response if the batched reply can't be
+    split, and for responses whose scores are missing; their usage includes
+    their share of the batched call. More responses than fit in
+    MAX_BATCH_OUTPUT_TOKENS are judged in several smaller batches.
+    """
+    limit = max_batch_responses(compact)
+    if len(responses_to_evaluate) > limit:
+        results = []
+        for start in range(0, len(responses_to_evaluate), limit):
+            results.extend(await evaluate_response_batch(
+                client, evaluation_prompt, user_query, ground_truth, responses_to_evaluate[start:start + limit],
+                deployment_name, limiter, subjective_only, compact, checker))
+        return results
+
+    rubric = RUBRICS[ground_truth is not None]
+    evaluation_request = create_batch_evaluation_request(user_query, ground_truth, responses_to_evaluate,
+                                                          subjective_only, compact)
+    max_tokens = (COMPACT_MAX_TOKENS if compact else MAX_EVALUATION_TOKENS) * len(responses_to_evaluate)
+
+    usage = None
+    try:
+        estimated = estimate_tokens(evaluation_prompt + evaluation_request) + max_tokens
+        response = await call_with_retry(
+            limiter,
+            client.chat.completions.with_raw_response.create,
+            estimated,
+            model=deployment_name,
+            messages=[
+                {"role": "system", "content": evaluation_prompt},
+                {"role": "user", "content": evaluation_request}
+            ],
+            **{**JUDGE_SAMPLING_PARAMS, "max_tokens": max_tokens}
+        )
+        usage = prompt_cache_usage(response)
+        if usage:
+            usage["batch_size"] = len(responses_to_evaluate)
+
+        response_text = response.choices[0].message.content
+        json_str = extract_json_from_response(response_text) if response_text else None
+        evaluations = parse_batch_evaluations(json_str, len(responses_to_evaluate)) if json_str else None
+        if evaluations is not None:
+            checker = checker or SchemaChecker()
+            schema = evaluation_schema(rubric.narrative_fields, subjective_only, compact)
+            results = []
+            shares = split_usage(usage, len(responses_to_evaluate))
+            for evaluation, response_to_evaluate, share in zip(evaluations, responses_to_evaluate, shares):
+                evaluation.pop('response_number', None)
+                if any(is_score_problem(problem) for problem in schema_problems(evaluation, schema)):
+                    # Field repair needs the single-response conversation
+                    evaluation, single_usage = await evaluate_response(
+                        client, evaluation_prompt, user_query, ground_truth, response_to_evaluate,
+                        deployment_name, limiter, subjective_only, compact, checker)
+                    results.append((evaluation, combine_usage(share, single_usage)))
+                else:
+                    results.append((await checker.check(evaluation, schema, rubric.schema_name), share))
+            return results
+
+        print(f"Batched evaluation could not be split, evaluating {len(responses_to_evaluate)} responses one by one")
+
+    except CircuitOpenError:
+        raise
+    except Exception as e:
+        print(f"Error in batched evaluation, evaluating one by one: {e}")
+
+    results = []
+    for response_to_evaluate, share in zip(responses_to_evaluate, split_usage(usage, len(responses_to_evaluate))):
+        evaluation, single_usage = await evaluate_response(
+            client, evaluation_prompt, user_query, ground_truth, response_to_evaluate,
+            deployment_name, limiter, subjective_only, compact, checker)
+        results.append((evaluation, combine_usage(share, single_usage)))
+    return results
+
+
+def save_individual_result(
+    store: ResultsStore,
+    run: str,
+    bot_name: str,
+    query_index: int,
+    user_query: str,
+    evaluation: Dict[str, Any],
+    cache_key: Optional[str] = None,
+    usage: Optional[Dict[str, int]] = None
+):
+    """Save individual evaluation result to a run of the results store"""
+    result = {
+        "bot_name": bot_name,
+        "query_index": query_index,
+        "user_query": user_query,
+        "evaluation": evaluation
+    }
+    if cache_key:
+        result["cache_key"] = cache_key
+    if usage:
+        result["usage"] = usage
+
+    store.put(run, result)
+
+
+def check_already_evaluated(manifest: Manifest, bot_name: str, query_index: int) -> bool:
+    """Check if this bot/query combo has already been evaluated"""
+    return (bot_name, query_index) in manifest
+
+
+def get_result_cache_key(manifest: Manifest, bot_name: str, query_index: int) -> Optional[str]:
+    """Judge cache key recorded in a saved result (None for results saved before the cache, see is_legacy_key)"""
+    status = manifest.get((bot_name, query_index))
+    return status['cache_key'] if status else None
+
+
+def is_legacy_key(stored_key: Optional[str]) -> bool:
+    """Whether a saved result predates the judge cache (no key, or one stamped by adopt_legacy_result)"""
+    return stored_key is None or stored_key.startswith(LEGACY_KEY_PREFIX)
+
+
+def judged_key(stored_key: str) -> str:
+    """The judge cache key a saved result is checked against (without LEGACY_KEY_PREFIX)"""
+    return stored_key[len(LEGACY_KEY_PREFIX):] if stored_key.startswith(LEGACY_KEY_PREFIX) else stored_key
+
+
+def adopt_legacy_result(store: ResultsStore, run: str, bot_name: str, query_index: int, cache_key: str) -> str:
+    """
+    Stamp a result saved before the judge cache with the current key
+    The rubric and judge that scored it weren't recorded, so it's kept as
+    current once; from then on a rubric, response or judge change makes it
+    stale like any other result. The stamp stays marked (LEGACY_KEY_PREFIX)
+    so --recheck-legacy can still find it. Returns the stamped key.
+    """
+    result = store.get(run, bot_name, query_index)
+    result['cache_key'] = LEGACY_KEY_PREFIX + cache_key
+    store.put(run, result)
+    return result['cache_key']
+
+
+def check_evaluation_failed(manifest: Manifest, bot_name: str, query_index: int) -> bool:
+    """Check if an evaluation exists but failed (has error or overall_score = 0)"""
+    status = manifest.get((bot_name, query_index))
+    if status is None:
+        return False
+    return status['error'] is not None or not status['overall_score']
+
+
+def group_jobs_by_query(jobs: List[Dict[str, Any]], batch_size: int) -> List[List[Dict[str, Any]]]:
+    """
+    Split jobs into batches of up to `batch_size` that share a query
+    Order within each batch is shuffled (seeded by the query) so no bot is
+    always shown to the judge first. Batches are kept small enough for the
+    judge's reply to fit in MAX_BATCH_OUTPUT_TOKENS.
+    """
+    by_query: Dict[int, List[Dict[str, Any]]] = {}
+    for job in jobs:
+        by_query.setdefault(job['query_index'], []).append(job)
+
+    batches = []
+    for query_index, query_jobs in by_query.items():
+        query_jobs = list(query_jobs)
+        random.Random(query_index).shuffle(query_jobs)
+        # Jobs for the same query share the compact setting (is_verbose_sample)
+        size = min(batch_size, max_batch_responses(query_jobs[0].get('compact', False)))
+        for start in range(0, len(query_jobs), size):
+            batches.append(query_jobs[start:start + size])
+    return batches
+
+
+async def run_evaluation_queue(
+    jobs: List[Dict[str, Any]],
+    evaluate_job: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+    save_job: Callable[[Dict[str, Any], Dict[str, Any]], None],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    status: Optional[Callable[[], str]] = None,
+    evaluate_batch: Optional[Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]]] = None,
+    batch_size: int = 1
+) -> Dict[str, int]:
+    """
+    Evaluate all jobs with at most `concurrency` judge calls in flight
+
+    Each job is a dict with at least 'bot_name', 'query_index' and
+    'user_query'. `evaluate_job` returns the evaluation dict for a job and
+    `save_job` persists it. `status` (e.g. RateLimiter.status) is appended
+    to each progress line. Returns the number of evaluated jobs per bot.
+
+    With `evaluate_batch` and batch_size > 1, jobs sharing a query are
+    judged together; `evaluate_batch` returns one evaluation per job.
+
+    If the endpoint goes down for good (CircuitOpenError), the remaining
+    jobs are left unevaluated rather than saved as zero-score failures.
+    """
+    if evaluate_batch and batch_size > 1:
+        batches = group_jobs_by_query(jobs, batch_size)
+    else:
+        batches = [[job] for job in jobs]
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for batch in batches:
+        queue.put_nowait(batch)
+
+    total = len(jobs)
+    done = 0
+    evaluated_by_bot: Dict[str, int] = {}
+    start_time = time.monotonic()
+    endpoint_down = False
+
+    async def process(batch: List[Dict[str, Any]]):
+        nonlocal done, endpoint_down
+        try:
+            if len(batch) > 1:
+                evaluations = await evaluate_batch(batch)
+            else:
+                evaluations = [await evaluate_job(batch[0])]
+        except CircuitOpenError:
+            endpoint_down = True
+            return
+        except Exception as e:
+            print(f"Error evaluating query {batch[0]['query_index']}: {e}")
+            evaluations = [{
+                "overall_score": 0.0,
+                "dimension_scores": {},
+                "error": str(e)
+            } for _ in batch]
+
+        for job, evaluation in zip(batch, evaluations):
+            save_job(job, evaluation)
+
+            done += 1
+            bot_name = job['bot_name']
+            evaluated_by_bot[bot_name] = evaluated_by_bot.get(bot_name, 0) + 1
+            outcome = "error" if 'error' in evaluation else f"{evaluation.get('overall_score', 0)}"
+            state = f" [{status()}]" if status else ""
+            print(f"   [{done}/{total}]{state} {bot_name} query {job['query_index']} ({outcome}): "
+                  f"{job['user_query'][:50]}...")
+
+    async def worker():
+        while not endpoint_down:
+            try:
+                batch = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await process(batch)
+
+    # One call first so the rubric prefix is in the provider's prompt cache
+    # before the other workers start
+    if batches:
+        await process(queue.get_nowait())
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, min(concurrency, len(batches))))]
+    await asyncio.gather(*workers)
+
+    if endpoint_down:
+        print(f"\n✗ Stopped early: judge endpoint is down. {total - done} evaluations were not run;"
+              f" re-run the same command to continue.")
+
+    if done:
+        elapsed = time.monotonic() - start_time
+        calls = f" in {len(batches)} judge calls" if len(batches) != total else ""
+        print(f"\n   Finished {done} evaluations{calls} in {elapsed:.1f}s "
+              f"({done / elapsed if elapsed > 0 else 0:.2f}/s)")
+
+    return evaluated_by_bot
+
+
+async def run_batch_agreement_check(
+    jobs: List[Dict[str, Any]],
+    evaluate_job: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]],
+    evaluate_batch: Callable[[List[Dict[str, Any]]], Awaitable[List[Dict[str, Any]]]],
+    batch_size: int,
+    sample_queries: int,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    tolerance: float = DEFAULT_BATCH_TOLERANCE,
+    seed: int = 0
+) -> bool:
+    """
+    Judge a sample of queries both one-by-one and batched, and report how
+    closely the scores agree. Nothing is saved. Returns True if the mean
+    absolute difference of every score is within `tolerance`.
+    """
+    batches = [batch for batch in group_jobs_by_query(jobs, batch_size) if len(batch) > 1]
+    random.Random(seed).shuffle(batches)
+    batches = batches[:sample_queries]
+    if not batches:
+        print("Nothing to compare: need at least two bots with responses for the same query")
+        return False
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(coroutine):
+        async with semaphore:
+            return await coroutine
+
+    pairs = []
+
+    async def compare(batch):
+        singles = await asyncio.gather(*(limited(evaluate_job(job)) for job in batch))
+        batched = await limited(evaluate_batch(batch))
+        for single, together in zip(singles, batched):
+            if 'error' not in single and 'error' not in together:
+                pairs.append((single, together))
+
+    print(f"Comparing single vs. batched judging on {len(batches)} queries "
+          f"({sum(len(b) for b in batches)} responses)...")
+    await asyncio.gather(*(compare(batch) for batch in batches))
+
+    if not pairs:
+        print("No successful evaluation pairs to compare")
+        return False
+
+    def score(evaluation: Dict[str, Any], name: str) -> Optional[float]:
+        value = evaluation.get(name) if name == 'overall_score' else evaluation.get('dimension_scores', {}).get(name)
+        return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+    print(f"\n{'Score':30s} {'Mean |diff|':>12s} {'Max |diff|':>11s} {'Within tol.':>12s} {'Pairs':>6s}")
+    print("-" * 75)
+    agrees = True
+    for name in ['overall_score'] + DIMENSIONS:
+        # A score missing on either side isn't a disagreement; leave that pair out for this score
+        scored = [(score(single, name), score(together, name)) for single, together in pairs]
+        diffs = [abs(alone - batched) for alone, batched in scored if alone is not None and batched is not None]
+        if not diffs:
+            print(f"{name:30s} {'-':>12s} {'-':>11s} {'-':>12s} {0:6d}")
+            continue
+        mean_diff = sum(diffs) / len(diffs)
+        within = sum(1 for d in diffs if d <= tolerance) / len(diffs)
+        agrees = agrees and mean_diff <= tolerance
+        print(f"{name:30s} {mean_diff:12.2f} {max(diffs):11.2f} {within:11.0%} {len(diffs):6d}")
+
+    verdict = "AGREE" if agrees else "DISAGREE"
+    print(f"\nBatched and single scores {verdict} (tolerance {tolerance} points, {len(pairs)} pairs)")
+    return agrees
+
+
+def run_evaluator(ground_truth: bool, create_client: Callable[[], Tuple[Any, str]], description: str):
+    """
+    Command-line evaluation pipeline shared by the two single-rubric evaluators
+    ground_truth picks the rubric (judged against ActualClaude's responses or
+    against the rubric alone); create_client returns (client, deployment name)
+    and exits if the endpoint isn't configured.
+    """
+    rubric = RUBRICS[ground_truth]
+    output_dir = rubric.output_dir
+    parser = argparse.ArgumentParser(
+        description=description,
+        epilog="Bot names should match the response file: bot_responses/Output - <bot_name> Responses.jsonl"
+    )
+    parser.add_argument('bot_names', nargs='+', metavar='bot_name',
+                        help='Bot(s) to evaluate (e.g., KimiBotTuned)')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help='Only re-evaluate queries that failed previously')
+    parser.add_argument('--concurrency', '-c', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Maximum judge calls in flight; the actual limit adapts below this (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help='Judge up to this many bots\' responses to the same query in one call (default: 1, off)')
+    parser.add_argument('--batch-check', type=int, metavar='N',
+                        help='Compare batched vs. single-response scores on N sampled queries, save nothing and exit')
+    parser.add_argument('--batch-tolerance', type=float, default=DEFAULT_BATCH_TOLERANCE,
+                        help=f'Max mean score difference for --batch-check to pass (default: {DEFAULT_BATCH_TOLERANCE})')
+    parser.add_argument('--local-scoring', action='store_true',
+                        help='Score prose vs. bullets, emoji and length locally; the judge scores only the subjective dimensions')
+    parser.add_argument('--compact', action='store_true',
+                        help='Ask the judge for scores and rationale codes only, not the narrative fields')
+    parser.add_argument('--verbose-sample', type=float, default=0.0, metavar='FRACTION',
+                        help='With --compact, fraction of queries that still get the full narrative (default: 0)')
+    parser.add_argument('--surrogate', action='store_true',
+                        help='Predict scores with the offline surrogate judge (python surrogate_judge.py train) '
+                             'instead of calling the judge; nothing is saved')
+    parser.add_argument('--recheck-legacy', action='store_true',
+                        help='Re-evaluate results saved before the judge cache, whose rubric and judge are unknown')
+    add_rate_limit_arguments(parser)
+    add_cache_arguments(parser)
+    add_store_arguments(parser)
+    add_adaptive_arguments(parser)
+    add_cascade_arguments(parser)
+    add_schema_arguments(parser)
+    args = parser.parse_args()
+    if args.adaptive and (args.retry_failed or args.batch_size > 1 or args.batch_check):
+        parser.error("--adaptive can't be combined with --retry-failed, --batch-size or --batch-check")
+    if args.cascade and (args.batch_size > 1 or args.batch_check):
+        parser.error("--cascade can't be combined with --batch-size or --batch-check")
+
+    if args.surrogate:
+        if not SURROGATE_AVAILABLE:
+            print("Error: --surrogate requires numpy. Run: pip install numpy")
+            sys.exit(1)
+        sys.exit(prescreen(args.bot_names, output_dir))
+
+    bot_names = args.bot_names
+    retry_failed_only = args.retry_failed
+    batch_size = max(1, args.batch_size)
+    if args.batch_check and batch_size == 1:
+        batch_size = len(bot_names)
+
+    mode = "RETRY FAILED" if retry_failed_only else "ADAPTIVE" if args.adaptive else "FULL"
+    print(f"Evaluating: {', '.join(bot_names)} (Mode: {mode}{'' if ground_truth else ', NO GROUND TRUTH'})")
+    print("=" * 80)
+
+    client, deployment_name = create_client()
+    limiter = rate_limiter_from_args(args, args.concurrency)
+    print(f"Concurrency: {args.concurrency}")
+    if batch_size > 1:
+        print(f"Batching: up to {batch_size} responses per judge call")
+        if batch_size > max_batch_responses(False):
+            print(f"   (at most {max_batch_responses(False)} with the full narrative, "
+                  f"to keep replies within {MAX_BATCH_OUTPUT_TOKENS:,} output tokens)")
+    if args.local_scoring:
+        print("Local scoring: prose_vs_bullets, emoji_usage, length_conciseness (judge scores the rest)")
+    if args.compact:
+        print(f"Compact output: scores and rationale codes ({args.verbose_sample:.0%} of queries get the full narrative)")
+    if args.cascade:
+        print(f"Judge cascade: {args.cascade} scores first, uncertain responses go to {deployment_name}")
+    if args.structured_output:
+        print("Structured output: the rubric's output schema is sent as a JSON Schema response_format")
+    print(f"Rate limits: {limiter.describe()}")
+
+    # Create output directories
+    Path(output_dir).mkdir(exist_ok=True)
+
+    # Check that every bot file exists before starting
+    for bot_name in bot_names:
+        bot_file = get_bot_file_path(bot_name)
+        if not os.path.exists(bot_file):
+            print(f"\nError: Response file not found: {bot_file}")
+            print(f"\nMake sure the file exists in the bot_responses/ directory")
+            print(f"Expected file: {bot_file}")
+            sys.exit(1)
+
+    # Load data
+    print("\nLoading data...")
+    evaluation_prompt = load_evaluation_prompt(ground_truth)
+    prompts = load_prompts()
+    print(f"   - {len(prompts)} prompts loaded")
+    # ActualClaude's responses are the reference for the ground truth rubric
+    actual_claude = load_bot_responses(ACTUAL_CLAUDE_BOT, prompts) if ground_truth else [None] * len(prompts)
+    store = results_store_from_args(args)
+    ensure_imported(store, output_dir)
+    # Every skip/retry decision below is made from this one scan
+    manifest = store.manifest(output_dir)
+
+    all_key_params = [judge_key_params(*mode) for mode in itertools.product((False, True), repeat=4)]
+    # Results kept from the cascade's cheap judge are only current in cascade runs
+    judge_models = [deployment_name] + ([args.cascade] if args.cascade else [])
+
+    # Queue every (bot, query) pair that needs evaluating
+    jobs = []
+    check_jobs = []
+    skipped_by_bot = {}
+    observed = {}  # Overall scores of saved results, for --adaptive
+    cached_by_bot = {}
+    stale_count = 0
+    adopted_count = 0
+    legacy_count = 0
+    judge_cache = judge_cache_from_args(args)
+    cascade = judge_cascade_from_args(args, deployment_name, judge_cache)
+    checker = schema_checker_from_args(args)
+
+    for bot_name in bot_names:
+        bot_responses = load_bot_responses(bot_name, prompts)
+        print(f"   - {sum(entry is not None for entry in bot_responses)} {bot_name} responses")
+
+        skipped_count = 0
+        cached_count = 0
+        errored_count = 0
+        missing_count = 0
+        for i, (prompt, actual, bot_resp) in enumerate(zip(prompts, actual_claude, bot_responses)):
+            query_idx = i + 1
+            if bot_resp is None or (ground_truth and actual is None):
+                missing_count += 1
+                continue
+
+            # Failed gather calls aren't worth a judge call
+            if is_error_response(bot_resp) or (ground_truth and is_error_response(actual)):
+                errored_count += 1
+                continue
+
+            reference = actual['response'] if ground_truth else None
+            compact = args.compact and not is_verbose_sample(prompt, args.verbose_sample)
+            cache_key = judge_cache_key(
+                evaluation_prompt, prompt, reference, bot_resp['response'],
+                deployment_name, judge_key_params(batch_size > 1, args.local_scoring, compact)
+            )
+
+            job = {
+                "bot_name": bot_name,
+                "query_index": query_idx,
+                "user_query": prompt,
+                "ground_truth": reference,
+                "response": bot_resp['response'],
+                "cache_key": cache_key,
+                "compact": compact
+            }
+            if cascade:
+                job["cheap_key"] = judge_cache_key(
+                    evaluation_prompt, prompt, reference, bot_resp['response'],
+                    args.cascade, judge_key_params(False, args.local_scoring, compact)
+                )
+            if args.batch_check:
+                check_jobs.append(job)
+                continue
+
+            # Check skip conditions
+            if retry_failed_only:
+                # Only process if it failed
+                if not check_evaluation_failed(manifest, bot_name, query_idx):
+                    skipped_count += 1
+                    continue
+            else:
+                # Skip if already evaluated successfully from the same inputs
+                if check_already_evaluated(manifest, bot_name, query_idx) and not check_evaluation_failed(manifest, bot_name, query_idx):
+                    stored_key = get_result_cache_key(manifest, bot_name, query_idx)
+                    if stored_key is None and not args.recheck_legacy:
+                        stored_key = adopt_legacy_result(store, output_dir, bot_name, query_idx, cache_key)
+                        adopted_count += 1
+                    if args.recheck_legacy and is_legacy_key(stored_key):
+                        legacy_count += 1
+                    # The current mode's key first; other modes' keys only if needed
+                    elif judged_key(stored_key) == cache_key or any(
+                        judged_key(stored_key) == judge_cache_key(evaluation_prompt, prompt, reference,
+                                                                  bot_resp['response'], model, params)
+                        for model in judge_models for params in all_key_params
+                    ):
+                        observed.setdefault(bot_name, []).append(manifest[(bot_name, query_idx)]['overall_score'])
+                        skipped_count += 1
+                        continue
+                    else:
+                        stale_count += 1
+
+            # Same inputs judged before (possibly for another bot or run)
+            cached = judge_cache.get(cache_key) if judge_cache else None
+            if cached is not None:
+                save_individual_result(store, output_dir, bot_name, query_idx, prompt, cached, cache_key)
+                observed.setdefault(bot_name, []).append(cached.get('overall_score', 0))
+                cached_count += 1
+                continue
+
+            jobs.append(job)
+
+        skipped_by_bot[bot_name] = skipped_count
+        cached_by_bot[bot_name] = cached_count
+        reference_note = " (or ground truth)" if ground_truth else ""
+        if missing_count:
+            print(f"   ⚠ {missing_count} prompts have no {bot_name} response{reference_note} yet and won't be judged")
+            print(f"     (gather them with: python gather_responses.py {bot_name} ... --resume)")
+        if errored_count:
+            errored_note = " (or their ground truth)" if ground_truth else ""
+            print(f"   ⚠ {errored_count} {bot_name} responses{errored_note} are gather errors and won't be judged")
+            print(f"     (regenerate them with: python gather_responses.py {bot_name} ... --resume)")
+
+    # Check status
+    if retry_failed_only:
+        print(f"\n   Found {len(jobs)} failed evaluations to retry")
+    else:
+        already_done = sum(skipped_by_bot.values())
+        if already_done > 0:
+            print(f"\n   Found {already_done} already evaluated responses (will skip)")
+    if stale_count:
+        print(f"   Found {stale_count} results whose rubric, response or judge changed (will re-evaluate)")
+    if adopted_count:
+        print(f"   ⚠ Kept {adopted_count} results saved before the judge cache without knowing their rubric or judge")
+        print("     (later changes are detected from now on; re-evaluate them with --recheck-legacy)")
+    if legacy_count:
+        print(f"   Found {legacy_count} results saved before the judge cache (will re-evaluate)")
+    reused = sum(cached_by_bot.values())
+    if reused:
+        print(f"   Reused {reused} evaluations from the judge cache")
+
+    async def evaluate_job(job: Dict[str, Any]) -> Dict[str, Any]:
+        async def judge(model: str) -> Tuple[Dict[str, Any], Optional[Dict[str, int]]]:
+            evaluation, usage = await evaluate_response(
+                client,
+                evaluation_prompt,
+                job['user_query'],
+                job['ground_truth'],
+                job['response'],
+                model,
+                limiter,
+                args.local_scoring,
+                job['compact'],
+                checker
+            )
+            if args.local_scoring:
+                evaluation = merge_local_scores(evaluation, score_locally(job['response']))
+            return evaluation, usage
+
+        if cascade:
+            evaluation, job['usage'], kept = await cascade.evaluate(judge, job['cheap_key'])
+            if kept:
+                # Saved and cached as the cheap judge's evaluation
+                job['cache_key'] = job['cheap_key']
+            return evaluation
+        evaluation, job['usage'] = await judge(deployment_name)
+        return evaluation
+
+    async def evaluate_batch(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # All jobs in a batch share the same query and ground truth
+        results = await evaluate_response_batch(
+            client,
+            evaluation_prompt,
+            batch[0]['user_query'],
+            batch[0]['ground_truth'],
+            [job['response'] for job in batch],
+            deployment_name,
+            limiter,
+            args.local_scoring,
+            batch[0]['compact'],
+            checker
+        )
+        evaluations = []
+        for job, (evaluation, usage) in zip(batch, results):
+            job['usage'] = usage
+            if args.local_scoring:
+                evaluation = merge_local_scores(evaluation, score_locally(job['response']))
+            evaluations.append(evaluation)
+        return evaluations
+
+    if args.batch_check:
+        agrees = asyncio.run(run_batch_agreement_check(
+            check_jobs, evaluate_job, evaluate_batch, batch_size, args.batch_check,
+            args.concurrency, args.batch_tolerance
+        ))
+        print(f"\n  API calls: {format_limiter_stats(limiter)}")
+        print(f"  Prompt cache: {format_prompt_cache_stats(limiter)}")
+        if judge_cache:
+            judge_cache.close()
+        store.close()
+        sys.exit(0 if agrees else 1)
+
+    def save_job(job: Dict[str, Any], evaluation: Dict[str, Any]):
+        if judge_cache:
+            judge_cache.put(job['cache_key'], evaluation)
+        save_individual_result(store, output_dir, job['bot_name'], job['query_index'], job['user_query'],
+                               evaluation, job['cache_key'], job.get('usage'))
+
+    # Evaluate
+    # Query-major order: every bot's job for a query runs close together, so
+    # the shared rubric + query (+ ground truth) prefix stays in the provider's
+    # prompt cache
+    jobs.sort(key=lambda job: job['query_index'])
+
+    if args.adaptive:
+        scheduler = adaptive_scheduler_from_args(args, jobs, observed)
+        print(f"\nStarting adaptive evaluation of up to {len(jobs)} responses...")
+        run = run_adaptive_queue(scheduler, evaluate_job, save_job, args.concurrency, limiter.status)
+    else:
+        print(f"\nStarting evaluation of {len(jobs)} responses...")
+        run = run_evaluation_queue(jobs, evaluate_job, save_job, args.concurrency, limiter.status,
+                                   evaluate_batch, batch_size)
+    try:
+        evaluated_by_bot = asyncio.run(run)
+    finally:
+        # Commit the last batch of results even if the run is interrupted
+        store.close()
+
+    print("\n" + "=" * 80)
+    print(f"Evaluation complete for {', '.join(bot_names)}!")
+    print("=" * 80)
+    for bot_name in bot_names:
+        print(f"  {bot_name}: evaluated {evaluated_by_bot.get(bot_name, 0)} responses, "
+              f"reused {cached_by_bot[bot_name]} from cache, skipped {skipped_by_bot[bot_name]}")
+    if cascade:
+        cascade.print_report()
+    checker.print_report()
+    print(f"  API calls: {format_limiter_stats(limiter)}")
+    print(f"  Prompt cache: {format_prompt_cache_stats(limiter)}")
+    if judge_cache:
+        print(f"  Judge cache: {judge_cache.format_stats()}")
+        judge_cache.close()
+    print(f"\nResults saved to: {args.results_store} (run '{output_dir}')")
+    print(f"   (write them out as {output_dir}/individual/*.json with: python results_store.py export {output_dir})")
+    if ground_truth:
+        print(f"\nRun 'python merge_results.py{store_flag(args)}' to generate CSV and summary report")
+    else:
+        print(f"\nRun 'python merge_results.py --no-gt{store_flag(args)}' to generate reports")
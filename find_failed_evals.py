@@ -4,44 +4,18 @@ Find all failed evaluations (those with errors or zero scores)
 Checks both with-GT and no-GT evaluation results
 """
 
-import json
-import glob
-import sys
+import argparse
 import csv
 from pathlib import Path
 from collections import defaultdict
 
-RESULTS_DIR_GT = "evaluation_results/individual"
-RESULTS_DIR_NO_GT = "evaluation_results_no_gt/individual"
-INPUT_PROMPTS_FILE = "input-prompts.csv"
-
-
-def check_evaluation_failed(filepath: str) -> tuple[bool, str]:
-    """
-    Check if an evaluation failed
-    Returns: (is_failed, reason)
-    """
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            result = json.load(f)
-            evaluation = result.get('evaluation', {})
-
-            if 'error' in evaluation:
-                return True, f"Error: {evaluation['error'][:100]}"
-
-            if evaluation.get('overall_score', 0) == 0.0:
-                # Check if all dimension scores are also 0
-                dim_scores = evaluation.get('dimension_scores', {})
-                if all(score == 0 for score in dim_scores.values()):
-                    return True, "All scores are 0"
-
-            if 'parse_warning' in evaluation:
-                return True, "JSON parsing issue (partial parse)"
+from response_dataset import open_dataset
+from results_store import ResultsStore, add_store_arguments, ensure_imported, results_store_from_args, store_flag
 
-            return False, ""
-
-    except Exception as e:
-        return True, f"Could not read file: {str(e)}"
+# Runs in the results store
+RUN_GT = "evaluation_results"
+RUN_NO_GT = "evaluation_results_no_gt"
+INPUT_PROMPTS_FILE = "input-prompts.csv"
 
 
 _PROMPT_COUNT_CACHE: int | None = None
@@ -53,6 +27,11 @@ def load_total_prompt_count() -> int:
     if _PROMPT_COUNT_CACHE is not None:
         return _PROMPT_COUNT_CACHE
 
+    dataset = open_dataset()
+    if dataset:
+        _PROMPT_COUNT_CACHE = dataset.prompt_count()
+        return _PROMPT_COUNT_CACHE
+
     try:
         with open(INPUT_PROMPTS_FILE, 'r', encoding='utf-8') as f:
             reader = csv.reader(f)
@@ -66,7 +45,11 @@ def load_total_prompt_count() -> int:
 
 
 def get_expected_query_count(bot_name: str) -> int:
-    """Determine expected query count for a bot via response files or prompt list."""
+    """Determine expected query count for a bot via the response dataset, response files or prompt list."""
+    dataset = open_dataset()
+    if dataset and dataset.has_bot(bot_name):
+        return dataset.response_count(bot_name)
+
     candidate_files = [
         Path("bot_responses") / f"Output - {bot_name} Responses.jsonl",
         Path(f"Output - {bot_name} Responses.jsonl"),
@@ -80,12 +63,13 @@ def get_expected_query_count(bot_name: str) -> int:
     return load_total_prompt_count()
 
 
-def check_directory(results_dir: str, eval_type: str):
-    """Check a specific evaluation directory"""
-    json_files = glob.glob(f"{results_dir}/*.json")
+def check_run(store: ResultsStore, run: str, eval_type: str):
+    """Check a specific evaluation run"""
+    ensure_imported(store, run)
+    statuses = store.statuses(run)
 
-    if not json_files:
-        print(f"\nNo {eval_type} evaluation files found in: {results_dir}/")
+    if not statuses:
+        print(f"\nNo {eval_type} evaluation results found for run: {run}")
         return None
 
     print(f"\n{'=' * 80}")
@@ -98,29 +82,18 @@ def check_directory(results_dir: str, eval_type: str):
     failed_count = 0
     missing_total = 0
 
-    for filepath in sorted(json_files):
+    for bot_name, query_index, reason in statuses:
         total_count += 1
-        is_failed, reason = check_evaluation_failed(filepath)
 
-        # Extract bot name and query index from filename
-        filename = filepath.split('/')[-1].split('\\')[-1]
-        bot_name = filename.rsplit('_query_', 1)[0]
-        query_idx = filename.rsplit('_query_', 1)[1].replace('.json', '')            
-        
-        if is_failed:
-            failed_count += 1        
+        if reason:
+            failed_count += 1
 
             failed_by_bot[bot_name].append({
-                'query_idx': query_idx,
-                'reason': reason,
-                'filepath': filepath
+                'query_idx': f"{query_index:03d}",
+                'reason': reason
             })
 
-        try:
-            query_idx_int = int(query_idx)
-            indices_by_bot[bot_name].add(query_idx_int)
-        except ValueError:
-            pass
+        indices_by_bot[bot_name].add(query_index)
 
     # Detect missing evaluations per bot
     for bot_name, existing_indices in indices_by_bot.items():
@@ -135,8 +108,7 @@ def check_directory(results_dir: str, eval_type: str):
                 missing_total += 1
                 failed_by_bot[bot_name].append({
                     'query_idx': f"{idx:03d}",
-                    'reason': "Missing evaluation file",
-                    'filepath': str(Path(results_dir) / f"{bot_name}_query_{idx:03d}.json")
+                    'reason': "Missing evaluation"
                 })
 
     total_count += missing_total
@@ -174,14 +146,21 @@ def check_directory(results_dir: str, eval_type: str):
 
 def main():
     """Find and report all failed evaluations"""
+    parser = argparse.ArgumentParser(description="Find failed evaluations in both runs and print retry commands")
+    add_store_arguments(parser)
+    args = parser.parse_args()
 
     # Check both directories
     print("=" * 80)
     print("CHECKING ALL EVALUATION RESULTS")
     print("=" * 80)
 
-    failed_gt = check_directory(RESULTS_DIR_GT, "WITH Ground Truth")
-    failed_no_gt = check_directory(RESULTS_DIR_NO_GT, "WITHOUT Ground Truth")
+    store = results_store_from_args(args)
+    try:
+        failed_gt = check_run(store, RUN_GT, "WITH Ground Truth")
+        failed_no_gt = check_run(store, RUN_NO_GT, "WITHOUT Ground Truth")
+    finally:
+        store.close()
 
     # Print retry commands
     has_failures = (failed_gt and len(failed_gt) > 0) or (failed_no_gt and len(failed_no_gt) > 0)
@@ -199,12 +178,12 @@ def main():
     if failed_gt and len(failed_gt) > 0:
         print("\n# With Ground Truth:")
         for bot_name in sorted(failed_gt.keys()):
-            print(f"python evaluate_single_bot_aoai_robust.py {bot_name} --retry-failed")
+            print(f"python evaluate_single_bot_aoai_robust.py {bot_name} --retry-failed{store_flag(args)}")
 
     if failed_no_gt and len(failed_no_gt) > 0:
         print("\n# Without Ground Truth:")
         for bot_name in sorted(failed_no_gt.keys()):
-            print(f"python evaluate_single_bot_no_gt.py {bot_name} --retry-failed")
+            print(f"python evaluate_single_bot_no_gt.py {bot_name} --retry-failed{store_flag(args)}")
 
 
 if __name__ == "__main__":
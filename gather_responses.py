@@ -15,33 +15,65 @@ Examples:
 
   # Anthropic with custom prompt
   python gather_responses.py ActualClaudeTuned --provider anthropic --model claude-sonnet-4-5-20250929 --system-prompt "bot_system_prompts/ClaudeBot-v2.txt"
+
+  # 16 requests in flight at once
+  python gather_responses.py GPTBot --provider azure-openai --model gpt-5-2 --concurrency 16
 """
 
-import json
+import asyncio
 import csv
+import hashlib
 import os
 import sys
 import argparse
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from pathlib import Path
 
 # Import SDKs
 try:
-    from anthropic import Anthropic
+    from anthropic import AsyncAnthropic
     ANTHROPIC_AVAILABLE = True
 except ImportError:
     ANTHROPIC_AVAILABLE = False
+    AsyncAnthropic = None
 
 try:
-    from openai import OpenAI as OpenAIClient
+    from openai import AsyncOpenAI as OpenAIClient
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
     OpenAIClient = None
 
+from jsonl_io import JsonlAppendWriter, read_jsonl, recover_partial_line, write_jsonl_atomic
+from rate_limiter import (
+    CircuitOpenError,
+    RateLimiter,
+    add_rate_limit_arguments,
+    call_with_retry,
+    estimate_tokens,
+    format_limiter_stats,
+    format_prompt_cache_stats,
+    prompt_cache_usage,
+    rate_limiter_from_args,
+)
+
 # Configuration
 INPUT_PROMPTS_FILE = "input-prompts.csv"
 BOT_RESPONSES_DIR = "bot_responses"
+MAX_RESPONSE_TOKENS = 2000
+
+# Default number of in-flight requests per provider (override with --concurrency)
+DEFAULT_CONCURRENCY = {
+    "anthropic": 8,
+    "azure-openai": 16,
+    "openai": 16,
+}
+
+# Responses are appended here while a run is in progress
+PARTIAL_SUFFIX = ".partial"
+
+# Failed calls are saved with this prefix in place of a response
+ERROR_RESPONSE_PREFIX = "[ERROR:"
 
 
 def load_prompts() -> List[str]:
@@ -54,6 +86,18 @@ def load_prompts() -> List[str]:
     return prompts
 
 
+def query_id(query: str) -> str:
+    """Stable id for a query: hash of its whitespace-normalized text"""
+    normalized = ' '.join(query.split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:16]
+
+
+def is_error_response(entry: dict) -> bool:
+    """True if a saved entry is a failed call rather than a real response"""
+    response = entry.get('response')
+    return not response or response.startswith(ERROR_RESPONSE_PREFIX)
+
+
 def load_system_prompt(filepath: Optional[str]) -> Optional[str]:
     """Load system prompt from file if provided"""
     if not filepath:
@@ -67,68 +111,260 @@ def load_system_prompt(filepath: Optional[str]) -> Optional[str]:
         return f.read()
 
 
-def get_response_anthropic(
-    client: Anthropic,
+async def get_response_anthropic(
+    client: AsyncAnthropic,
     model: str,
     query: str,
-    system_prompt: Optional[str]
-) -> str:
-    """Get response from Anthropic API"""
+    system_prompt: Optional[str],
+    limiter: RateLimiter
+) -> Tuple[str, Optional[Dict[str, int]]]:
+    """Get response from Anthropic API, with token usage"""
     try:
         kwargs = {
             "model": model,
-            "max_tokens": 2000,
+            "max_tokens": MAX_RESPONSE_TOKENS,
             "messages": [{"role": "user", "content": query}]
         }
 
         if system_prompt:
-            kwargs["system"] = system_prompt
-
-        message = client.messages.create(**kwargs)
-        return message.content[0].text
+            # The system prompt is the same for every query: mark it cacheable
+            kwargs["system"] = [{
+                "type": "text",
+                "text": system_prompt,
+                "cache_control": {"type": "ephemeral"}
+            }]
+
+        estimated = estimate_tokens((system_prompt or "") + query) + MAX_RESPONSE_TOKENS
+        message = await call_with_retry(
+            limiter,
+            client.messages.with_raw_response.create,
+            estimated,
+            **kwargs
+        )
+        return message.content[0].text, prompt_cache_usage(message)
 
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error getting Anthropic response: {e}")
-        return f"[ERROR: {str(e)}]"
+        return f"[ERROR: {str(e)}]", None
 
 
-def get_response_azure_openai(
+async def get_response_azure_openai(
     client: OpenAIClient,
     deployment: str,
     query: str,
-    system_prompt: Optional[str]
-) -> str:
-    """Get response from Azure OpenAI"""
+    system_prompt: Optional[str],
+    limiter: RateLimiter
+) -> Tuple[str, Optional[Dict[str, int]]]:
+    """Get response from Azure OpenAI, with token usage"""
     try:
+        # System prompt first: OpenAI caches the longest repeated prefix automatically
         messages = []
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": query})
 
-        response = client.chat.completions.create(
+        estimated = estimate_tokens((system_prompt or "") + query) + MAX_RESPONSE_TOKENS
+        response = await call_with_retry(
+            limiter,
+            client.chat.completions.with_raw_response.create,
+            estimated,
             model=deployment,
             messages=messages,
-            max_tokens=2000,
+            max_tokens=MAX_RESPONSE_TOKENS,
             temperature=1.0
         )
 
-        return response.choices[0].message.content
+        return response.choices[0].message.content, prompt_cache_usage(response)
 
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"Error getting Azure OpenAI response: {e}")
-        return f"[ERROR: {str(e)}]"
+        return f"[ERROR: {str(e)}]", None
+
+
+async def get_response(
+    provider: str,
+    client,
+    model: str,
+    query: str,
+    system_prompt: Optional[str],
+    limiter: RateLimiter
+) -> Tuple[str, Optional[Dict[str, int]]]:
+    """Dispatch a single query to the configured provider"""
+    if provider == 'anthropic':
+        return await get_response_anthropic(client, model, query, system_prompt, limiter)
+    # Azure OpenAI and OpenAI share the same API
+    return await get_response_azure_openai(client, model, query, system_prompt, limiter)
+
+
+async def gather_responses_async(
+    provider: str,
+    client,
+    model: str,
+    prompts: List[str],
+    system_prompt: Optional[str],
+    bot_name: str,
+    existing_responses: List[dict],
+    concurrency: int,
+    limiter: RateLimiter
+) -> List[dict]:
+    """
+    Generate responses for every prompt without a successful entry in
+    `existing_responses` (missing or errored) with at most `concurrency`
+    requests in flight
+
+    Each response is appended to the working file as soon as it completes.
+    When the run ends, everything is merged into the output file in prompt
+    order (atomically) and the working file is removed. If the run is
+    interrupted, --resume picks up from the working file.
+
+    Readers pair responses with prompts by line, so if the run stopped early
+    (circuit breaker) only the answered prompts before the first gap are
+    saved; the rest stays in the working file until --resume fills the gap.
+    Returns the saved responses.
+    """
+    done_ids = {query_id(entry['query']) for entry in existing_responses
+                if not is_error_response(entry)}
+    pending = [i for i, query in enumerate(prompts) if query_id(query) not in done_ids]
+    print(f"Generating {len(pending)} responses ({len(prompts) - len(pending)} already done)\n")
+    new_responses: List[dict] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    Path(BOT_RESPONSES_DIR).mkdir(exist_ok=True)
+    writer = JsonlAppendWriter(get_partial_file_path(bot_name))
+
+    async def run_one(i: int):
+        query = prompts[i]
+        async with semaphore:
+            try:
+                response_text, usage = await get_response(provider, client, model, query, system_prompt, limiter)
+            except CircuitOpenError:
+                return
+
+        response_entry = {
+            "query": query,
+            "response": response_text
+        }
+        if usage:
+            response_entry["usage"] = usage
+        writer.write(response_entry)
+        new_responses.append(response_entry)
+        print(f"[{i+1}/{len(prompts)}] [{limiter.status()}] {query[:60]}...")
+
+    try:
+        # Send one request first so the shared system prompt is in the
+        # provider's prompt cache before the rest fan out
+        if pending and system_prompt:
+            await run_one(pending[0])
+            pending = pending[1:]
+        await asyncio.gather(*(run_one(i) for i in pending))
+    finally:
+        writer.close()
+
+    all_responses = order_responses(prompts, existing_responses + new_responses)
+    answered = answered_prefix_length(prompts, all_responses)
+    if answered < len(prompts):
+        save_responses(bot_name, all_responses[:answered])
+        write_jsonl_atomic(get_partial_file_path(bot_name), all_responses[answered:])
+        print(f"  Query {answered + 1} has no response yet; {len(all_responses) - answered} later responses"
+              f" kept in {get_partial_file_path(bot_name)} for --resume")
+        return all_responses[:answered]
+    save_responses(bot_name, all_responses)
+    os.remove(get_partial_file_path(bot_name))
+    return all_responses
+
+
+def get_output_file_path(bot_name: str) -> str:
+    """Final response file for a bot"""
+    return f"{BOT_RESPONSES_DIR}/Output - {bot_name} Responses.jsonl"
+
+
+def get_partial_file_path(bot_name: str) -> str:
+    """Working file that responses are appended to while a run is in progress"""
+    return get_output_file_path(bot_name) + PARTIAL_SUFFIX
+
+
+def load_existing_responses(bot_name: str) -> List[dict]:
+    """Load responses from the output file plus any interrupted run's working file"""
+    responses = []
+
+    output_file = get_output_file_path(bot_name)
+    if os.path.exists(output_file):
+        responses.extend(read_jsonl(output_file))
+
+    partial_file = get_partial_file_path(bot_name)
+    if os.path.exists(partial_file):
+        dropped = recover_partial_line(partial_file)
+        if dropped:
+            print(f"⚠ Dropped an incomplete trailing line ({dropped} bytes) from {partial_file}")
+        responses.extend(read_jsonl(partial_file))
+
+    return responses
+
+
+def latest_by_query(responses: Iterable[dict]) -> Dict[str, dict]:
+    """
+    query_id -> entry; a later entry wins for a repeated query, unless it is
+    an error and the earlier one isn't
+    Raises ValueError for an entry without its query.
+    """
+    by_id = {}
+    for number, entry in enumerate(responses, start=1):
+        if not isinstance(entry.get('query'), str):
+            raise ValueError(f"entry {number} has no 'query' to match it to a prompt")
+        key = query_id(entry['query'])
+        previous = by_id.get(key)
+        if previous is None or is_error_response(previous) or not is_error_response(entry):
+            by_id[key] = entry
+    return by_id
+
+
+def align_responses(prompts: List[str], responses: Iterable[dict]) -> List[Optional[dict]]:
+    """
+    The entry for each prompt (None if there is none), matched by query_id
+    rather than by line, so a reordered prompt file or an edited response
+    file can't pair a response with the wrong prompt
+    """
+    by_id = latest_by_query(responses)
+    return [by_id.get(query_id(query)) for query in prompts]
+
+
+def order_responses(prompts: List[str], responses: List[dict]) -> List[dict]:
+    """
+    Put responses in prompt order, matched by query_id
+    A later entry wins for a repeated query, unless it is an error and the
+    earlier one isn't. Responses to queries no longer in the prompt file are
+    kept at the end.
+    """
+    by_id = latest_by_query(responses)
+
+    ordered = []
+    for query in prompts:
+        entry = by_id.pop(query_id(query), None)
+        if entry is not None:
+            ordered.append(entry)
+    ordered.extend(by_id.values())
+    return ordered
+
+
+def answered_prefix_length(prompts: List[str], ordered: List[dict]) -> int:
+    """How many prompts, from the first, have an entry at their own line of `ordered`"""
+    for i, query in enumerate(prompts):
+        if i >= len(ordered) or query_id(ordered[i]['query']) != query_id(query):
+            return i
+    return len(prompts)
 
 
 def save_responses(bot_name: str, responses: List[dict]):
-    """Save responses to JSONL file"""
+    """Atomically replace the JSONL output file with `responses`"""
     # Create bot_responses directory if it doesn't exist
     Path(BOT_RESPONSES_DIR).mkdir(exist_ok=True)
 
-    output_file = f"{BOT_RESPONSES_DIR}/Output - {bot_name} Responses.jsonl"
-
-    with open(output_file, 'w', encoding='utf-8') as f:
-        for response_data in responses:
-            f.write(json.dumps(response_data, ensure_ascii=False) + '\n')
+    output_file = get_output_file_path(bot_name)
+    write_jsonl_atomic(output_file, responses)
 
     print(f"\n✓ Saved {len(responses)} responses to: {output_file}")
 
@@ -159,9 +395,17 @@ Examples:
                        help='Path to system prompt file (optional)')
     parser.add_argument('--resume', action='store_true',
                        help='Resume from existing file (skip already generated responses)')
+    parser.add_argument('--concurrency', '-c', type=int,
+                       help='Maximum requests in flight; the actual limit adapts below this (default: %s)' %
+                            ', '.join(f"{p}={n}" for p, n in DEFAULT_CONCURRENCY.items()))
+    add_rate_limit_arguments(parser)
 
     args = parser.parse_args()
 
+    if args.concurrency is not None and args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    concurrency = DEFAULT_CONCURRENCY[args.provider] if args.concurrency is None else args.concurrency
+
     # Validate provider availability
     if args.provider == 'anthropic' and not ANTHROPIC_AVAILABLE:
         print("Error: anthropic package not installed. Run: pip install anthropic")
@@ -178,7 +422,7 @@ Examples:
         if not api_key:
             print("Error: ANTHROPIC_API_KEY environment variable not set")
             sys.exit(1)
-        client = Anthropic(api_key=api_key)
+        client = AsyncAnthropic(api_key=api_key, max_retries=0)
 
     elif args.provider == 'azure-openai':
         endpoint = os.environ.get('AZURE_OPENAI_ENDPOINT')
@@ -189,6 +433,7 @@ Examples:
         client = OpenAIClient(
             base_url=endpoint,
             api_key=api_key,
+            max_retries=0,
         )
 
     elif args.provider == 'openai':
@@ -196,7 +441,7 @@ Examples:
         if not api_key:
             print("Error: OPENAI_API_KEY environment variable not set")
             sys.exit(1)
-        client = OpenAIClient(api_key=api_key)
+        client = OpenAIClient(api_key=api_key, max_retries=0)
 
     # Load system prompt if provided
     system_prompt = load_system_prompt(args.system_prompt)
@@ -213,53 +458,53 @@ Examples:
     print(f"✓ Loaded {len(prompts)} queries")
 
     # Check for existing responses to resume
-    output_file = f"{BOT_RESPONSES_DIR}/Output - {args.bot_name} Responses.jsonl"
+    output_file = get_output_file_path(args.bot_name)
+    partial_file = get_partial_file_path(args.bot_name)
     existing_responses = []
-    start_index = 0
 
-    if args.resume and os.path.exists(output_file):
-        print(f"\n⚠ Resume mode: Loading existing responses from {output_file}")
-        with open(output_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                existing_responses.append(json.loads(line))
-        start_index = len(existing_responses)
-        print(f"✓ Found {start_index} existing responses, will resume from query {start_index + 1}")
+    if args.resume:
+        if os.path.exists(output_file) or os.path.exists(partial_file):
+            print(f"\n⚠ Resume mode: Loading existing responses from {output_file}")
+            existing_responses = order_responses(prompts, load_existing_responses(args.bot_name))
+            errored = sum(1 for entry in existing_responses if is_error_response(entry))
+            print(f"✓ Found {len(existing_responses)} existing responses ({errored} errored, will be regenerated)")
+    elif os.path.exists(partial_file):
+        # Leftover from an interrupted run that we're not resuming
+        os.remove(partial_file)
 
     # Generate responses
     print(f"\n{'=' * 80}")
     print(f"Generating responses for: {args.bot_name}")
     print(f"Provider: {args.provider}")
     print(f"Model: {args.model}")
+    limiter = rate_limiter_from_args(args, concurrency)
+    print(f"Concurrency: {concurrency}")
+    print(f"Rate limits: {limiter.describe()}")
     print(f"{'=' * 80}\n")
 
-    all_responses = existing_responses.copy()
-
-    for i in range(start_index, len(prompts)):
-        query = prompts[i]
-        print(f"[{i+1}/{len(prompts)}] {query[:60]}...")
-
-        # Get response based on provider
-        if args.provider == 'anthropic':
-            response_text = get_response_anthropic(client, args.model, query, system_prompt)
-        elif args.provider == 'azure-openai':
-            response_text = get_response_azure_openai(client, args.model, query, system_prompt)
-        elif args.provider == 'openai':
-            response_text = get_response_azure_openai(client, args.model, query, system_prompt)  # Same API
-
-        # Create response entry
-        response_entry = {
-            "query": query,
-            "response": response_text
-        }
-
-        all_responses.append(response_entry)
-
-        # Save incrementally (in case of interruption)
-        if (i + 1) % 10 == 0 or (i + 1) == len(prompts):
-            save_responses(args.bot_name, all_responses)
+    all_responses = asyncio.run(gather_responses_async(
+        args.provider,
+        client,
+        args.model,
+        prompts,
+        system_prompt,
+        args.bot_name,
+        existing_responses,
+        concurrency,
+        limiter
+    ))
+
+    if limiter.breaker.gave_up:
+        print(f"\n✗ Stopped early: endpoint is down. Saved {len(all_responses)} responses;"
+              f" re-run with --resume to continue.")
+        print(f"  API calls: {format_limiter_stats(limiter)}")
+        print(f"  Prompt cache: {format_prompt_cache_stats(limiter)}")
+        sys.exit(1)
 
     print("\n" + "=" * 80)
     print(f"✓ Complete! Generated {len(all_responses)} total responses")
+    print(f"  API calls: {format_limiter_stats(limiter)}")
+    print(f"  Prompt cache: {format_prompt_cache_stats(limiter)}")
     print("=" * 80)
     print(f"\nOutput file: {output_file}")
     print(f"\nNext steps:")
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Tolerant JSON recovery for judge output
+Used by evaluate_single_bot_aoai_robust.py, evaluate_single_bot_no_gt.py and
+evaluate_dual_rubric.py when json.loads fails
+
+One pass over the text rebuilds as much of the object as it can instead of
+giving up on the whole reply:
+  - raw newlines and tabs inside strings are kept as they are
+  - quotes inside a string that aren't followed by JSON structure are taken
+    as part of the text
+  - trailing, doubled and missing commas, missing colons and unquoted values
+    are tolerated
+  - output cut off at max_tokens is closed where it stops: the last
+    incomplete key is dropped, open strings, arrays and objects are kept
+
+The report lists the repairs made and the path of the value that was cut
+off, if any, so callers can tell which fields are intact.
+
+Usage: python json_recovery.py <file>   # print what can be recovered from a reply
+"""
+
+import json
+import re
+import sys
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+Path = List[Union[str, int]]
+
+NUMBER_PATTERN = re.compile(r'-?\d+(?:\.\d*)?(?:[eE][+-]?\d+)?')
+VALUE_STARTS = set('"{[-0123456789tfn')
+LITERALS = {"true": True, "false": False, "null": None}
+_MISSING = object()
+
+
+class _Recovery:
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+        self.repairs: List[str] = []
+        self.truncated_at: Optional[Path] = None
+
+    def repair(self, kind: str):
+        if kind not in self.repairs:
+            self.repairs.append(kind)
+
+    def cut_off(self, path: Path):
+        # The innermost value reports first; its ancestors are cut off too
+        if self.truncated_at is None:
+            self.truncated_at = list(path)
+
+    def skip_whitespace(self):
+        while self.pos < len(self.text) and self.text[self.pos] in ' \t\r\n':
+            self.pos += 1
+
+    def next_significant(self, start: int) -> Tuple[str, int]:
+        """The first non-whitespace character at or after start ('' at the end) and its position"""
+        while start < len(self.text) and self.text[start] in ' \t\r\n':
+            start += 1
+        return (self.text[start], start) if start < len(self.text) else ('', start)
+
+    def value(self, path: Path) -> Tuple[Any, bool]:
+        """(value, whether it was complete); _MISSING if nothing was left"""
+        self.skip_whitespace()
+        if self.pos >= len(self.text):
+            self.cut_off(path)
+            return _MISSING, False
+        char = self.text[self.pos]
+        if char == '{':
+            return self.object(path)
+        if char == '[':
+            return self.array(path)
+        if char == '"':
+            return self.string(path)
+        if char in '-0123456789':
+            return self.number(path)
+        for word, literal in LITERALS.items():
+            if self.text.startswith(word, self.pos):
+                self.pos += len(word)
+                return literal, True
+            if word.startswith(self.text[self.pos:]):
+                self.pos = len(self.text)
+                self.cut_off(path)
+                return _MISSING, False
+        return self.bare(path)
+
+    def object(self, path: Path) -> Tuple[Dict[str, Any], bool]:
+        self.pos += 1
+        result: Dict[str, Any] = {}
+        while True:
+            self.skip_whitespace()
+            if self.pos >= len(self.text):
+                self.cut_off(path)
+                return result, False
+            char = self.text[self.pos]
+            if char == '}':
+                self.pos += 1
+                return result, True
+            if char == ',':
+                self.pos += 1
+                following, _ = self.next_significant(self.pos)
+                if following in '},' and following:
+                    self.repair("trailing_comma")
+                continue
+            if char == ']':
+                # Mismatched bracket: treat it as the end of this object
+                self.repair("mismatched_bracket")
+                self.pos += 1
+                return result, True
+
+            if char == '"':
+                key, complete = self.string(path, is_key=True)
+            elif char.isalpha() or char == '_':
+                key = re.match(r'[\w-]+', self.text[self.pos:]).group(0)
+                self.pos += len(key)
+                complete = True
+                self.repair("unquoted_key")
+            else:
+                self.repair("stray_character")
+                self.pos += 1
+                continue
+            if not complete:
+                # Cut off inside a key: nothing to keep
+                return result, False
+
+            following, position = self.next_significant(self.pos)
+            if not following:
+                self.cut_off(path)
+                return result, False
+            if following == ':':
+                self.pos = position + 1
+            else:
+                self.repair("missing_colon")
+                self.pos = position
+
+            value, complete = self.value(path + [key])
+            if value is not _MISSING:
+                result[key] = value
+            if not complete:
+                return result, False
+
+            following, position = self.next_significant(self.pos)
+            if following == '"':
+                self.repair("missing_comma")
+                self.pos = position
+
+    def array(self, path: Path) -> Tuple[List[Any], bool]:
+        self.pos += 1
+        result: List[Any] = []
+        while True:
+            self.skip_whitespace()
+            if self.pos >= len(self.text):
+                self.cut_off(path)
+                return result, False
+            char = self.text[self.pos]
+            if char == ']':
+                self.pos += 1
+                return result, True
+            if char == ',':
+                self.pos += 1
+                following, _ = self.next_significant(self.pos)
+                if following in '],' and following:
+                    self.repair("trailing_comma")
+                continue
+            if char == '}':
+                self.repair("mismatched_bracket")
+                self.pos += 1
+                return result, True
+
+            value, complete = self.value(path + [len(result)])
+            if value is not _MISSING:
+                result.append(value)
+            if not complete:
+                return result, False
+
+            following, position = self.next_significant(self.pos)
+            if following and following in VALUE_STARTS:
+                self.repair("missing_comma")
+                self.pos = position
+
+    def string_ends_here(self, position: int, is_key: bool) -> bool:
+        """Whether the quote at position closes the string rather than being part of it"""
+        following, after = self.next_significant(position + 1)
+        if not following or following in '}]':
+            return True
+        if is_key:
+            return following == ':'
+        if following == ':':
+            return False
+        if following == ',':
+            resumed, _ = self.next_significant(after + 1)
+            return not resumed or resumed in VALUE_STARTS or resumed in '}]'
+        return False
+
+    def string(self, path: Path, is_key: bool = False) -> Tuple[str, bool]:
+        self.pos += 1
+        chars: List[str] = []
+        while self.pos < len(self.text):
+            char = self.text[self.pos]
+            if char == '\\':
+                if self.pos + 1 >= len(self.text):
+                    break
+                escape = self.text[self.pos + 1]
+                if escape == 'u' and re.fullmatch(r'[0-9a-fA-F]{4}', self.text[self.pos + 2:self.pos + 6]):
+                    chars.append(chr(int(self.text[self.pos + 2:self.pos + 6], 16)))
+                    self.pos += 6
+                    continue
+                chars.append({'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f'}.get(escape, escape))
+                self.pos += 2
+                continue
+            if char == '"':
+                if self.string_ends_here(self.pos, is_key):
+                    self.pos += 1
+                    return ''.join(chars), True
+                self.repair("unescaped_quote")
+            elif char in '\n\r\t':
+                self.repair("raw_control_character")
+            chars.append(char)
+            self.pos += 1
+        self.pos = len(self.text)
+        self.cut_off(path)
+        return ''.join(chars), False
+
+    def number(self, path: Path) -> Tuple[Any, bool]:
+        match = NUMBER_PATTERN.match(self.text, self.pos)
+        if not match:
+            return self.bare(path)
+        self.pos = match.end()
+        token = match.group(0).rstrip('.')
+        value = float(token) if any(c in token for c in '.eE') else int(token)
+        if self.pos >= len(self.text):
+            # More digits may have been cut off
+            self.cut_off(path)
+            return value, False
+        return value, True
+
+    def bare(self, path: Path) -> Tuple[Any, bool]:
+        """An unquoted or single-quoted value, read up to the next comma, bracket or line end"""
+        self.repair("unquoted_value")
+        match = re.match(r"'([^']*)'|[^,}\]\n]*", self.text[self.pos:])
+        self.pos += len(match.group(0))
+        text = match.group(1) if match.group(1) is not None else match.group(0).strip()
+        if self.pos >= len(self.text):
+            self.cut_off(path)
+            return text, False
+        return text, True
+
+
+def recover_json(text: str) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Rebuild the first JSON object or array in text as far as possible
+    Returns (value or None if there is no object or array, report) where
+    the report has "repairs" (kinds of fixes applied), "truncated_at" (path
+    of keys/indices of the value that was cut off, or None) and, for an
+    object, the top-level fields that were "salvaged" intact or "cut_off".
+    """
+    report: Dict[str, Any] = {"repairs": [], "truncated_at": None}
+    starts = [position for position in (text.find('{'), text.find('[')) if position != -1]
+    if not starts:
+        return None, report
+    recovery = _Recovery(text)
+    recovery.pos = min(starts)
+    value, _ = recovery.value([])
+    report.update(repairs=recovery.repairs, truncated_at=recovery.truncated_at)
+    if isinstance(value, dict):
+        report["salvaged"] = [key for key in value if is_complete(report, [key])]
+        report["cut_off"] = [key for key in value if not is_complete(report, [key])]
+    return value, report
+
+
+def is_complete(report: Dict[str, Any], path: Sequence[Union[str, int]]) -> bool:
+    """Whether the value at path was recovered in full (not cut off)"""
+    truncated_at = report.get("truncated_at")
+    return truncated_at is None or list(truncated_at[:len(path)]) != list(path)
+
+
+def unrecovered_scores(evaluation: Dict[str, Any], report: Dict[str, Any], dimensions: Sequence[str],
+                       path: Sequence[Union[str, int]] = (), expect_overall: bool = True) -> List[str]:
+    """Scores of a recovered evaluation (at path in the reply) that are missing, not numbers or cut off"""
+    def recovered(scores: Any, name: str, score_path: List[Union[str, int]]) -> bool:
+        score = scores.get(name) if isinstance(scores, dict) else None
+        return (isinstance(score, (int, float)) and not isinstance(score, bool)
+                and is_complete(report, score_path))
+
+    missing = []
+    if expect_overall and not recovered(evaluation, 'overall_score', list(path) + ['overall_score']):
+        missing.append('overall_score')
+    dimension_scores = evaluation.get('dimension_scores')
+    missing.extend(dim for dim in dimensions
+                   if not recovered(dimension_scores, dim, list(path) + ['dimension_scores', dim]))
+    return missing
+
+
+def describe_recovery(report: Dict[str, Any]) -> str:
+    parts = []
+    if report.get("repairs"):
+        parts.append("repaired " + ", ".join(report["repairs"]))
+    if report.get("truncated_at") is not None:
+        parts.append("cut off in " + ".".join(str(key) for key in report["truncated_at"]) if report["truncated_at"]
+                     else "cut off")
+    return "; ".join(parts) or "no repairs"
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("Usage: python json_recovery.py <file>")
+        sys.exit(1)
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        value, report = recover_json(f.read())
+    print(json.dumps(value, indent=2, ensure_ascii=False))
+    print(f"\n{describe_recovery(report)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Crash-safe JSONL helpers
+
+- JsonlAppendWriter appends one entry per line as soon as it is ready,
+  flushing every write and fsyncing in batches
+- recover_partial_line drops the incomplete trailing line a crash can leave
+- write_jsonl_atomic replaces a file in one step (temp file + os.replace),
+  so readers never see a half-written file
+- iter_jsonl_fields streams a file one line at a time, decoding only the
+  requested top-level fields and skipping over the rest (e.g. _trace)
+"""
+
+import json
+import os
+import re
+import time
+from json.decoder import scanstring
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+
+# fsync after this many entries or this many seconds, whichever comes first
+FSYNC_EVERY = 20
+FSYNC_INTERVAL_SECONDS = 2.0
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\r\n]*')
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+# Strings and brackets are all that's needed to find where a value ends
+_STRUCTURE = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]', re.S)
+_SCALAR_END = re.compile(r'[,}\]\s]')
+
+
+def _fsync_directory(path: str):
+    """Persist a rename; not supported on every platform (e.g. Windows)"""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def recover_partial_line(filepath: str) -> int:
+    """
+    Truncate an incomplete trailing line (no newline) left by a crash
+    Returns the number of bytes dropped
+    """
+    if not os.path.exists(filepath):
+        return 0
+
+    with open(filepath, 'rb+') as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size == 0:
+            return 0
+
+        f.seek(size - 1)
+        if f.read(1) == b'\n':
+            return 0
+
+        # Walk back to the last complete line
+        position = size
+        chunk_size = 64 * 1024
+        while position > 0:
+            read_from = max(0, position - chunk_size)
+            f.seek(read_from)
+            chunk = f.read(position - read_from)
+            newline = chunk.rfind(b'\n')
+            if newline != -1:
+                keep = read_from + newline + 1
+                break
+            position = read_from
+        else:
+            keep = 0
+
+        f.truncate(keep)
+        return size - keep
+
+
+def read_jsonl(filepath: str) -> List[Dict[str, Any]]:
+    """Read a JSONL file, ignoring blank lines and an unparseable trailing line"""
+    entries = []
+    with open(filepath, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            entries.append(json.loads(line))
+        except json.JSONDecodeError:
+            if line_number == len(lines):
+                break
+            raise
+    return entries
+
+
+def _skip_value(line: str, pos: int) -> int:
+    """Position just after the JSON value starting at pos, without decoding it"""
+    char = line[pos]
+    if char == '"':
+        return _STRING.match(line, pos).end()
+    if char in '[{':
+        depth = 0
+        for match in _STRUCTURE.finditer(line, pos):
+            token = match.group()
+            if token in ('[', '{'):
+                depth += 1
+            elif token in (']', '}'):
+                depth -= 1
+                if depth == 0:
+                    return match.end()
+        raise ValueError("unterminated value")
+    match = _SCALAR_END.search(line, pos)
+    return match.start() if match else len(line)
+
+
+def project_json_line(line: str, fields: Sequence[str]) -> Dict[str, Any]:
+    """
+    The given top-level fields of one JSON object (missing ones are left out)
+    Values of other fields are skipped over, and the rest of the line is
+    ignored once every field has been found.
+    """
+    wanted = set(fields)
+    entry: Dict[str, Any] = {}
+    try:
+        pos = _WHITESPACE.match(line).end()
+        if line[pos] != '{':
+            raise ValueError("not an object")
+        pos += 1
+        while wanted:
+            pos = _WHITESPACE.match(line, pos).end()
+            if line[pos] == '}':
+                break
+            if line[pos] != '"':
+                raise ValueError("expected a key")
+            key, pos = scanstring(line, pos + 1)
+            pos = _WHITESPACE.match(line, pos).end()
+            if line[pos] != ':':
+                raise ValueError("expected ':'")
+            pos = _WHITESPACE.match(line, pos + 1).end()
+            if key in wanted:
+                entry[key], pos = _DECODER.raw_decode(line, pos)
+                wanted.discard(key)
+            else:
+                pos = _skip_value(line, pos)
+            pos = _WHITESPACE.match(line, pos).end()
+            if line[pos] == ',':
+                pos += 1
+            elif line[pos] != '}':
+                raise ValueError("expected ',' or '}'")
+    except (ValueError, IndexError, AttributeError):
+        # Malformed line: let the full parser decide (and raise JSONDecodeError)
+        full = json.loads(line)
+        return {field: full[field] for field in fields if field in full}
+    return entry
+
+
+def iter_jsonl_fields(filepath: str, fields: Sequence[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Stream a JSONL file, yielding just `fields` of each entry
+    Lines are read one at a time and other fields are never decoded. Blank
+    lines and an unparseable trailing line are ignored, as in read_jsonl.
+    """
+    error = None
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            if error is not None:
+                raise error
+            if not line.strip():
+                continue
+            try:
+                yield project_json_line(line, fields)
+            except json.JSONDecodeError as e:
+                # Only fatal if another line follows
+                error = e
+
+
+def write_jsonl_atomic(filepath: str, entries: Iterable[Dict[str, Any]]) -> int:
+    """Write entries to a temp file, fsync it and rename it over `filepath`"""
+    temp_path = f"{filepath}.tmp"
+    count = 0
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            count += 1
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(temp_path, filepath)
+    _fsync_directory(filepath)
+    return count
+
+
+class JsonlAppendWriter:
+    """Append-only JSONL writer with batched fsync"""
+
+    def __init__(
+        self,
+        filepath: str,
+        fsync_every: int = FSYNC_EVERY,
+        fsync_interval: float = FSYNC_INTERVAL_SECONDS
+    ):
+        self.filepath = filepath
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.recovered_bytes = recover_partial_line(filepath)
+        self._file = open(filepath, 'a', encoding='utf-8')
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def write(self, entry: Dict[str, Any]):
+        """Append one entry; the line reaches the OS immediately, disk in batches"""
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._file.flush()
+        self._unsynced += 1
+        if (self._unsynced >= self.fsync_every
+                or time.monotonic() - self._last_sync >= self.fsync_interval):
+            self.sync()
+
+    def sync(self):
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
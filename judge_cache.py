@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache of judge evaluations (SQLite, standard library)
+
+The key is a hash of everything that determines a judge's answer: rubric
+text, user query, ground truth, response, judge model and sampling params.
+Editing the rubric, regenerating responses or switching deployments changes
+the key, so stale evaluations are never reused and unchanged ones are never
+re-sent. Least recently used entries are evicted once the cache grows past
+its size limit.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, Optional
+
+JUDGE_CACHE_FILE = "judge_cache.sqlite"
+DEFAULT_CACHE_MAX_MB = 512
+
+# Evict down to this fraction of the limit so eviction doesn't run on every put
+EVICT_TO_FRACTION = 0.9
+
+
+def judge_cache_key(
+    rubric: str,
+    user_query: str,
+    ground_truth: Optional[str],
+    response: str,
+    judge_model: str,
+    sampling_params: Dict[str, Any]
+) -> str:
+    """Hash of every input that determines the judge's evaluation"""
+    payload = json.dumps({
+        "rubric": rubric,
+        "user_query": user_query,
+        "ground_truth": ground_truth,
+        "response": response,
+        "judge_model": judge_model,
+        "sampling_params": sampling_params,
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def is_cacheable(evaluation: Dict[str, Any]) -> bool:
+    """Only complete, successful evaluations are worth keeping"""
+    return 'error' not in evaluation and 'parse_warning' not in evaluation
+
+
+class JudgeCache:
+    """SQLite-backed judge cache with LRU eviction and hit/miss counters"""
+
+    def __init__(self, filepath: str = JUDGE_CACHE_FILE, max_mb: float = DEFAULT_CACHE_MAX_MB):
+        self.filepath = filepath
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.conn = sqlite3.connect(filepath)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS judge_cache (
+                key TEXT PRIMARY KEY,
+                evaluation TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_judge_cache_last_used ON judge_cache (last_used)")
+        self.conn.commit()
+
+        self.total_bytes = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM judge_cache").fetchone()[0]
+        self.stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            "SELECT evaluation FROM judge_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        self.conn.execute(
+            "UPDATE judge_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+        self.conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, evaluation: Dict[str, Any]):
+        if not is_cacheable(evaluation):
+            return
+
+        data = json.dumps(evaluation, ensure_ascii=False)
+        size = len(data.encode('utf-8'))
+        now = time.time()
+
+        previous = self.conn.execute(
+            "SELECT size FROM judge_cache WHERE key = ?", (key,)).fetchone()
+        if previous:
+            self.total_bytes -= previous[0]
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO judge_cache (key, evaluation, size, created, last_used) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (key, data, size, now, now))
+        self.total_bytes += size
+        self.stats["stored"] += 1
+
+        if self.total_bytes > self.max_bytes:
+            self._evict()
+        self.conn.commit()
+
+    def _evict(self):
+        """Drop least recently used entries until under the size limit"""
+        target = self.max_bytes * EVICT_TO_FRACTION
+        rows = self.conn.execute(
+            "SELECT key, size FROM judge_cache ORDER BY last_used ASC").fetchall()
+        for key, size in rows:
+            if self.total_bytes <= target:
+                break
+            self.conn.execute("DELETE FROM judge_cache WHERE key = ?", (key,))
+            self.total_bytes -= size
+            self.stats["evicted"] += 1
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def format_stats(self) -> str:
+        """One-line summary for the end-of-run report"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        hit_rate = self.stats["hits"] / lookups * 100 if lookups else 0.0
+        return (f"{self.stats['hits']} hits, {self.stats['misses']} misses "
+                f"({hit_rate:.1f}% hit rate), {self.stats['stored']} stored, "
+                f"{self.stats['evicted']} evicted, {self.total_bytes / (1024 * 1024):.1f} MB")
+
+
+def add_cache_arguments(parser):
+    """Add --cache-file / --cache-max-mb / --no-cache to an argparse parser"""
+    parser.add_argument('--cache-file', default=JUDGE_CACHE_FILE,
+                        help=f'Judge cache database (default: {JUDGE_CACHE_FILE})')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_CACHE_MAX_MB,
+                        help=f'Evict least recently used entries past this size (default: {DEFAULT_CACHE_MAX_MB})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Neither read nor write the judge cache')
+
+
+def judge_cache_from_args(args) -> Optional[JudgeCache]:
+    """Open the cache configured by add_cache_arguments (None with --no-cache)"""
+    if args.no_cache:
+        return None
+    directory = os.path.dirname(args.cache_file)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return JudgeCache(args.cache_file, args.cache_max_mb)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Judge cascade (--cascade CHEAP_DEPLOYMENT)
+Used by evaluate_single_bot_aoai_robust.py and evaluate_single_bot_no_gt.py
+
+A cheap, fast judge scores every response first. Its evaluation is kept
+unless it looks unreliable, in which case the response is escalated to the
+main (expensive) judge:
+  - error / parse_warning: the cheap judge's reply was missing or malformed
+  - borderline: the overall score is within --escalate-margin of a rubric
+    band edge (the 1-2 / 3-4 / 5-6 / 7-8 / 9-10 bands), where a small
+    misjudgement changes the verdict
+  - inconsistent: the overall score is more than --escalate-disagreement
+    points from the mean of the judge's own dimension scores
+  - audit: a fixed sample (--cascade-audit) of the remaining responses, so
+    the agreement statistics also cover responses that weren't flagged
+
+Each result records which judge scored it under "cascade", including the
+cheap judge's scores for escalated responses. The end of the run prints
+how well the two judges agreed for each escalation reason.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from rubric import DIMENSIONS
+
+DEFAULT_ESCALATE_MARGIN = 0.25
+DEFAULT_ESCALATE_DISAGREEMENT = 1.0
+DEFAULT_AUDIT_FRACTION = 0.05
+
+# Edges between the rubric's score bands
+BAND_EDGES = (2.5, 4.5, 6.5, 8.5)
+
+# Max difference (points) for the two judges' scores to count as agreeing
+AGREEMENT_TOLERANCE = 1.0
+
+REASONS = ["error", "parse_warning", "borderline", "inconsistent", "audit"]
+
+
+def escalation_reasons(evaluation: Dict[str, Any], cache_key: str, margin: float = DEFAULT_ESCALATE_MARGIN,
+                       disagreement: float = DEFAULT_ESCALATE_DISAGREEMENT,
+                       audit_fraction: float = DEFAULT_AUDIT_FRACTION) -> List[str]:
+    """Why a cheap-judge evaluation should go to the expensive judge (empty to keep it)"""
+    if 'error' in evaluation:
+        return ["error"]
+    if 'parse_warning' in evaluation:
+        return ["parse_warning"]
+
+    reasons = []
+    overall = float(evaluation.get('overall_score', 0) or 0)
+    if any(abs(overall - edge) < margin for edge in BAND_EDGES):
+        reasons.append("borderline")
+    dimension_scores = [float(score) for score in evaluation.get('dimension_scores', {}).values()
+                        if isinstance(score, (int, float))]
+    if dimension_scores and abs(overall - sum(dimension_scores) / len(dimension_scores)) > disagreement:
+        reasons.append("inconsistent")
+    # Chosen by the cache key, so the same responses are audited every run
+    if not reasons and audit_fraction > 0 and int(cache_key[:8], 16) / 0x100000000 < audit_fraction:
+        reasons.append("audit")
+    return reasons
+
+
+def evaluation_scores(evaluation: Dict[str, Any]) -> Dict[str, float]:
+    dimension_scores = evaluation.get('dimension_scores', {})
+    scores = {'overall_score': float(evaluation.get('overall_score', 0) or 0)}
+    for dim in DIMENSIONS:
+        if isinstance(dimension_scores.get(dim), (int, float)):
+            scores[dim] = float(dimension_scores[dim])
+    return scores
+
+
+class CascadeStats:
+    """How many responses each tier scored, and how well the tiers agreed"""
+
+    def __init__(self):
+        self.kept = 0
+        self.escalated = 0
+        self.by_reason: Dict[str, int] = {}
+        # reason -> score name -> absolute differences between the tiers
+        self.diffs: Dict[str, Dict[str, List[float]]] = {}
+
+    def record(self, reasons: List[str], cheap: Dict[str, Any], expensive: Optional[Dict[str, Any]]):
+        if expensive is None:
+            self.kept += 1
+            return
+        self.escalated += 1
+        for reason in reasons:
+            self.by_reason[reason] = self.by_reason.get(reason, 0) + 1
+        if 'error' in cheap or 'parse_warning' in cheap or 'error' in expensive:
+            return
+        cheap_scores = evaluation_scores(cheap)
+        expensive_scores = evaluation_scores(expensive)
+        for reason in reasons:
+            diffs = self.diffs.setdefault(reason, {})
+            for name, score in expensive_scores.items():
+                if name in cheap_scores:
+                    diffs.setdefault(name, []).append(abs(cheap_scores[name] - score))
+
+    def print_report(self, cheap_model: str, expensive_model: str):
+        total = self.kept + self.escalated
+        if not total:
+            return
+        print(f"  Judge cascade: {self.kept} of {total} responses kept from {cheap_model} "
+              f"({self.kept / total:.0%}), {self.escalated} escalated to {expensive_model}")
+        print(f"    {'Reason':15s} {'Escalated':>9s} {'Compared':>9s} {'Mean |diff|':>12s} {'Max |diff|':>11s} "
+              f"{'Agree':>6s}")
+        for reason in REASONS:
+            if reason not in self.by_reason:
+                continue
+            overall = self.diffs.get(reason, {}).get('overall_score', [])
+            if overall:
+                agree = sum(1 for d in overall if d <= AGREEMENT_TOLERANCE) / len(overall)
+                comparison = f"{sum(overall) / len(overall):12.2f} {max(overall):11.2f} {agree:6.0%}"
+            else:
+                comparison = f"{'-':>12s} {'-':>11s} {'-':>6s}"
+            print(f"    {reason:15s} {self.by_reason[reason]:9d} {len(overall):9d} {comparison}")
+
+        # Per-dimension disagreement on the audit sample estimates the error of kept responses
+        audit = self.diffs.get('audit', {})
+        if audit:
+            print(f"    Audit sample, mean |diff| per dimension (overall agreement within "
+                  f"{AGREEMENT_TOLERANCE} points):")
+            for name in DIMENSIONS:
+                if audit.get(name):
+                    print(f"      {name:30s} {sum(audit[name]) / len(audit[name]):.2f}")
+
+
+class JudgeCascade:
+    """Runs the cheap judge and escalates to the expensive one when needed"""
+
+    def __init__(self, cheap_model: str, expensive_model: str, judge_cache=None,
+                 margin: float = DEFAULT_ESCALATE_MARGIN, disagreement: float = DEFAULT_ESCALATE_DISAGREEMENT,
+                 audit_fraction: float = DEFAULT_AUDIT_FRACTION):
+        self.cheap_model = cheap_model
+        self.expensive_model = expensive_model
+        self.judge_cache = judge_cache
+        self.margin = margin
+        self.disagreement = disagreement
+        self.audit_fraction = audit_fraction
+        self.stats = CascadeStats()
+
+    async def evaluate(
+        self,
+        judge: Callable[[str], Awaitable[Tuple[Dict[str, Any], Optional[Dict[str, int]]]]],
+        cheap_key: str
+    ) -> Tuple[Dict[str, Any], Optional[Dict[str, int]], bool]:
+        """
+        judge(model) evaluates the job's response with that deployment.
+        Returns (evaluation, token usage, whether it came from the cheap judge);
+        the cheap judge's evaluation is cached under cheap_key.
+        """
+        cheap = self.judge_cache.get(cheap_key) if self.judge_cache else None
+        usage = None
+        if cheap is None:
+            cheap, usage = await judge(self.cheap_model)
+            if self.judge_cache:
+                self.judge_cache.put(cheap_key, cheap)
+
+        reasons = escalation_reasons(cheap, cheap_key, self.margin, self.disagreement, self.audit_fraction)
+        if not reasons:
+            self.stats.record(reasons, cheap, None)
+            return {**cheap, "cascade": {"judge": self.cheap_model, "escalated": False}}, usage, True
+
+        evaluation, usage = await judge(self.expensive_model)
+        self.stats.record(reasons, cheap, evaluation)
+        cascade = {"judge": self.expensive_model, "escalated": True, "reasons": reasons}
+        if 'error' not in cheap:
+            cascade["cheap_scores"] = evaluation_scores(cheap)
+        return {**evaluation, "cascade": cascade}, usage, False
+
+    def print_report(self):
+        self.stats.print_report(self.cheap_model, self.expensive_model)
+
+
+def add_cascade_arguments(parser):
+    """Add --cascade / --escalate-margin / --escalate-disagreement / --cascade-audit to an argparse parser"""
+    parser.add_argument('--cascade', metavar='CHEAP_DEPLOYMENT',
+                        help='Score every response with this cheaper deployment first and only escalate '
+                             'uncertain ones to the main judge')
+    parser.add_argument('--escalate-margin', type=float, default=DEFAULT_ESCALATE_MARGIN,
+                        help=f'With --cascade, escalate overall scores within this many points of a rubric '
+                             f'band edge (default: {DEFAULT_ESCALATE_MARGIN}, 0 to disable)')
+    parser.add_argument('--escalate-disagreement', type=float, default=DEFAULT_ESCALATE_DISAGREEMENT,
+                        help=f'With --cascade, escalate when the overall score is this far from the mean of '
+                             f'the dimension scores (default: {DEFAULT_ESCALATE_DISAGREEMENT})')
+    parser.add_argument('--cascade-audit', type=float, default=DEFAULT_AUDIT_FRACTION, metavar='FRACTION',
+                        help=f'With --cascade, fraction of unflagged responses escalated anyway to measure '
+                             f'agreement (default: {DEFAULT_AUDIT_FRACTION})')
+
+
+def judge_cascade_from_args(args, expensive_model: str, judge_cache=None) -> Optional[JudgeCascade]:
+    """Build a JudgeCascade from the arguments added by add_cascade_arguments (None without --cascade)"""
+    if not args.cascade:
+        return None
+    return JudgeCascade(args.cascade, expensive_model, judge_cache, args.escalate_margin,
+                        args.escalate_disagreement, args.cascade_audit)
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Judge output schema and field-level repair
+Used by evaluate_single_bot_aoai_robust.py, evaluate_single_bot_no_gt.py and
+evaluate_dual_rubric.py
+
+Every parsed evaluation is checked against a JSON Schema of the rubric's
+output format: overall_score and the dimension scores as numbers from 0 to
+10, plus the narrative fields the rubric asks for (fewer in --compact and
+--local-scoring modes).
+
+When scores are missing or invalid, a short follow-up turn is added to the
+same conversation asking for just the fields that failed, instead of
+re-evaluating the response with --retry-failed. The rubric and request are
+an identical prefix, so the provider's prompt cache serves most of the
+input, and the reply is a few dozen tokens. Evaluations that are still
+missing scores afterwards get a parse_warning as before; missing narrative
+fields are only recorded under "schema_problems".
+
+With --structured-output, the schema is also sent as the response_format
+(JSON Schema mode) so the provider enforces it. Deployments that reject it
+fall back to JSON mode for the rest of the run.
+"""
+
+import copy
+import json
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from json_recovery import recover_json
+from local_scorer import JUDGE_DIMENSIONS
+from rate_limiter import CircuitOpenError, RateLimiter, call_with_retry, estimate_tokens, prompt_cache_usage
+from rubric import DIMENSIONS
+
+JSON_MODE = {"type": "json_object"}
+
+# Output budget of a field repair call
+REPAIR_MAX_TOKENS = 600
+
+SCORE = {"type": "number", "minimum": 0, "maximum": 10}
+STRING = {"type": "string"}
+STRING_LIST = {"type": "array", "items": STRING}
+
+# Top-level fields holding scores; problems anywhere else don't fail an evaluation
+SCORE_FIELDS = ("overall_score", "dimension_scores")
+
+# Keywords left out of the response_format schema (not supported by strict mode)
+UNSUPPORTED_KEYWORDS = ("minimum", "maximum")
+
+
+def object_schema(properties: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """An object with exactly these properties, all required"""
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+def evaluation_schema(narrative_fields: Dict[str, Dict[str, Any]], subjective_only: bool = False,
+                      compact: bool = False) -> Dict[str, Any]:
+    """Schema of one evaluation in the rubric's format for a judging mode"""
+    properties: Dict[str, Dict[str, Any]] = {}
+    if not subjective_only:
+        properties["overall_score"] = SCORE
+    dimensions = JUDGE_DIMENSIONS if subjective_only else DIMENSIONS
+    properties["dimension_scores"] = object_schema({dim: SCORE for dim in dimensions})
+    if compact:
+        properties["rationale"] = STRING
+        return object_schema(properties)
+
+    properties.update(narrative_fields)
+    if not subjective_only:
+        properties["bullet_point_analysis"] = object_schema({
+            "bullet_count": {"type": "integer", "minimum": 0},
+            "prose_percentage": STRING,
+            "notes": STRING,
+        })
+    return object_schema(properties)
+
+
+def schema_problems(value: Any, schema: Dict[str, Any], path: str = "") -> List[str]:
+    """Dotted paths of required fields that are missing or don't match the schema"""
+    kind = schema.get("type")
+    if kind == "object":
+        if not isinstance(value, dict):
+            return [path]
+        problems = []
+        for name in schema.get("required", []):
+            field_path = f"{path}.{name}" if path else name
+            if name not in value:
+                problems.append(field_path)
+            else:
+                problems.extend(schema_problems(value[name], schema["properties"][name], field_path))
+        return problems
+    if kind == "array":
+        if not isinstance(value, list) or any(schema_problems(item, schema["items"]) for item in value):
+            return [path]
+        return []
+
+    if kind in ("number", "integer"):
+        valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+        if valid and kind == "integer":
+            valid = float(value).is_integer()
+        if valid and "minimum" in schema:
+            valid = value >= schema["minimum"]
+        if valid and "maximum" in schema:
+            valid = value <= schema["maximum"]
+    else:
+        valid = isinstance(value, str)
+    return [] if valid else [path]
+
+
+def is_score_problem(problem: str) -> bool:
+    return problem.split(".")[0] in SCORE_FIELDS
+
+
+def field_schema(schema: Dict[str, Any], path: str) -> Dict[str, Any]:
+    for name in path.split("."):
+        schema = schema["properties"][name]
+    return schema
+
+
+def repair_schema(schema: Dict[str, Any], problems: List[str]) -> Dict[str, Any]:
+    """The part of the schema covering just the failed fields"""
+    properties: Dict[str, Any] = {}
+    for problem in problems:
+        name, _, rest = problem.partition(".")
+        properties.setdefault(name, [])
+        if rest:
+            properties[name].append(rest)
+    return object_schema({
+        name: repair_schema(schema["properties"][name], nested) if nested else schema["properties"][name]
+        for name, nested in properties.items()
+    })
+
+
+def schema_template(schema: Dict[str, Any]) -> Any:
+    """Example value in the style of the rubric's output format (X for numbers)"""
+    kind = schema.get("type")
+    if kind == "object":
+        return {name: schema_template(field) for name, field in schema["properties"].items()}
+    if kind == "array":
+        return [schema_template(schema["items"])]
+    if kind in ("number", "integer"):
+        return "X"
+    return "..."
+
+
+def create_repair_request(schema: Dict[str, Any], problems: List[str], label: str = "evaluation") -> str:
+    """Follow-up request for just the failed fields"""
+    template = json.dumps(schema_template(repair_schema(schema, problems)), indent=2).replace('"X"', 'X')
+    fields = ", ".join(problems)
+    return f"""Your {label} above is incomplete: {fields} {"is" if len(problems) == 1 else "are"} missing or invalid.
+
+Return ONLY valid JSON with just these fields, in this form:
+{template}
+
+Give them exactly as you would have in the full evaluation. Do not repeat the other fields and do not include any text before or after the JSON."""
+
+
+def apply_repair(evaluation: Dict[str, Any], patch: Any, problems: List[str], schema: Dict[str, Any]) -> List[str]:
+    """Copy the failed fields that the repair reply got right into the evaluation"""
+    repaired = []
+    for problem in problems:
+        value = patch
+        for name in problem.split("."):
+            value = value.get(name) if isinstance(value, dict) else None
+        if value is None or schema_problems(value, field_schema(schema, problem)):
+            continue
+        *parents, name = problem.split(".")
+        target = evaluation
+        for parent in parents:
+            if not isinstance(target.get(parent), dict):
+                target[parent] = {}
+            target = target[parent]
+        target[name] = value
+        repaired.append(problem)
+    return repaired
+
+
+def strict_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of the schema without the keywords strict structured output rejects"""
+    schema = copy.deepcopy(schema)
+    stack = [schema]
+    while stack:
+        node = stack.pop()
+        for keyword in UNSUPPORTED_KEYWORDS:
+            node.pop(keyword, None)
+        stack.extend(node.get("properties", {}).values())
+        if "items" in node:
+            stack.append(node["items"])
+    return schema
+
+
+def is_schema_unsupported(error: Exception) -> bool:
+    """Whether an API error is the deployment rejecting JSON Schema response_format"""
+    status = getattr(error, 'status_code', None) or getattr(getattr(error, 'response', None), 'status_code', None)
+    message = str(error).lower()
+    return status == 400 and any(word in message for word in ("response_format", "json_schema", "structured"))
+
+
+# complete(messages, response_format, max_tokens) -> parsed chat completion
+CompleteFn = Callable[[List[Dict[str, str]], Dict[str, Any], int], Awaitable[Any]]
+
+
+def judge_completion(client, deployment_name: str, limiter: RateLimiter,
+                     sampling_params: Dict[str, Any]) -> CompleteFn:
+    """complete() for judge calls to one deployment, through the rate limiter"""
+    async def complete(messages: List[Dict[str, str]], response_format: Dict[str, Any], max_tokens: int) -> Any:
+        estimated = estimate_tokens("".join(message["content"] for message in messages)) + max_tokens
+        return await call_with_retry(
+            limiter,
+            client.chat.completions.with_raw_response.create,
+            estimated,
+            model=deployment_name,
+            messages=messages,
+            **{**sampling_params, "max_tokens": max_tokens, "response_format": response_format}
+        )
+    return complete
+
+
+class SchemaChecker:
+    """Validates evaluations, repairs missing fields and chooses the response_format"""
+
+    def __init__(self, structured: bool = False, repair: bool = True):
+        self.structured = structured
+        self.repair = repair
+        self.checked = 0
+        self.invalid = 0
+        self.repair_calls = 0
+        self.repaired = 0
+        self.repair_output_tokens = 0
+
+    def response_format(self, schema: Dict[str, Any], name: str) -> Dict[str, Any]:
+        if not self.structured:
+            return JSON_MODE
+        return {"type": "json_schema", "json_schema": {"name": name, "strict": True, "schema": strict_schema(schema)}}
+
+    async def create(self, complete: CompleteFn, messages: List[Dict[str, str]], schema: Dict[str, Any],
+                     name: str, max_tokens: int) -> Any:
+        """The judge call, in JSON Schema mode if enabled and supported"""
+        if self.structured:
+            try:
+                return await complete(messages, self.response_format(schema, name), max_tokens)
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                if not is_schema_unsupported(e):
+                    raise
+                if self.structured:
+                    self.structured = False
+                    print(f"⚠ Deployment rejected structured output, falling back to JSON mode: {str(e)[:100]}")
+        return await complete(messages, JSON_MODE, max_tokens)
+
+    async def check(self, evaluation: Dict[str, Any], schema: Dict[str, Any], name: str,
+                    complete: Optional[CompleteFn] = None, messages: Optional[List[Dict[str, str]]] = None,
+                    reply_text: str = "", label: str = "evaluation") -> Dict[str, Any]:
+        """
+        Validate an evaluation, asking the judge for failed score fields when
+        complete/messages (the original conversation) are given
+        """
+        if 'error' in evaluation:
+            return evaluation
+        self.checked += 1
+        problems = schema_problems(evaluation, schema)
+        if not problems:
+            return evaluation
+        self.invalid += 1
+
+        score_problems = [problem for problem in problems if is_score_problem(problem)]
+        # With nothing usable at all, a full re-evaluation is no more expensive
+        usable = set(schema["required"]) - {problem.split(".")[0] for problem in problems}
+        if score_problems and usable and self.repair and complete and messages:
+            evaluation = await self.request_repair(evaluation, schema, name, problems, complete,
+                                                   messages, reply_text, label)
+            problems = schema_problems(evaluation, schema)
+            score_problems = [problem for problem in problems if is_score_problem(problem)]
+
+        evaluation.pop("parse_warning", None)
+        if score_problems:
+            evaluation["parse_warning"] = f"Scores missing or invalid: {', '.join(score_problems)}"
+        if problems:
+            evaluation["schema_problems"] = problems
+        return evaluation
+
+    async def request_repair(self, evaluation: Dict[str, Any], schema: Dict[str, Any], name: str,
+                             problems: List[str], complete: CompleteFn, messages: List[Dict[str, str]],
+                             reply_text: str, label: str) -> Dict[str, Any]:
+        self.repair_calls += 1
+        patch_schema = repair_schema(schema, problems)
+        repair_messages = messages + [
+            {"role": "assistant", "content": reply_text},
+            {"role": "user", "content": create_repair_request(schema, problems, label)},
+        ]
+        try:
+            response = await self.create(complete, repair_messages, patch_schema, f"{name}_repair",
+                                         REPAIR_MAX_TOKENS)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            print(f"Field repair failed: {str(e)[:200]}")
+            return evaluation
+
+        usage = prompt_cache_usage(response)
+        if usage:
+            self.repair_output_tokens += usage["output_tokens"]
+        text = response.choices[0].message.content or ""
+        try:
+            patch = json.loads(text)
+        except json.JSONDecodeError:
+            patch, _ = recover_json(text)
+
+        repaired = apply_repair(evaluation, patch, problems, schema)
+        if len(repaired) == len(problems):
+            self.repaired += 1
+        evaluation["field_repair"] = {"fields": problems, "repaired": repaired}
+        if usage:
+            evaluation["field_repair"]["usage"] = usage
+        return evaluation
+
+    def print_report(self):
+        if not self.checked:
+            return
+        mode = "structured output" if self.structured else "JSON mode"
+        print(f"  Schema ({mode}): {self.checked - self.invalid}/{self.checked} evaluations valid as returned")
+        if self.repair_calls:
+            average = self.repair_output_tokens / self.repair_calls
+            print(f"  Field repair: {self.repaired}/{self.repair_calls} fully repaired by follow-up calls "
+                  f"(avg {average:.0f} output tokens each)")
+
+
+def add_schema_arguments(parser):
+    """Add --structured-output / --no-field-repair to an argparse parser"""
+    parser.add_argument('--structured-output', action='store_true',
+                        help='Send the output schema as a JSON Schema response_format (falls back to JSON '
+                             'mode if the deployment rejects it)')
+    parser.add_argument('--no-field-repair', action='store_true',
+                        help="Don't ask the judge again for missing or invalid scores")
+
+
+def schema_checker_from_args(args) -> SchemaChecker:
+    """Build a SchemaChecker from the arguments added by add_schema_arguments"""
+    return SchemaChecker(structured=args.structured_output, repair=not args.no_field_repair)
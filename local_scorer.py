@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Deterministic local scorer for the mechanical rubric dimensions
+Counts bullets, prose share, emoji (full Unicode, including ZWJ sequences,
+skin tones, flags and keycaps), follow-up questions and length in pure
+Python, and maps them onto the rubric's 0-10 bands for prose_vs_bullets,
+emoji_usage and length_conciseness. The judge then only scores the
+subjective dimensions (--local-scoring in the evaluators).
+
+Usage: python local_scorer.py <bot_name> [<bot_name> ...]
+Example: python local_scorer.py KimiBotTuned GPT4oRaw
+"""
+
+import re
+import sys
+from typing import Any, Dict, List
+
+from gather_responses import get_output_file_path, is_error_response
+from jsonl_io import read_jsonl
+from rubric import DIMENSIONS
+
+# Bump when feature extraction or score bands change; part of the judge cache
+# key so results scored by an older version are re-scored
+LOCAL_SCORER_VERSION = 3
+
+LOCAL_DIMENSIONS = ['prose_vs_bullets', 'emoji_usage', 'length_conciseness']
+JUDGE_DIMENSIONS = [
+    'warmth_validation', 'conversational_tone', 'practical_advice',
+    'followup_question', 'support_solutions_balance'
+]
+
+# Appended to the judge request when the mechanical dimensions are scored locally
+SUBJECTIVE_ONLY_INSTRUCTIONS = (
+    "Formatting (prose_vs_bullets), emoji_usage and length_conciseness are measured "
+    "separately: do NOT score them and omit bullet_point_analysis and overall_score. "
+    "In dimension_scores, return only: " + ", ".join(JUDGE_DIMENSIONS) + "."
+)
+
+# Symbols in these blocks render as plain text unless followed by VS16
+# (U+FE0F), so a check mark or star used as a list marker isn't an emoji
+_TEXT_DEFAULT = (
+    "[\U0001F000-\U0001F02F\U0001F0A0-\U0001F0FF\U0001F170-\U0001F251"
+    "\u2300-\u23FF\u2600-\u27BF\u2B00-\u2BFF\u3030\u303D\u3297\u3299]"
+)
+# Emoji_Presentation codepoints below U+1F300 (emoji-data.txt) and the
+# pictograph planes from U+1F300, which are emoji even without VS16
+_EMOJI_DEFAULT = (
+    "[\U0001F004\U0001F0CF\U0001F18E\U0001F191-\U0001F19A\U0001F201\U0001F21A"
+    "\U0001F22F\U0001F232-\U0001F236\U0001F238-\U0001F23A\U0001F250\U0001F251"
+    "\U0001F300-\U0001FAFF"
+    "\u231A\u231B\u23E9-\u23EC\u23F0\u23F3\u25FD\u25FE\u2614\u2615\u2648-\u2653"
+    "\u267F\u2693\u26A1\u26AA\u26AB\u26BD\u26BE\u26C4\u26C5\u26CE\u26D4\u26EA"
+    "\u26F2\u26F3\u26F5\u26FA\u26FD\u2705\u270A\u270B\u2728\u274C\u274E"
+    "\u2753-\u2755\u2757\u2795-\u2797\u27B0\u27BF\u2B1B\u2B1C\u2B50\u2B55]"
+)
+_PICTOGRAPH = f"(?:{_TEXT_DEFAULT}\uFE0F|{_EMOJI_DEFAULT})"
+_MODIFIER = "[\uFE0F\U0001F3FB-\U0001F3FF]*"  # variation selector, skin tones
+EMOJI_PATTERN = re.compile(
+    "[\U0001F1E6-\U0001F1FF]{2}"  # flags
+    "|[0-9#*]\uFE0F?\u20E3"  # keycaps
+    # ZWJ sequences; after a joiner a symbol is part of the emoji with or without VS16
+    f"|{_PICTOGRAPH}{_MODIFIER}(?:\u200D(?:{_TEXT_DEFAULT}|{_EMOJI_DEFAULT}){_MODIFIER})*"
+)
+
+BULLET_PATTERN = re.compile(r'^\s*(?:[-*+•·▪‣◦]|\d{1,2}[.)])\s+\S')
+HEADER_PATTERN = re.compile(r'^\s*(?:#{1,6}\s+\S|\*\*[^*]+\*\*:?\s*$|__[^_]+__:?\s*$)')
+BOLD_PATTERN = re.compile(r'\*\*[^*\n]+\*\*|__[^_\n]+__')
+WORD_PATTERN = re.compile(r"[\w'’]+")
+
+
+def count_emoji(text: str) -> List[str]:
+    """Every emoji in the text, with multi-codepoint sequences counted once"""
+    return EMOJI_PATTERN.findall(text)
+
+
+def extract_features(text: str) -> Dict[str, Any]:
+    """Mechanical metrics for one response"""
+    lines = [line for line in text.splitlines() if line.strip()]
+    bullet_lines = [line for line in lines if BULLET_PATTERN.match(line)]
+    header_lines = [line for line in lines if HEADER_PATTERN.match(line)]
+
+    total_chars = sum(len(line.strip()) for line in lines)
+    structured_chars = sum(len(line.strip()) for line in bullet_lines + header_lines)
+    prose_percentage = round(100 * (total_chars - structured_chars) / total_chars) if total_chars else 0
+
+    # Trailing emoji, quotes and closing punctuation don't hide a final question
+    tail = EMOJI_PATTERN.sub('', text).rstrip(" \t\n\"'”’)*_")
+    emoji = count_emoji(text)
+
+    return {
+        "bullet_count": len(bullet_lines),
+        "header_count": len(header_lines),
+        "bold_count": len(BOLD_PATTERN.findall(text)),
+        "prose_percentage": prose_percentage,
+        "emoji_count": len(emoji),
+        "emoji": emoji,
+        "question_count": text.count('?'),
+        "ends_with_question": tail.endswith('?'),
+        "word_count": len(WORD_PATTERN.findall(text)),
+        "paragraph_count": len([p for p in re.split(r'\n\s*\n', text) if p.strip()]),
+    }
+
+
+def score_prose_vs_bullets(features: Dict[str, Any]) -> int:
+    """Rubric bands: pure prose 9-10, 1-2 bullets 7-8, mix 5-6, heavy 3-4, lists 1-2"""
+    bullets = features["bullet_count"]
+    headers = features["header_count"]
+    prose = features["prose_percentage"]
+    if bullets == 0 and headers == 0:
+        return 10 if features["bold_count"] <= 1 else 9
+    if bullets <= 2 and headers == 0:
+        return 8
+    if prose >= 60:
+        return 6
+    if prose >= 30:
+        return 4
+    return 2
+
+
+def score_emoji_usage(features: Dict[str, Any]) -> int:
+    """
+    Both rubrics score 0 or 1 well-placed emoji 9-10 (Claude prefers none), so
+    0 and 1 score the same. The rest is a heuristic, not a rubric band:
+    2 emoji 8, 3 emoji 6, 4-5 emoji 4, more 2.
+    """
+    count = features["emoji_count"]
+    if count <= 1:
+        return 10
+    if count == 2:
+        return 8
+    if count == 3:
+        return 6
+    if count <= 5:
+        return 4
+    return 2
+
+
+def score_length_conciseness(features: Dict[str, Any]) -> int:
+    """Rubric bands: substantial but phone-readable, typically 2-4 paragraphs"""
+    words = features["word_count"]
+    paragraphs = features["paragraph_count"]
+    if words < 25:
+        return 2
+    if words < 50:
+        return 4
+    if words < 80:
+        return 7
+    if words <= 250:
+        return 10 if 2 <= paragraphs <= 4 else 9
+    if words <= 350:
+        return 8
+    if words <= 500:
+        return 6
+    if words <= 800:
+        return 4
+    return 2
+
+
+def score_locally(text: str) -> Dict[str, Any]:
+    """Features plus local scores for the mechanical dimensions"""
+    features = extract_features(text)
+    return {
+        "features": features,
+        "dimension_scores": {
+            "prose_vs_bullets": score_prose_vs_bullets(features),
+            "emoji_usage": score_emoji_usage(features),
+            "length_conciseness": score_length_conciseness(features),
+        }
+    }
+
+
+def merge_local_scores(evaluation: Dict[str, Any], local: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Combine a subjective-only judge evaluation with local scores
+    overall_score becomes the mean of the dimensions that have a score; a
+    dimension the judge left out stays out (rather than counting as 0) and
+    is reported in parse_warning
+    """
+    if 'error' in evaluation:
+        return evaluation
+
+    features = local["features"]
+    judged = evaluation.get('dimension_scores', {})
+    dimension_scores = {}
+    missing = []
+    for dim in DIMENSIONS:
+        if dim in LOCAL_DIMENSIONS:
+            dimension_scores[dim] = local["dimension_scores"][dim]
+        elif isinstance(judged.get(dim), (int, float)) and not isinstance(judged.get(dim), bool):
+            dimension_scores[dim] = judged[dim]
+        else:
+            missing.append(dim)
+
+    merged = dict(evaluation)
+    merged["dimension_scores"] = dimension_scores
+    merged["overall_score"] = round(sum(dimension_scores.values()) / len(dimension_scores), 2)
+    if missing and 'parse_warning' not in merged:
+        merged["parse_warning"] = f"Scores missing or invalid: {', '.join(missing)}"
+    merged["bullet_point_analysis"] = {
+        "bullet_count": features["bullet_count"],
+        "prose_percentage": f"{features['prose_percentage']}%",
+        "notes": f"Measured locally: {features['header_count']} headers, "
+                 f"{features['emoji_count']} emoji, {features['word_count']} words"
+    }
+    merged["local_features"] = features
+    merged["local_scorer_version"] = LOCAL_SCORER_VERSION
+    return merged
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python local_scorer.py <bot_name> [<bot_name> ...]")
+        print("\nExample: python local_scorer.py KimiBotTuned GPT4oRaw")
+        print("\nScores prose vs. bullets, emoji usage and length locally (no API calls)")
+        sys.exit(1)
+
+    print(f"{'Bot':24s} {'Prose':>6s} {'Emoji':>6s} {'Length':>7s} "
+          f"{'Bullets':>8s} {'Emoji/resp':>11s} {'Ends ?':>7s} {'Words':>6s}")
+    print("-" * 82)
+    for bot_name in sys.argv[1:]:
+        responses = [r for r in read_jsonl(get_output_file_path(bot_name)) if not is_error_response(r)]
+        if not responses:
+            print(f"{bot_name:24s} no responses")
+            continue
+
+        scored = [score_locally(r['response']) for r in responses]
+        n = len(scored)
+
+        def mean_score(dim: str) -> float:
+            return sum(s["dimension_scores"][dim] for s in scored) / n
+
+        def mean_feature(name: str) -> float:
+            return sum(s["features"][name] for s in scored) / n
+
+        print(f"{bot_name:24s} {mean_score('prose_vs_bullets'):6.2f} {mean_score('emoji_usage'):6.2f} "
+              f"{mean_score('length_conciseness'):7.2f} {mean_feature('bullet_count'):8.1f} "
+              f"{mean_feature('emoji_count'):11.2f} {mean_feature('ends_with_question'):7.0%} "
+              f"{mean_feature('word_count'):6.0f}")
+
+
+if __name__ == "__main__":
+    main()
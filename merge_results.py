@@ -1,104 +1,270 @@
 #!/usr/bin/env python3
 """
-Merge all individual evaluation JSON files into CSV summary and report
+Merge all evaluation results of a run into CSV summary and report
 Supports both with-GT and no-GT evaluation results
+
+Results are streamed from the results store one bot at a time: each one is
+written to the CSV as it arrives and folded into per-bot, per-dimension
+running statistics, so memory use doesn't grow with the number of results.
+Each bot's statistics and CSV rows are cached in the store with a fingerprint
+of its results, and only bots whose results changed are merged again.
+
+With NumPy installed, the per-query scores are also assembled into a dense
+bots × queries × scores matrix (saved as score_matrix.npz, see score_matrix.py)
+and the report's statistics, ranking and biggest differentiator are computed
+from it with vectorized operations. The report then also gives bootstrap
+confidence intervals and marks which gaps between adjacent bots in the ranking
+are significant in paired per-query tests (all pairs go to pairwise_tests.csv).
 """
 
-import json
+import argparse
 import csv
-import glob
-import sys
+import io
+import itertools
+import math
+import time
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
+
+from results_store import ResultsStore, add_store_arguments, ensure_imported, results_store_from_args, store_flag
+from rubric import DIMENSIONS
+
+try:
+    from score_matrix import ScoreMatrix
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
 
 # Configuration - can be overridden by command line args
 OUTPUT_DIR = "evaluation_results"
-INDIVIDUAL_RESULTS_DIR = f"{OUTPUT_DIR}/individual"
 CSV_OUTPUT_FILE = f"{OUTPUT_DIR}/scores_summary.csv"
 REPORT_FILE = f"{OUTPUT_DIR}/summary_report.txt"
-
-
-def load_all_results() -> List[Dict[str, Any]]:
-    """Load all individual JSON result files"""
-    results = []
-    json_files = glob.glob(f"{INDIVIDUAL_RESULTS_DIR}/*.json")
-
-    for filepath in json_files:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            results.append(json.load(f))
-
-    # Sort by bot name, then query index
-    results.sort(key=lambda x: (x['bot_name'], x['query_index']))
-    return results
-
-
-def save_csv_summary(all_results: List[Dict[str, Any]]):
-    """Save all results to a comprehensive CSV"""
-    if not all_results:
-        print("No results to save!")
-        return
-
-    fieldnames = [
-        'bot_name',
-        'query_index',
-        'user_query',
-        'overall_score',
-        'warmth_validation',
-        'prose_vs_bullets',
-        'emoji_usage',
-        'conversational_tone',
-        'practical_advice',
-        'followup_question',
-        'support_solutions_balance',
-        'length_conciseness',
-        'bullet_count',
-        'prose_percentage',
-        'most_claude_like',
-        'least_claude_like'
-    ]
-
+SCORE_MATRIX_FILE = f"{OUTPUT_DIR}/score_matrix.npz"
+PAIRWISE_FILE = f"{OUTPUT_DIR}/pairwise_tests.csv"
+
+# Gaps between bots with a Holm-adjusted paired-test p-value below this are reported as significant
+SIGNIFICANCE_LEVEL = 0.05
+
+CSV_FIELDNAMES = [
+    'bot_name',
+    'query_index',
+    'user_query',
+    'overall_score',
+    'warmth_validation',
+    'prose_vs_bullets',
+    'emoji_usage',
+    'conversational_tone',
+    'practical_advice',
+    'followup_question',
+    'support_solutions_balance',
+    'length_conciseness',
+    'bullet_count',
+    'prose_percentage',
+    'most_claude_like',
+    'least_claude_like',
+    'rationale'
+]
+
+# Per-bot statistics kept by the merge: overall score, every dimension, bullet count
+STAT_NAMES = ['overall_score'] + DIMENSIONS + ['bullet_count']
+
+# Bump when CSV columns or statistics change; cached per-bot merges are then rebuilt
+MERGE_CACHE_VERSION = 3
+
+
+class RunningStats:
+    """Online count, mean, variance, min and max of a stream of numbers"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self._mean = 0.0
+        self._m2 = 0.0  # Welford's sum of squared deviations
+
+    def add(self, value: float):
+        value = float(value)
+        self.count += 1
+        self.total += value
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value - self._mean)
+
+    @property
+    def mean(self) -> float:
+        # Summed in order, so it matches sum(scores) / len(scores) exactly
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (0 for fewer than two values)"""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def to_dict(self) -> Dict[str, float]:
+        return {"count": self.count, "total": self.total, "minimum": self.minimum,
+                "maximum": self.maximum, "mean": self._mean, "m2": self._m2}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, float]) -> 'RunningStats':
+        stats = cls()
+        stats.count = state["count"]
+        stats.total = state["total"]
+        stats.minimum = state["minimum"]
+        stats.maximum = state["maximum"]
+        stats._mean = state["mean"]
+        stats._m2 = state["m2"]
+        return stats
+
+
+def csv_row(result: Dict[str, Any]) -> Dict[str, Any]:
+    """One scores_summary.csv row for a result"""
+    eval_data = result['evaluation']
+    dim_scores = eval_data.get('dimension_scores', {})
+    bullet_analysis = eval_data.get('bullet_point_analysis', {})
+
+    return {
+        'bot_name': result['bot_name'],
+        'query_index': result['query_index'],
+        'user_query': result['user_query'][:100] + '...' if len(result['user_query']) > 100 else result['user_query'],
+        'overall_score': eval_data.get('overall_score', 0),
+        'warmth_validation': dim_scores.get('warmth_validation', 0),
+        'prose_vs_bullets': dim_scores.get('prose_vs_bullets', 0),
+        'emoji_usage': dim_scores.get('emoji_usage', 0),
+        'conversational_tone': dim_scores.get('conversational_tone', 0),
+        'practical_advice': dim_scores.get('practical_advice', 0),
+        'followup_question': dim_scores.get('followup_question', 0),
+        'support_solutions_balance': dim_scores.get('support_solutions_balance', 0),
+        'length_conciseness': dim_scores.get('length_conciseness', 0),
+        'bullet_count': bullet_analysis.get('bullet_count', 'N/A'),
+        'prose_percentage': bullet_analysis.get('prose_percentage', 'N/A'),
+        'most_claude_like': eval_data.get('most_claude_like', 'N/A')[:100],
+        'least_claude_like': eval_data.get('least_claude_like', 'N/A')[:100],
+        'rationale': eval_data.get('rationale', '')
+    }
+
+
+def result_scores(result: Dict[str, Any]) -> List[Optional[float]]:
+    """
+    A result's scores in STAT_NAMES order
+    bullet_count is None when the judge didn't report it (compact mode), so it
+    is left out of the statistics instead of counting as 0 bullets.
+    """
+    evaluation = result['evaluation']
+    dim_scores = evaluation.get('dimension_scores', {})
+    return ([evaluation.get('overall_score', 0)]
+            + [dim_scores.get(dim, 0) for dim in DIMENSIONS]
+            + [evaluation.get('bullet_point_analysis', {}).get('bullet_count')])
+
+
+def merge_bot(store: ResultsStore, bot_name: str) -> tuple:
+    """Stream one bot's results into (statistics, score rows, CSV rows)"""
+    stats = {name: RunningStats() for name in STAT_NAMES}
+    score_rows = []
+    rows = io.StringIO(newline='')
+    writer = csv.DictWriter(rows, fieldnames=CSV_FIELDNAMES)
+    for result in store.results(OUTPUT_DIR, bot_name):
+        writer.writerow(csv_row(result))
+        scores = result_scores(result)
+        for name, value in zip(STAT_NAMES, scores):
+            if value is not None:
+                stats[name].add(value)
+        score_rows.append([result['query_index']] + scores)
+    return stats, score_rows, rows.getvalue()
+
+
+def stream_merge(store: ResultsStore, full: bool = False) -> tuple:
+    """
+    Write the CSV summary and return per-bot statistics and scores
+    Bots whose results haven't changed since the last merge reuse their cached
+    statistics, scores and CSV rows; the rest are streamed from the store (all
+    of them with `full`). Returns ({bot_name: {stat name: RunningStats}},
+    {bot_name: [[query_index, score for each STAT_NAMES entry...], ...]}, with
+    None for a score the result doesn't have),
+    both empty if there were no results.
+    """
+    fingerprints = store.bot_fingerprints(OUTPUT_DIR, salt=f"merge-v{MERGE_CACHE_VERSION}")
+    cached = store.merge_fingerprints(OUTPUT_DIR)
+    store.delete_merge_aggregates(OUTPUT_DIR, [bot for bot in cached if bot not in fingerprints])
+    if not fingerprints:
+        return {}, {}
+
+    bot_stats: Dict[str, Dict[str, RunningStats]] = {}
+    bot_scores: Dict[str, List[List[float]]] = {}
+    merged = []
     with open(CSV_OUTPUT_FILE, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-
-        for result in all_results:
-            eval_data = result['evaluation']
-            dim_scores = eval_data.get('dimension_scores', {})
-            bullet_analysis = eval_data.get('bullet_point_analysis', {})
-
-            row = {
-                'bot_name': result['bot_name'],
-                'query_index': result['query_index'],
-                'user_query': result['user_query'][:100] + '...' if len(result['user_query']) > 100 else result['user_query'],
-                'overall_score': eval_data.get('overall_score', 0),
-                'warmth_validation': dim_scores.get('warmth_validation', 0),
-                'prose_vs_bullets': dim_scores.get('prose_vs_bullets', 0),
-                'emoji_usage': dim_scores.get('emoji_usage', 0),
-                'conversational_tone': dim_scores.get('conversational_tone', 0),
-                'practical_advice': dim_scores.get('practical_advice', 0),
-                'followup_question': dim_scores.get('followup_question', 0),
-                'support_solutions_balance': dim_scores.get('support_solutions_balance', 0),
-                'length_conciseness': dim_scores.get('length_conciseness', 0),
-                'bullet_count': bullet_analysis.get('bullet_count', 0),
-                'prose_percentage': bullet_analysis.get('prose_percentage', 'N/A'),
-                'most_claude_like': eval_data.get('most_claude_like', 'N/A')[:100],
-                'least_claude_like': eval_data.get('least_claude_like', 'N/A')[:100]
-            }
-            writer.writerow(row)
-
+        csv.DictWriter(f, fieldnames=CSV_FIELDNAMES).writeheader()
+
+        for bot_name in sorted(fingerprints):
+            if not full and cached.get(bot_name) == fingerprints[bot_name]:
+                aggregates, csv_rows = store.get_merge_aggregate(OUTPUT_DIR, bot_name)
+                bot_stats[bot_name] = {name: RunningStats.from_dict(state)
+                                       for name, state in aggregates['stats'].items()}
+                bot_scores[bot_name] = aggregates['scores']
+            else:
+                bot_stats[bot_name], bot_scores[bot_name], csv_rows = merge_bot(store, bot_name)
+                aggregates = {'stats': {name: stats.to_dict() for name, stats in bot_stats[bot_name].items()},
+                              'scores': bot_scores[bot_name]}
+                store.put_merge_aggregate(OUTPUT_DIR, bot_name, fingerprints[bot_name], aggregates, csv_rows)
+                merged.append(bot_name)
+            f.write(csv_rows)
+
+    reused = len(fingerprints) - len(merged)
+    print(f"Merged {len(merged)} bots with new or changed results"
+          f"{f', reused {reused} unchanged' if reused else ''}")
     print(f"CSV summary saved to: {CSV_OUTPUT_FILE}")
-
-
-def generate_summary_report(all_results: List[Dict[str, Any]]):
-    """Generate a human-readable summary report"""
-    # Group by bot
-    bot_results = {}
-    for result in all_results:
-        bot = result['bot_name']
-        if bot not in bot_results:
-            bot_results[bot] = []
-        bot_results[bot].append(result['evaluation'])
-
+    return bot_stats, bot_scores
+
+
+def rank_bots(bot_stats: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Bots by mean overall score, best first (without NumPy)"""
+    return sorted(bot_stats, key=lambda bot: bot_stats[bot]['overall_score'].mean, reverse=True)
+
+
+def find_biggest_differentiator(bot_stats: Dict[str, Dict[str, Any]]) -> Tuple[str, float]:
+    """The dimension whose bot means span the widest range, and that range (without NumPy)"""
+    dimension_range = {}
+    for dim in DIMENSIONS:
+        scores = [stats[dim].mean for stats in bot_stats.values()]
+        dimension_range[dim] = max(scores) - min(scores)
+    biggest_diff = max(dimension_range, key=dimension_range.get)
+    return biggest_diff, dimension_range[biggest_diff]
+
+
+def save_pairwise_tests(pair_tests: List[Any]):
+    """Write every paired comparison to the pairwise tests CSV"""
+    with open(PAIRWISE_FILE, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['bot_a', 'bot_b', 'common_queries', 'mean_diff', 'ci_lower', 'ci_upper',
+                         'p_value', 'p_adjusted', 'significant'])
+        for test in pair_tests:
+            writer.writerow([test.bot_a, test.bot_b, test.common, f"{test.mean_diff:.4f}",
+                             f"{test.lower:.4f}", f"{test.upper:.4f}", f"{test.p_value:.4f}",
+                             f"{test.p_adjusted:.4f}", test.p_adjusted < SIGNIFICANCE_LEVEL])
+    print(f"Pairwise tests saved to: {PAIRWISE_FILE}")
+
+
+def format_interval(interval: Tuple[float, float]) -> str:
+    return f"CI {interval[0]:.2f}-{interval[1]:.2f}"
+
+
+def generate_summary_report(bot_stats: Dict[str, Dict[str, Any]], ranking: List[str],
+                            differentiator: Optional[Tuple[str, float]],
+                            intervals: Optional[Dict[str, Dict[str, Tuple[float, float]]]] = None,
+                            pair_tests: Optional[List[Any]] = None):
+    """
+    Generate a human-readable summary report
+    bot_stats maps bot -> stat name -> object with count, mean, std, minimum and
+    maximum (RunningStats or score_matrix.ScoreSummary). intervals (bootstrap
+    confidence intervals) and pair_tests (score_matrix.PairedTest, covering at
+    least every bot against the ones ranked below it) are optional.
+    """
     with open(REPORT_FILE, 'w', encoding='utf-8') as f:
         f.write("=" * 80 + "\n")
         f.write("TEEN SUPPORT BOT - TONE EVALUATION SUMMARY\n")
@@ -108,47 +274,41 @@ def generate_summary_report(all_results: List[Dict[str, Any]]):
         f.write("OVERALL SCORES COMPARISON\n")
         f.write("-" * 80 + "\n\n")
 
-        bot_summary = {}
-        for bot_name, evaluations in bot_results.items():
-            avg_overall = sum(e.get('overall_score', 0) for e in evaluations) / len(evaluations)
-            bot_summary[bot_name] = avg_overall
-
-        # Sort by score descending
-        for bot_name in sorted(bot_summary, key=bot_summary.get, reverse=True):
-            score = bot_summary[bot_name]
+        # Sorted by score descending
+        for bot_name in ranking:
+            score = bot_stats[bot_name]['overall_score'].mean
             bar = "█" * int(score) + "░" * (10 - int(score))
-            f.write(f"{bot_name:20s} {score:5.2f}/10  {bar}\n")
+            ci = f"  ({format_interval(intervals[bot_name]['overall_score'])})" if intervals else ""
+            f.write(f"{bot_name:20s} {score:5.2f}/10  {bar}{ci}\n")
 
         f.write("\n")
 
         # Detailed per-bot analysis
-        for bot_name, evaluations in sorted(bot_results.items()):
+        for bot_name, stats in sorted(bot_stats.items()):
             f.write(f"\n{'=' * 80}\n")
             f.write(f"BOT: {bot_name}\n")
             f.write(f"{'=' * 80}\n\n")
 
-            # Calculate averages
-            avg_overall = sum(e.get('overall_score', 0) for e in evaluations) / len(evaluations)
+            overall = stats['overall_score']
+            dimension_avgs = {dim: stats[dim].mean for dim in DIMENSIONS}
 
-            dimension_avgs = {}
-            for dim in ['warmth_validation', 'prose_vs_bullets', 'emoji_usage',
-                       'conversational_tone', 'practical_advice', 'followup_question',
-                       'support_solutions_balance', 'length_conciseness']:
-                scores = [e.get('dimension_scores', {}).get(dim, 0) for e in evaluations]
-                dimension_avgs[dim] = sum(scores) / len(scores)
-
-            f.write(f"Overall Average Score: {avg_overall:.2f}/10\n\n")
+            f.write(f"Overall Average Score: {overall.mean:.2f}/10\n")
+            f.write(f"  (std dev {overall.std:.2f}, range {overall.minimum:.2f}-{overall.maximum:.2f}, "
+                    f"{overall.count} responses)\n\n")
             f.write("Dimension Averages:\n")
             for dim, avg in sorted(dimension_avgs.items(), key=lambda x: x[1], reverse=True):
                 dim_display = dim.replace('_', ' ').title()
                 bar = "█" * int(avg) + "░" * (10 - int(avg))
-                f.write(f"  {dim_display:35s} {avg:.2f}/10  {bar}\n")
+                ci = f", {format_interval(intervals[bot_name][dim])}" if intervals else ""
+                f.write(f"  {dim_display:35s} {avg:.2f}/10  {bar}  (sd {stats[dim].std:.2f}{ci})\n")
 
             # Bullet point analysis
-            bullet_counts = [e.get('bullet_point_analysis', {}).get('bullet_count', 0)
-                           for e in evaluations]
-            avg_bullets = sum(bullet_counts) / len(bullet_counts) if bullet_counts else 0
-            f.write(f"\nAverage Bullet Points per Response: {avg_bullets:.1f}\n")
+            bullets = stats['bullet_count']
+            if bullets.count:
+                reported = f" ({bullets.count} responses reporting it)" if bullets.count < overall.count else ""
+                f.write(f"\nAverage Bullet Points per Response: {bullets.mean:.1f}{reported}\n")
+            else:
+                f.write("\nAverage Bullet Points per Response: not reported (compact mode)\n")
 
             # Best/worst dimensions
             best_dim = max(dimension_avgs, key=dimension_avgs.get)
@@ -161,94 +321,127 @@ def generate_summary_report(all_results: List[Dict[str, Any]]):
         f.write("KEY INSIGHTS\n")
         f.write(f"{'=' * 80}\n\n")
 
-        if len(bot_results) >= 2:
-            # Find biggest differentiator dimension
-            dimension_variance = {}
-            for dim in ['warmth_validation', 'prose_vs_bullets', 'emoji_usage',
-                       'conversational_tone', 'practical_advice', 'followup_question',
-                       'support_solutions_balance', 'length_conciseness']:
-                scores = []
-                for bot_name, evaluations in bot_results.items():
-                    avg = sum(e.get('dimension_scores', {}).get(dim, 0) for e in evaluations) / len(evaluations)
-                    scores.append(avg)
-                dimension_variance[dim] = max(scores) - min(scores)
-
-            biggest_diff = max(dimension_variance, key=dimension_variance.get)
+        if len(bot_stats) >= 2 and differentiator:
+            biggest_diff, score_range = differentiator
             f.write(f"Biggest Differentiator: {biggest_diff.replace('_', ' ').title()}\n")
-            f.write(f"  (Score range: {dimension_variance[biggest_diff]:.2f} points)\n\n")
+            f.write(f"  (Score range: {score_range:.2f} points)\n\n")
 
             # Show scores for this dimension across bots
-            for bot_name, evaluations in sorted(bot_results.items()):
-                avg = sum(e.get('dimension_scores', {}).get(biggest_diff, 0) for e in evaluations) / len(evaluations)
-                f.write(f"  {bot_name:20s} {avg:.2f}/10\n")
+            for bot_name, stats in sorted(bot_stats.items()):
+                f.write(f"  {bot_name:20s} {stats[biggest_diff].mean:.2f}/10\n")
+
+        if pair_tests:
+            tests = {(test.bot_a, test.bot_b): test for test in pair_tests}
+            f.write(f"\nRanking Gaps (paired per-query tests on overall score, Holm-adjusted p < {SIGNIFICANCE_LEVEL} "
+                    f"over all {len(pair_tests)} pairs):\n")
+            for upper_bot, lower_bot in zip(ranking, ranking[1:]):
+                test = tests[(upper_bot, lower_bot)]
+                verdict = "significant" if test.p_adjusted < SIGNIFICANCE_LEVEL else "not significant"
+                p_value = "p<0.001" if test.p_value < 0.001 else f"p={test.p_value:.3f}"
+                p_adjusted = "adjusted p<0.001" if test.p_adjusted < 0.001 else f"adjusted p={test.p_adjusted:.3f}"
+                f.write(f"  {upper_bot:20s} vs {lower_bot:20s} {test.mean_diff:+.2f}  "
+                        f"(CI {test.lower:+.2f} to {test.upper:+.2f}, {p_value}, {p_adjusted})  {verdict}\n")
+
+            top = ranking[0]
+            tied = [bot for bot in ranking[1:] if tests[(top, bot)].p_adjusted >= SIGNIFICANCE_LEVEL]
+            f.write(f"\nNot significantly different from {top}: {', '.join(tied) if tied else 'none'}\n")
 
     print(f"Summary report saved to: {REPORT_FILE}")
 
 
 def main():
     """Main merge pipeline"""
-    global OUTPUT_DIR, INDIVIDUAL_RESULTS_DIR, CSV_OUTPUT_FILE, REPORT_FILE
-
-    # Check for command line arguments
-    eval_type = "with-gt"  # Default
-    if len(sys.argv) > 1:
-        if sys.argv[1] == "--no-gt":
-            eval_type = "no-gt"
-            OUTPUT_DIR = "evaluation_results_no_gt"
-            INDIVIDUAL_RESULTS_DIR = f"{OUTPUT_DIR}/individual"
-            CSV_OUTPUT_FILE = f"{OUTPUT_DIR}/scores_summary.csv"
-            REPORT_FILE = f"{OUTPUT_DIR}/summary_report.txt"
-        elif sys.argv[1] in ["--help", "-h"]:
-            print("Usage: python merge_results.py [--no-gt]")
-            print("\nOptions:")
-            print("  (default)    Merge with-ground-truth evaluations (evaluation_results/)")
-            print("  --no-gt      Merge no-ground-truth evaluations (evaluation_results_no_gt/)")
-            return
-        else:
-            print(f"Unknown option: {sys.argv[1]}")
-            print("Usage: python merge_results.py [--no-gt]")
-            return
+    global OUTPUT_DIR, CSV_OUTPUT_FILE, REPORT_FILE, SCORE_MATRIX_FILE, PAIRWISE_FILE
+
+    parser = argparse.ArgumentParser(description="Merge evaluation results into a CSV summary and report")
+    parser.add_argument('--no-gt', action='store_true',
+                        help='Merge no-ground-truth evaluations (evaluation_results_no_gt/) '
+                             'instead of with-ground-truth ones (evaluation_results/)')
+    parser.add_argument('--full', action='store_true',
+                        help='Re-merge every bot instead of only those whose results changed')
+    parser.add_argument('--bootstrap', type=int, default=2000, metavar='N',
+                        help='Resamples for bootstrap confidence intervals and paired tests '
+                             '(default: 2000, 0 to skip; requires numpy)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Random seed for the resamples (default: 0)')
+    add_store_arguments(parser)
+    args = parser.parse_args()
+
+    eval_type = "no-gt" if args.no_gt else "with-gt"
+    if args.no_gt:
+        OUTPUT_DIR = "evaluation_results_no_gt"
+        CSV_OUTPUT_FILE = f"{OUTPUT_DIR}/scores_summary.csv"
+        REPORT_FILE = f"{OUTPUT_DIR}/summary_report.txt"
+        SCORE_MATRIX_FILE = f"{OUTPUT_DIR}/score_matrix.npz"
+        PAIRWISE_FILE = f"{OUTPUT_DIR}/pairwise_tests.csv"
 
     eval_type_display = "WITHOUT Ground Truth" if eval_type == "no-gt" else "WITH Ground Truth"
     print(f"Merging Evaluation Results ({eval_type_display})")
     print("=" * 80)
-
-    # Load all individual results
-    print(f"\nLoading individual result files from: {INDIVIDUAL_RESULTS_DIR}/")
-    all_results = load_all_results()
-
-    if not all_results:
-        print(f"No results found in {INDIVIDUAL_RESULTS_DIR}/")
+    start_time = time.monotonic()
+
+    # Stream changed results into the CSV and per-bot statistics
+    print(f"\nStreaming results of run '{OUTPUT_DIR}' from: {args.results_store}")
+    Path(OUTPUT_DIR).mkdir(exist_ok=True)
+    store = results_store_from_args(args)
+    try:
+        ensure_imported(store, OUTPUT_DIR)
+        print("Generating CSV summary...")
+        bot_stats, bot_scores = stream_merge(store, args.full)
+    finally:
+        store.close()
+
+    if not bot_stats:
+        print(f"No results found for run '{OUTPUT_DIR}'")
         print(f"Run evaluate_single_bot{'_no_gt' if eval_type == 'no-gt' else '_aoai_robust'}.py first.")
         return
 
-    # Count by bot
-    bot_counts = {}
-    for result in all_results:
-        bot = result['bot_name']
-        bot_counts[bot] = bot_counts.get(bot, 0) + 1
-
-    print(f"\nFound {len(all_results)} total evaluations:")
-    for bot, count in sorted(bot_counts.items()):
-        print(f"  - {bot}: {count} responses")
-
-    # Save CSV summary
-    print("\nGenerating CSV summary...")
-    save_csv_summary(all_results)
+    print(f"\nFound {sum(stats['overall_score'].count for stats in bot_stats.values())} total evaluations:")
+    for bot, stats in sorted(bot_stats.items()):
+        print(f"  - {bot}: {stats['overall_score'].count} responses")
+
+    # Score matrix and vectorized statistics
+    if NUMPY_AVAILABLE:
+        matrix = ScoreMatrix.from_rows(bot_scores, STAT_NAMES)
+        matrix.save(SCORE_MATRIX_FILE)
+        print(f"\nScore matrix ({len(matrix.bots)} bots × {len(matrix.queries)} queries × "
+              f"{len(matrix.names)} scores) saved to: {SCORE_MATRIX_FILE}")
+        summaries = matrix.summaries()
+        ranking = matrix.ranking()
+        differentiator = matrix.biggest_differentiator(DIMENSIONS) if len(matrix.bots) >= 2 else None
+        intervals, pair_tests = None, None
+        if args.bootstrap > 0:
+            resample_start = time.monotonic()
+            intervals = matrix.bootstrap_intervals(args.bootstrap, seed=args.seed)
+            pair_tests = matrix.paired_tests(list(itertools.combinations(ranking, 2)),
+                                             resamples=args.bootstrap, seed=args.seed)
+            print(f"Bootstrap intervals and {len(pair_tests)} paired tests "
+                  f"({args.bootstrap} resamples) in {time.monotonic() - resample_start:.2f}s")
+            save_pairwise_tests(pair_tests)
+    else:
+        print("\n⚠ numpy not installed - skipping score matrix (pip install numpy)")
+        summaries = bot_stats
+        ranking = rank_bots(bot_stats)
+        differentiator = find_biggest_differentiator(bot_stats) if len(bot_stats) >= 2 else None
+        intervals, pair_tests = None, None
 
     # Generate summary report
-    print("Generating summary report...")
-    generate_summary_report(all_results)
+    print("\nGenerating summary report...")
+    generate_summary_report(summaries, ranking, differentiator, intervals, pair_tests)
 
     print("\n" + "=" * 80)
-    print(f"Merge complete! ({eval_type_display})")
+    print(f"Merge complete! ({eval_type_display}) in {time.monotonic() - start_time:.2f}s")
     print("=" * 80)
     print(f"\nOutput files:")
     print(f"  - CSV Summary: {CSV_OUTPUT_FILE}")
     print(f"  - Summary Report: {REPORT_FILE}")
+    if NUMPY_AVAILABLE:
+        print(f"  - Score Matrix: {SCORE_MATRIX_FILE}")
+        if pair_tests:
+            print(f"  - Pairwise Tests: {PAIRWISE_FILE}")
 
     if eval_type == "with-gt":
-        print(f"\nTo merge no-GT results: python merge_results.py --no-gt")
+        print(f"\nTo merge no-GT results: python merge_results.py --no-gt{store_flag(args)}")
 
 
 if __name__ == "__main__":
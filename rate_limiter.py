@@ -0,0 +1,624 @@
+#!/usr/bin/env python3
+"""
+Shared rate limiting and retry layer for gather and evaluate clients
+
+- Token buckets enforce requests-per-minute (RPM) and tokens-per-minute (TPM)
+  budgets using a token estimate made before each call
+- Retry-After / retry-after-ms and x-ratelimit-* (or anthropic-ratelimit-*)
+  response headers pause or drain the buckets to match the server's view
+- Throttled, overloaded and dropped calls are retried with jittered
+  exponential backoff before the error is surfaced to the caller
+- The in-flight limit adapts (AIMD): it halves on 429/5xx or rising latency
+  and grows by about one slot per round of successful calls
+- A circuit breaker pauses every caller while the endpoint is down, and
+  gives up with CircuitOpenError if it stays down
+- Cached-token counts from each response's usage block are totalled so a
+  run can report how often the provider's prompt cache hit
+"""
+
+import asyncio
+import random
+import re
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Buckets hold this fraction of the per-minute budget, so a burst can never
+# use more than ~10 seconds worth of quota (Azure enforces RPM/TPM per 10s)
+BURST_FRACTION = 1 / 6
+
+DEFAULT_MAX_RETRIES = 6
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+
+# Status codes worth retrying: timeout, conflict, throttled, server errors
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+# Exceptions without a status code that are still transient
+RETRYABLE_ERROR_NAMES = {"APIConnectionError", "APITimeoutError", "TimeoutError"}
+
+# Status codes that mean the endpoint itself is unusable (count toward the breaker)
+ENDPOINT_DOWN_STATUS_CODES = {401, 403, 404}
+
+# AIMD tuning
+OVERLOAD_DECREASE_FACTOR = 0.5
+LATENCY_DECREASE_FACTOR = 0.8
+LATENCY_BACKOFF_RATIO = 2.0      # recent latency vs. baseline that counts as congestion
+LATENCY_WARMUP_CALLS = 10
+MIN_DECREASE_INTERVAL = 2.0      # seconds; one decrease per burst of failures
+
+# Circuit breaker tuning
+BREAKER_FAILURE_THRESHOLD = 5    # consecutive endpoint failures before opening
+BREAKER_RESET_SECONDS = 15.0     # first pause before a probe call
+BREAKER_MAX_RESET_SECONDS = 120.0
+BREAKER_MAX_OPEN_SECONDS = 600.0  # give up if the endpoint stays down this long
+
+
+class CircuitOpenError(Exception):
+    """Raised when the endpoint has been down for longer than the breaker will wait"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)"""
+    return len(text) // 4 + 1
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """
+    Parse a reset/retry duration into seconds
+    Accepts plain seconds ("1.5"), Go-style durations ("6m0s", "20ms"),
+    RFC 3339 timestamps and HTTP dates
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    parts = re.findall(r'(\d+(?:\.\d+)?)(ms|h|m|s)', value)
+    if parts and ''.join(n + u for n, u in parts) == value:
+        scale = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+        return sum(float(n) * scale[u] for n, u in parts)
+
+    for parse in (lambda v: datetime.fromisoformat(v.replace('Z', '+00:00')), parsedate_to_datetime):
+        try:
+            when = parse(value)
+        except (TypeError, ValueError):
+            continue
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+    return None
+
+
+def _header(headers: Any, *names: str) -> Optional[str]:
+    """Return the first present header value (headers may be httpx.Headers or a dict)"""
+    if not headers:
+        return None
+    for name in names:
+        value = headers.get(name)
+        if value is None and isinstance(headers, dict):
+            value = headers.get(name.title())
+        if value is not None:
+            return value
+    return None
+
+
+def parse_retry_after(headers: Any) -> Optional[float]:
+    """Seconds the server asked us to wait, if it said"""
+    retry_ms = _header(headers, 'retry-after-ms')
+    if retry_ms is not None:
+        try:
+            return max(0.0, float(retry_ms) / 1000)
+        except ValueError:
+            pass
+    return parse_duration(_header(headers, 'retry-after'))
+
+
+class TokenBucket:
+    """Continuously refilling bucket; capacity and refill rate derive from a per-minute limit"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = max(1.0, per_minute * BURST_FRACTION)
+        self.refill_per_second = per_minute / 60
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.refill_per_second)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` can be taken (requests larger than the bucket wait for a full bucket)"""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.refill_per_second
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def give_back(self, amount: float):
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+    def drain_to(self, remaining: float):
+        """Lower the level to what the server reports as remaining"""
+        self._refill()
+        self.level = min(self.level, remaining)
+
+
+class AdaptiveConcurrency:
+    """
+    In-flight limit that adapts between 1 and `max_limit` (AIMD)
+    With adaptive=False the limit stays fixed at `max_limit`
+    """
+
+    def __init__(self, max_limit: int, adaptive: bool = True):
+        self.max_limit = max(1, max_limit)
+        self.adaptive = adaptive
+        self.limit = float(max(1, self.max_limit // 2)) if adaptive else float(self.max_limit)
+        self.in_flight = 0
+        self.latency_fast: Optional[float] = None
+        self.latency_baseline: Optional[float] = None
+        self.latency_samples = 0
+        self.last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self, latency: float):
+        if not self.adaptive:
+            return
+
+        # Fast EWMA tracks recent calls, slow EWMA is the baseline
+        if self.latency_fast is None:
+            self.latency_fast = self.latency_baseline = latency
+        else:
+            self.latency_fast += 0.3 * (latency - self.latency_fast)
+            self.latency_baseline += 0.02 * (latency - self.latency_baseline)
+        self.latency_samples += 1
+
+        if (self.latency_samples >= LATENCY_WARMUP_CALLS
+                and self.latency_fast > LATENCY_BACKOFF_RATIO * self.latency_baseline):
+            self._decrease(LATENCY_DECREASE_FACTOR)
+        else:
+            # +1/limit per success is about +1 per round of `limit` calls
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def on_overload(self):
+        if self.adaptive:
+            self._decrease(OVERLOAD_DECREASE_FACTOR)
+
+    def _decrease(self, factor: float):
+        now = time.monotonic()
+        if now - self.last_decrease < MIN_DECREASE_INTERVAL:
+            return
+        self.limit = max(1.0, self.limit * factor)
+        self.last_decrease = now
+
+
+class CircuitBreaker:
+    """
+    closed -> open after BREAKER_FAILURE_THRESHOLD consecutive endpoint failures
+    open -> half-open after the reset pause, letting a single probe call through
+    half-open -> closed if the probe succeeds, open (longer pause) if it fails
+    """
+
+    def __init__(self):
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.reset_seconds = BREAKER_RESET_SECONDS
+        self.retry_at = 0.0
+        self.down_since: Optional[float] = None
+        self.gave_up = False
+        self.trips = 0
+
+    async def before_call(self):
+        """Wait while the breaker is open; raises CircuitOpenError once it gives up"""
+        while True:
+            if self.gave_up:
+                raise CircuitOpenError("Endpoint unavailable: circuit breaker gave up")
+            if self.state == "closed":
+                return
+
+            now = time.monotonic()
+            if now - self.down_since > BREAKER_MAX_OPEN_SECONDS:
+                self.gave_up = True
+                print(f"\n✗ Circuit breaker: endpoint down for over {BREAKER_MAX_OPEN_SECONDS:.0f}s, giving up")
+                continue
+
+            if self.state == "open" and now >= self.retry_at:
+                self.state = "half-open"
+                return
+
+            await asyncio.sleep(max(0.1, min(1.0, self.retry_at - now)))
+
+    def record_success(self):
+        if self.state != "closed":
+            print("\n✓ Circuit breaker closed: endpoint is responding again")
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.reset_seconds = BREAKER_RESET_SECONDS
+        self.down_since = None
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == "half-open":
+            self.reset_seconds = min(BREAKER_MAX_RESET_SECONDS, self.reset_seconds * 2)
+            self._open()
+        elif self.state == "closed" and self.consecutive_failures >= BREAKER_FAILURE_THRESHOLD:
+            self._open()
+
+    def _open(self):
+        now = time.monotonic()
+        if self.down_since is None:
+            self.down_since = now
+        self.state = "open"
+        self.retry_at = now + self.reset_seconds
+        self.trips += 1
+        print(f"\n⚠ Circuit breaker open after {self.consecutive_failures} consecutive failures, "
+              f"pausing {self.reset_seconds:.0f}s before probing the endpoint")
+
+
+class RateLimiter:
+    """
+    RPM/TPM limiter, adaptive in-flight limit and circuit breaker shared by
+    every call to one endpoint
+    A limit of None disables that budget (retries still apply)
+    """
+
+    def __init__(
+        self,
+        rpm: Optional[float] = None,
+        tpm: Optional[float] = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        max_concurrency: Optional[int] = None,
+        adaptive: bool = True
+    ):
+        self.max_retries = max_retries
+        self.concurrency = AdaptiveConcurrency(max_concurrency, adaptive) if max_concurrency else None
+        self.breaker = CircuitBreaker()
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.paused_until = 0.0
+        self._lock = asyncio.Lock()
+        self.stats = {
+            "requests": 0,
+            "retries": 0,
+            "rate_limited": 0,
+            "failures": 0,
+            "wait_seconds": 0.0,
+            # Provider prompt caching, from each response's usage block
+            "usage_reported": 0,
+            "cache_hits": 0,
+            "input_tokens": 0,
+            "cached_tokens": 0,
+            "cache_write_tokens": 0,
+        }
+
+    def describe(self) -> str:
+        rpm = f"{self.requests.refill_per_second * 60:.0f}" if self.requests else "unlimited"
+        tpm = f"{self.tokens.refill_per_second * 60:.0f}" if self.tokens else "unlimited"
+        return f"RPM {rpm}, TPM {tpm}"
+
+    def status(self) -> str:
+        """Current in-flight limit and breaker state, for progress lines"""
+        parts = []
+        if self.concurrency:
+            parts.append(f"limit {int(self.concurrency.limit)}/{self.concurrency.max_limit}")
+        parts.append(f"breaker {self.breaker.state}")
+        return ", ".join(parts)
+
+    async def acquire(self, estimated_tokens: int):
+        """Wait until both budgets allow one request of `estimated_tokens`"""
+        # The lock makes waiters queue up in arrival order
+        async with self._lock:
+            while True:
+                wait = self.paused_until - time.monotonic()
+                if self.requests:
+                    wait = max(wait, self.requests.wait_time(1))
+                if self.tokens:
+                    wait = max(wait, self.tokens.wait_time(estimated_tokens))
+                if wait <= 0:
+                    break
+                self.stats["wait_seconds"] += wait
+                await asyncio.sleep(wait)
+
+            if self.requests:
+                self.requests.take(1)
+            if self.tokens:
+                self.tokens.take(estimated_tokens)
+            self.stats["requests"] += 1
+
+    def pause(self, seconds: float):
+        """Stop all callers from sending for `seconds`"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: Optional[int]):
+        """Return over-estimated tokens to the TPM bucket once usage is known"""
+        if self.tokens and actual_tokens is not None and actual_tokens < estimated_tokens:
+            self.tokens.give_back(estimated_tokens - actual_tokens)
+
+    def record_usage(self, usage: Optional[Dict[str, int]]):
+        """Add one response's prompt_cache_usage() to the run totals"""
+        if not usage:
+            return
+        self.stats["usage_reported"] += 1
+        if usage["cached_tokens"]:
+            self.stats["cache_hits"] += 1
+        for name in ("input_tokens", "cached_tokens", "cache_write_tokens"):
+            self.stats[name] += usage[name]
+
+    def update_from_headers(self, headers: Any):
+        """Sync the buckets with x-ratelimit-* / anthropic-ratelimit-* headers"""
+        remaining_requests = _header(headers, 'x-ratelimit-remaining-requests',
+                                     'anthropic-ratelimit-requests-remaining')
+        remaining_tokens = _header(headers, 'x-ratelimit-remaining-tokens',
+                                   'anthropic-ratelimit-tokens-remaining')
+
+        for remaining, bucket, reset_names in (
+            (remaining_requests, self.requests,
+             ('x-ratelimit-reset-requests', 'anthropic-ratelimit-requests-reset')),
+            (remaining_tokens, self.tokens,
+             ('x-ratelimit-reset-tokens', 'anthropic-ratelimit-tokens-reset')),
+        ):
+            if remaining is None:
+                continue
+            try:
+                remaining = float(remaining)
+            except ValueError:
+                continue
+            if bucket:
+                bucket.drain_to(remaining)
+            if remaining <= 0:
+                reset = parse_duration(_header(headers, *reset_names))
+                if reset:
+                    self.pause(reset)
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status
+
+
+def is_endpoint_failure(error: Exception) -> bool:
+    """True for errors that suggest the endpoint is down rather than busy"""
+    status = _status_code(error)
+    if status is not None:
+        return status >= 500 or status in ENDPOINT_DOWN_STATUS_CODES
+    return is_retryable(error)
+
+
+def is_retryable(error: Exception) -> bool:
+    """True for throttling, server-side and connection errors"""
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES or status >= 500
+    return type(error).__name__ in RETRYABLE_ERROR_NAMES or isinstance(error, asyncio.TimeoutError)
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff"""
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+def _usage_tokens(response: Any) -> Optional[int]:
+    """Total tokens from an OpenAI or Anthropic usage block"""
+    usage = getattr(response, 'usage', None)
+    if usage is None:
+        return None
+    total = getattr(usage, 'total_tokens', None)
+    if total is None:
+        input_tokens = getattr(usage, 'input_tokens', None)
+        output_tokens = getattr(usage, 'output_tokens', None)
+        if input_tokens is None or output_tokens is None:
+            return None
+        total = input_tokens + output_tokens
+    return total
+
+
+def prompt_cache_usage(response: Any) -> Optional[Dict[str, int]]:
+    """
+    Input, cached and output token counts from an OpenAI or Anthropic usage block
+    input_tokens always includes the cached part (Anthropic reports it separately)
+    """
+    usage = getattr(response, 'usage', None)
+    if usage is None:
+        return None
+
+    prompt_tokens = getattr(usage, 'prompt_tokens', None)
+    if prompt_tokens is not None:
+        # OpenAI / Azure OpenAI: automatic prefix caching
+        details = getattr(usage, 'prompt_tokens_details', None)
+        return {
+            "input_tokens": prompt_tokens,
+            "cached_tokens": getattr(details, 'cached_tokens', None) or 0,
+            "cache_write_tokens": 0,
+            "output_tokens": getattr(usage, 'completion_tokens', None) or 0,
+        }
+
+    input_tokens = getattr(usage, 'input_tokens', None)
+    if input_tokens is None:
+        return None
+    # Anthropic: explicit cache_control breakpoints
+    cache_read = getattr(usage, 'cache_read_input_tokens', None) or 0
+    cache_write = getattr(usage, 'cache_creation_input_tokens', None) or 0
+    return {
+        "input_tokens": input_tokens + cache_read + cache_write,
+        "cached_tokens": cache_read,
+        "cache_write_tokens": cache_write,
+        "output_tokens": getattr(usage, 'output_tokens', None) or 0,
+    }
+
+
+async def call_with_retry(
+    limiter: RateLimiter,
+    create: Callable[..., Awaitable[Any]],
+    estimated_tokens: int,
+    **kwargs
+) -> Any:
+    """
+    Call `create(**kwargs)` through the limiter, retrying transient failures
+
+    `create` must return a raw SDK response (client.<...>.with_raw_response.create)
+    so rate-limit headers can be read; the parsed response is returned.
+    Non-retryable errors, and the last error once retries run out, are raised.
+    CircuitOpenError is raised if the endpoint stays down.
+    """
+    attempt = 0
+    while True:
+        await limiter.breaker.before_call()
+        if limiter.concurrency:
+            await limiter.concurrency.acquire()
+
+        error = None
+        try:
+            await limiter.acquire(estimated_tokens)
+            started = time.monotonic()
+            raw = await create(**kwargs)
+            latency = time.monotonic() - started
+        except Exception as e:
+            error = e
+        finally:
+            if limiter.concurrency:
+                await limiter.concurrency.release()
+
+        if error is None:
+            limiter.breaker.record_success()
+            if limiter.concurrency:
+                limiter.concurrency.on_success(latency)
+            limiter.update_from_headers(getattr(raw, 'headers', None))
+            response = raw.parse()
+            limiter.reconcile(estimated_tokens, _usage_tokens(response))
+            limiter.record_usage(prompt_cache_usage(response))
+            return response
+
+        status = _status_code(error)
+        if limiter.concurrency and (status == 429 or (status is not None and status >= 500)):
+            limiter.concurrency.on_overload()
+        if is_endpoint_failure(error):
+            limiter.breaker.record_failure()
+        else:
+            # Any other answer (even a 429) means the endpoint is up
+            limiter.breaker.record_success()
+
+        # While the breaker is open it decides how long to wait, so failures
+        # during an outage don't use up this call's retries
+        out_of_retries = attempt >= limiter.max_retries and limiter.breaker.state == "closed"
+        if not is_retryable(error) or out_of_retries:
+            limiter.stats["failures"] += 1
+            raise error
+
+        headers = getattr(getattr(error, 'response', None), 'headers', None)
+        limiter.update_from_headers(headers)
+        delay = parse_retry_after(headers)
+        if status == 429:
+            limiter.stats["rate_limited"] += 1
+            # Server-specified waits apply to every caller sharing the quota
+            delay = delay if delay is not None else backoff_delay(attempt)
+            limiter.pause(delay)
+        elif delay is None:
+            delay = backoff_delay(attempt)
+
+        limiter.stats["retries"] += 1
+        if limiter.breaker.state == "closed":
+            attempt += 1
+        await asyncio.sleep(delay)
+
+
+def split_usage(usage: Optional[Dict[str, int]], parts: int) -> List[Optional[Dict[str, int]]]:
+    """
+    Divide one call's token counts between the `parts` results it produced
+    (e.g. a batched judge call), so summing over results counts the call once
+    Shares add up exactly; other fields (such as batch_size) are copied.
+    """
+    if not usage:
+        return [None] * parts
+    shares = [dict(usage) for _ in range(parts)]
+    for key, value in usage.items():
+        if key.endswith('_tokens'):
+            base, extra = divmod(value, parts)
+            for i, share in enumerate(shares):
+                share[key] = base + (1 if i < extra else 0)
+    return shares
+
+
+def combine_usage(first: Optional[Dict[str, int]], second: Optional[Dict[str, int]]) -> Optional[Dict[str, int]]:
+    """Token counts of two calls made for the same result, added up"""
+    if not first or not second:
+        return first or second
+    combined = dict(second)
+    for key, value in first.items():
+        if key.endswith('_tokens'):
+            combined[key] = combined.get(key, 0) + value
+    return combined
+
+
+def format_limiter_stats(limiter: RateLimiter) -> str:
+    """One-line summary for the end-of-run report"""
+    stats = limiter.stats
+    summary = (f"{stats['requests']} requests, {stats['retries']} retries "
+               f"({stats['rate_limited']} rate limited), {stats['failures']} gave up, "
+               f"{stats['wait_seconds']:.1f}s waiting for quota")
+    if limiter.breaker.trips:
+        summary += f", circuit breaker tripped {limiter.breaker.trips}x"
+    return summary
+
+
+def format_prompt_cache_stats(limiter: RateLimiter) -> str:
+    """One-line provider prompt cache summary for the end-of-run report"""
+    stats = limiter.stats
+    if not stats["usage_reported"]:
+        return "no usage reported"
+    hit_rate = stats["cache_hits"] / stats["usage_reported"] * 100
+    cached_share = stats["cached_tokens"] / stats["input_tokens"] * 100 if stats["input_tokens"] else 0.0
+    summary = (f"{stats['cache_hits']}/{stats['usage_reported']} requests hit ({hit_rate:.1f}%), "
+               f"{stats['cached_tokens']:,} of {stats['input_tokens']:,} input tokens "
+               f"served from cache ({cached_share:.1f}%)")
+    if stats["cache_write_tokens"]:
+        summary += f", {stats['cache_write_tokens']:,} written to cache"
+    return summary
+
+
+def add_rate_limit_arguments(parser):
+    """Add --rpm / --tpm / --max-retries / --fixed-concurrency to an argparse parser"""
+    parser.add_argument('--rpm', type=float,
+                        help='Requests-per-minute quota (default: unlimited)')
+    parser.add_argument('--tpm', type=float,
+                        help='Tokens-per-minute quota (default: unlimited)')
+    parser.add_argument('--max-retries', type=int, default=DEFAULT_MAX_RETRIES,
+                        help=f'Retries for throttled or failed calls (default: {DEFAULT_MAX_RETRIES})')
+    parser.add_argument('--fixed-concurrency', action='store_true',
+                        help='Keep the in-flight limit at --concurrency instead of adapting it')
+
+
+def rate_limiter_from_args(args, max_concurrency: int) -> RateLimiter:
+    """Build a RateLimiter from the arguments added by add_rate_limit_arguments"""
+    return RateLimiter(
+        rpm=args.rpm,
+        tpm=args.tpm,
+        max_retries=args.max_retries,
+        max_concurrency=max_concurrency,
+        adaptive=not args.fixed_concurrency
+    )
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Indexed dataset of the prompts and every bot's responses (standard library)
+
+`build` packs input-prompts.csv and bot_responses/Output - * Responses.jsonl
+into one file. Scripts memory-map it and fetch any prompt or response
+through an offset table keyed by (query, bot), without reading or parsing
+the rest. Row N is prompt N of input-prompts.csv, and each response sits
+on the row of the prompt it answers, matched by gather_responses.query_id
+rather than by its line in the response file:
+
+    from response_dataset import open_dataset
+    dataset = open_dataset()              # None if not built or out of date
+    dataset.response(12, 'ClaudeBot')     # text of ClaudeBot's response to prompt 12
+
+Layout: magic, UTF-8 text of every prompt and response, offset table
+(int64 offset and length per prompt × [prompt, bot...]; length -1 where
+a bot has no response to that prompt), JSON header, then a trailer pointing at the header.
+The header records the size and mtime of every source file. A dataset
+whose sources have changed since it was built is not used, and scripts
+read the source files as before.
+
+Usage:
+  python response_dataset.py build [--output <file>]   # (re)build after gathering responses
+  python response_dataset.py info                      # bots, query and response counts
+  python response_dataset.py get <query_index> <bot_name> # print one response
+"""
+
+import argparse
+import csv
+import glob
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from gather_responses import is_error_response, query_id
+from jsonl_io import iter_jsonl_fields
+
+DATASET_FILE = "response_dataset.bin"
+INPUT_PROMPTS_FILE = "input-prompts.csv"
+BOT_RESPONSES_DIR = "bot_responses"
+RESPONSE_FILE_PREFIX = "Output - "
+RESPONSE_FILE_SUFFIX = " Responses.jsonl"
+
+MAGIC = b"RESPDS01"
+VERSION = 2
+_ENTRY = struct.Struct('<qq')    # offset, length of one table cell
+_TRAILER = struct.Struct('<QQ')  # header offset, header length (followed by MAGIC)
+MISSING = -1
+
+# Open datasets by path, so every loader in a process shares one mapping
+_OPEN: Dict[str, Optional["ResponseDataset"]] = {}
+
+
+def response_file_path(bot_name: str) -> str:
+    return f"{BOT_RESPONSES_DIR}/{RESPONSE_FILE_PREFIX}{bot_name}{RESPONSE_FILE_SUFFIX}"
+
+
+def find_response_files() -> Dict[str, str]:
+    """bot name -> response file, for every response file in BOT_RESPONSES_DIR"""
+    pattern = response_file_path('*')
+    files = {}
+    for path in sorted(glob.glob(pattern)):
+        name = os.path.basename(path)[len(RESPONSE_FILE_PREFIX):-len(RESPONSE_FILE_SUFFIX)]
+        files[name] = path.replace(os.sep, '/')
+    return files
+
+
+def source_fingerprints(paths: List[str]) -> Dict[str, List[int]]:
+    """path -> [size, mtime_ns] of each source file"""
+    fingerprints = {}
+    for path in paths:
+        stat = os.stat(path)
+        fingerprints[path] = [stat.st_size, stat.st_mtime_ns]
+    return fingerprints
+
+
+def _read_prompts(filepath: str) -> List[str]:
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return [row['userQuery'] for row in csv.DictReader(f)]
+
+
+def build_dataset(output: str = DATASET_FILE) -> Dict[str, Any]:
+    """
+    Pack the prompts and every bot's responses into `output`
+    Row N of the table is prompt N; each response is placed on the row of
+    the prompt its query matches (by query_id, not by line number), as in
+    gather_responses.order_responses. Responses to queries that aren't in
+    the prompt file are left out and counted in the header's "unmatched".
+    Text is written as it's read (response files are streamed), so memory
+    holds only the offset table. Returns the header.
+    """
+    prompts = _read_prompts(INPUT_PROMPTS_FILE)
+    response_files = find_response_files()
+    bots = list(response_files)
+    # Fingerprint first: a file changed while building makes the result stale, not wrong
+    sources = source_fingerprints([INPUT_PROMPTS_FILE] + list(response_files.values()))
+
+    rows_by_id: Dict[str, List[int]] = {}
+    for row, prompt in enumerate(prompts):
+        rows_by_id.setdefault(query_id(prompt), []).append(row)
+
+    # (offset, length) of each row's value, one flat array per column: prompts, then each bot
+    cells: List[array] = []
+    counts: Dict[str, int] = {}
+    unmatched: Dict[str, int] = {}
+    temp_path = f"{output}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(MAGIC)
+
+        def write_text(text: str) -> Tuple[int, int]:
+            data = text.encode('utf-8')
+            offset = f.tell()
+            f.write(data)
+            return offset, len(data)
+
+        column = array('q')
+        for prompt in prompts:
+            column.extend(write_text(prompt))
+        cells.append(column)
+
+        for bot_name in bots:
+            column = array('q', [0, MISSING]) * len(prompts)
+            errored = [False] * len(prompts)
+            unmatched[bot_name] = 0
+            for entry in iter_jsonl_fields(response_files[bot_name], ('query', 'response')):
+                rows = rows_by_id.get(query_id(entry['query'])) if isinstance(entry.get('query'), str) else None
+                if not rows:
+                    unmatched[bot_name] += 1
+                    continue
+                is_error = is_error_response(entry)
+                # A later entry wins for a repeated query, unless it is an error and the earlier one isn't
+                if column[2 * rows[0] + 1] != MISSING and is_error and not errored[rows[0]]:
+                    continue
+                cell = write_text(entry['response']) if isinstance(entry.get('response'), str) else (0, MISSING)
+                for row in rows:
+                    column[2 * row:2 * row + 2] = array('q', cell)
+                    errored[row] = is_error
+            cells.append(column)
+            counts[bot_name] = sum(1 for row in range(len(prompts)) if column[2 * row + 1] != MISSING)
+
+        table = array('q', [0, MISSING]) * (len(prompts) * len(cells))
+        for column_index, values in enumerate(cells):
+            for row in range(len(prompts)):
+                index = 2 * (row * len(cells) + column_index)
+                table[index:index + 2] = values[2 * row:2 * row + 2]
+        if sys.byteorder != 'little':
+            table.byteswap()
+        table_offset = f.tell()
+        f.write(table.tobytes())
+
+        header = {
+            "version": VERSION,
+            "prompts": len(prompts),
+            "bots": bots,
+            "counts": counts,
+            "unmatched": unmatched,
+            "table_offset": table_offset,
+            "sources": sources,
+        }
+        header_bytes = json.dumps(header, ensure_ascii=False).encode('utf-8')
+        header_offset = f.tell()
+        f.write(header_bytes)
+        f.write(_TRAILER.pack(header_offset, len(header_bytes)))
+        f.write(MAGIC)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, output)
+    _OPEN.pop(output, None)
+    return header
+
+
+class ResponseDataset:
+    """Read-only, memory-mapped view of a built dataset; query_index is the 1-based prompt row"""
+
+    def __init__(self, filepath: str = DATASET_FILE):
+        self.filepath = filepath
+        with open(filepath, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        trailer_start = len(self._map) - _TRAILER.size - len(MAGIC)
+        if (trailer_start < len(MAGIC) or self._map[:len(MAGIC)] != MAGIC
+                or self._map[trailer_start + _TRAILER.size:] != MAGIC):
+            self.close()
+            raise ValueError(f"{filepath} is not a response dataset (or was cut off); rebuild it")
+        header_offset, header_length = _TRAILER.unpack_from(self._map, trailer_start)
+        self.header = json.loads(self._map[header_offset:header_offset + header_length].decode('utf-8'))
+        if self.header.get("version") != VERSION:
+            self.close()
+            raise ValueError(f"{filepath} was built by another version; rebuild it")
+        self.bots: List[str] = self.header["bots"]
+        self._columns = {bot_name: column for column, bot_name in enumerate(self.bots, start=1)}
+        self._table_offset = self.header["table_offset"]
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def is_current(self) -> bool:
+        """Whether no source file has been changed, added or removed since the build"""
+        sources = self.header["sources"]
+        expected = [INPUT_PROMPTS_FILE] + list(find_response_files().values())
+        if set(expected) != set(sources):
+            return False
+        try:
+            return source_fingerprints(expected) == sources
+        except OSError:
+            return False
+
+    def has_bot(self, bot_name: str) -> bool:
+        return bot_name in self._columns
+
+    def prompt_count(self) -> int:
+        return self.header["prompts"]
+
+    def response_count(self, bot_name: str) -> int:
+        """Prompts the bot had a response to when the dataset was built"""
+        return self.header["counts"][bot_name]
+
+    def _text(self, query_index: int, column: int) -> Optional[str]:
+        if not 1 <= query_index <= self.prompt_count():
+            return None
+        cell = (query_index - 1) * (len(self.bots) + 1) + column
+        offset, length = _ENTRY.unpack_from(self._map, self._table_offset + cell * _ENTRY.size)
+        if length == MISSING:
+            return None
+        return self._map[offset:offset + length].decode('utf-8')
+
+    def prompt(self, query_index: int) -> Optional[str]:
+        return self._text(query_index, 0)
+
+    def response(self, query_index: int, bot_name: str) -> Optional[str]:
+        """A bot's response to prompt query_index (None if it has none); KeyError for an unknown bot"""
+        return self._text(query_index, self._columns[bot_name])
+
+    def prompts(self) -> List[str]:
+        return [self.prompt(query_index) for query_index in range(1, self.prompt_count() + 1)]
+
+    def iter_responses(self, bot_name: str) -> Iterator[Dict[str, Any]]:
+        """A bot's entries ({'query', 'response'}) in prompt order, skipping prompts it has no response to"""
+        column = self._columns[bot_name]
+        for query_index in range(1, self.prompt_count() + 1):
+            text = self._text(query_index, column)
+            if text is not None:
+                yield {'query': self.prompt(query_index), 'response': text}
+
+
+def open_dataset(filepath: str = DATASET_FILE) -> Optional[ResponseDataset]:
+    """
+    The dataset at filepath if it exists and matches its sources, else None
+    Opened and checked once per process; a stale dataset is reported once.
+    """
+    if filepath not in _OPEN:
+        dataset = None
+        if os.path.exists(filepath):
+            try:
+                dataset = ResponseDataset(filepath)
+            except (OSError, ValueError) as e:
+                print(f"   ⚠ Not using {filepath}: {e}")
+            else:
+                if not dataset.is_current():
+                    print(f"   ⚠ {filepath} is out of date; reading response files instead "
+                          f"(rebuild with: python response_dataset.py build)")
+                    dataset.close()
+                    dataset = None
+        _OPEN[filepath] = dataset
+    return _OPEN[filepath]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indexed dataset of prompts and bot responses")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Pack prompts and all response files")
+    build_parser.add_argument('--output', default=DATASET_FILE, help=f'Dataset file (default: {DATASET_FILE})')
+    info_parser = subparsers.add_parser("info", help="Show what a dataset holds")
+    info_parser.add_argument('--dataset', default=DATASET_FILE, help=f'Dataset file (default: {DATASET_FILE})')
+    get_parser = subparsers.add_parser("get", help="Print one response")
+    get_parser.add_argument('query_index', type=int, help='1-based row of the prompt in input-prompts.csv')
+    get_parser.add_argument('bot_name', help='Bot name as in its response file')
+    get_parser.add_argument('--dataset', default=DATASET_FILE, help=f'Dataset file (default: {DATASET_FILE})')
+    args = parser.parse_args()
+
+    if args.command == "build":
+        header = build_dataset(args.output)
+        size_mb = os.path.getsize(args.output) / (1024 * 1024)
+        print(f"✓ Packed {header['prompts']} prompts and {len(header['bots'])} bots' responses "
+              f"into {args.output} ({size_mb:.1f} MB)")
+        for bot_name, unmatched in header["unmatched"].items():
+            if unmatched:
+                print(f"  ⚠ {bot_name}: {unmatched} responses to queries not in {INPUT_PROMPTS_FILE} left out")
+        return
+
+    if not os.path.exists(args.dataset):
+        print(f"Error: {args.dataset} not found (build it with: python response_dataset.py build)")
+        sys.exit(1)
+    try:
+        dataset = ResponseDataset(args.dataset)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    with dataset:
+        if args.command == "info":
+            status = "up to date" if dataset.is_current() else "out of date (rebuild it)"
+            print(f"{args.dataset}: {dataset.prompt_count()} prompts, {len(dataset.bots)} bots, {status}")
+            for bot_name in dataset.bots:
+                unmatched = dataset.header["unmatched"][bot_name]
+                note = f" ({unmatched} to queries not in {INPUT_PROMPTS_FILE}, left out)" if unmatched else ""
+                print(f"  {bot_name}: {dataset.response_count(bot_name)} responses{note}")
+        else:
+            if not dataset.has_bot(args.bot_name):
+                print(f"Error: no responses for {args.bot_name} in {args.dataset}")
+                sys.exit(1)
+            text = dataset.response(args.query_index, args.bot_name)
+            if text is None:
+                print(f"Error: {args.bot_name} has no response to query {args.query_index}")
+                sys.exit(1)
+            print(text)
+
+
+if __name__ == "__main__":
+    main()
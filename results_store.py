@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Consolidated store of evaluation results (SQLite, standard library)
+
+One row per (run, bot, query) replaces the individual/<bot>_query_NNN.json
+files. A run is a results directory such as "evaluation_results" or
+"evaluation_results_no_gt". Evaluators write through a batched writer (one
+transaction per batch); merges, failure scans and reruns are indexed
+queries instead of directory walks.
+
+Usage:
+  python results_store.py import [<results_dir> ...]   # one-shot import of individual/ trees
+  python results_store.py export [<run> ...]           # write back the individual/ JSON layout
+  python results_store.py list                         # runs and result counts
+  python results_store.py clear <run> [--bot <bot_name>] # delete results to re-evaluate them
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+RESULTS_STORE_FILE = "evaluation_results.sqlite"
+
+# individual/<bot>_query_NNN.json, as written by result_filename
+RESULT_FILENAME_PATTERN = re.compile(r'^(.+)_query_(\d+)\.json$')
+
+# Commit buffered results after this many or this many seconds, whichever comes first
+COMMIT_EVERY = 50
+COMMIT_INTERVAL_SECONDS = 2.0
+
+# (bot_name, query_index) -> status of that result; see ResultsStore.manifest
+Manifest = Dict[Tuple[str, int], Dict[str, Any]]
+
+
+def individual_dir(run: str) -> str:
+    """Directory of the per-query JSON files for a run"""
+    return f"{run}/individual"
+
+
+def result_filename(run: str, bot_name: str, query_index: int) -> str:
+    """Path of a result's JSON file in the exported layout"""
+    return f"{individual_dir(run)}/{bot_name}_query_{query_index:03d}.json"
+
+
+def failure_reason(evaluation: Dict[str, Any]) -> str:
+    """Why an evaluation counts as failed for find_failed_evals ('' if it doesn't)"""
+    if 'error' in evaluation:
+        return f"Error: {str(evaluation['error'])[:100]}"
+    if evaluation.get('overall_score', 0) == 0.0:
+        dim_scores = evaluation.get('dimension_scores', {})
+        if all(score == 0 for score in dim_scores.values()):
+            return "All scores are 0"
+    if 'parse_warning' in evaluation:
+        return "JSON parsing issue (partial parse)"
+    return ""
+
+
+class ResultsStore:
+    """SQLite results table keyed by (run, bot_name, query_index) with a batched writer"""
+
+    def __init__(self, filepath: str = RESULTS_STORE_FILE):
+        self.filepath = filepath
+        self.conn = sqlite3.connect(filepath)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS results (
+                run TEXT NOT NULL,
+                bot_name TEXT NOT NULL,
+                query_index INTEGER NOT NULL,
+                user_query TEXT NOT NULL,
+                overall_score REAL,
+                error TEXT,
+                failure_reason TEXT NOT NULL,
+                cache_key TEXT,
+                content_hash TEXT,
+                result TEXT NOT NULL,
+                updated REAL NOT NULL,
+                PRIMARY KEY (run, bot_name, query_index)
+            )
+        """)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(results)")}
+        if 'content_hash' not in columns:
+            self.conn.execute("ALTER TABLE results ADD COLUMN content_hash TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_results_failure ON results (run, failure_reason)")
+        # Per-bot merge output cached by merge_results, keyed by a fingerprint of the bot's results
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS merge_aggregates (
+                run TEXT NOT NULL,
+                bot_name TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                aggregates TEXT NOT NULL,
+                csv_rows TEXT NOT NULL,
+                PRIMARY KEY (run, bot_name)
+            )
+        """)
+        self.conn.commit()
+
+        self.pending: List[tuple] = []
+        self.last_commit = time.monotonic()
+
+    def put(self, run: str, result: Dict[str, Any]):
+        """Queue one result (the individual/ JSON document) for the next batch commit"""
+        evaluation = result.get('evaluation', {})
+        overall = evaluation.get('overall_score')
+        data = json.dumps(result, ensure_ascii=False)
+        self.pending.append((
+            run,
+            result['bot_name'],
+            result['query_index'],
+            result['user_query'],
+            float(overall) if isinstance(overall, (int, float)) else None,
+            str(evaluation['error']) if 'error' in evaluation else None,
+            failure_reason(evaluation),
+            result.get('cache_key'),
+            hashlib.sha256(data.encode('utf-8')).hexdigest(),
+            data,
+            time.time(),
+        ))
+        if len(self.pending) >= COMMIT_EVERY or time.monotonic() - self.last_commit >= COMMIT_INTERVAL_SECONDS:
+            self.flush()
+
+    def flush(self):
+        """Write all queued results in one transaction"""
+        if self.pending:
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO results (run, bot_name, query_index, user_query, overall_score, "
+                    "error, failure_reason, cache_key, content_hash, result, updated) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    self.pending)
+            self.pending = []
+        self.last_commit = time.monotonic()
+
+    def manifest(self, run: str) -> Manifest:
+        """
+        Status of every result of a run from one indexed scan, without parsing
+        the stored documents: overall score, error, failure reason, judge
+        cache key, content hash and last update time per (bot, query)
+        """
+        self.flush()
+        rows = self.conn.execute(
+            "SELECT bot_name, query_index, overall_score, error, failure_reason, cache_key, content_hash, updated "
+            "FROM results WHERE run = ?", (run,))
+        return {
+            (bot_name, query_index): {
+                "overall_score": overall_score,
+                "error": error,
+                "failure_reason": reason,
+                "cache_key": cache_key,
+                "content_hash": content_hash,
+                "updated": updated,
+            }
+            for bot_name, query_index, overall_score, error, reason, cache_key, content_hash, updated in rows
+        }
+
+    def get(self, run: str, bot_name: str, query_index: int) -> Optional[Dict[str, Any]]:
+        """One full result (None if there is none)"""
+        self.flush()
+        row = self.conn.execute(
+            "SELECT result FROM results WHERE run = ? AND bot_name = ? AND query_index = ?",
+            (run, bot_name, query_index)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def results(self, run: str, bot_name: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Every full result of a run (or of one bot in it), ordered by bot name then query index"""
+        self.flush()
+        if bot_name is None:
+            cursor = self.conn.execute(
+                "SELECT result FROM results WHERE run = ? ORDER BY bot_name, query_index", (run,))
+        else:
+            cursor = self.conn.execute(
+                "SELECT result FROM results WHERE run = ? AND bot_name = ? ORDER BY query_index", (run, bot_name))
+        for (data,) in cursor:
+            yield json.loads(data)
+
+    def bot_fingerprints(self, run: str, salt: str = "") -> Dict[str, str]:
+        """
+        Hash of each bot's results (query indices and content hashes) from the
+        status columns only; changes whenever any of the bot's results does
+        """
+        self.flush()
+        hashers: Dict[str, Any] = {}
+        rows = self.conn.execute(
+            "SELECT bot_name, query_index, content_hash, updated FROM results WHERE run = ? "
+            "ORDER BY bot_name, query_index", (run,))
+        for bot_name, query_index, content_hash, updated in rows:
+            hasher = hashers.get(bot_name)
+            if hasher is None:
+                hasher = hashers[bot_name] = hashlib.sha256(salt.encode('utf-8'))
+            hasher.update(f"{query_index}:{content_hash or updated};".encode('utf-8'))
+        return {bot_name: hasher.hexdigest() for bot_name, hasher in hashers.items()}
+
+    def merge_fingerprints(self, run: str) -> Dict[str, str]:
+        """Fingerprint each cached merge aggregate was built from"""
+        return dict(self.conn.execute(
+            "SELECT bot_name, fingerprint FROM merge_aggregates WHERE run = ?", (run,)).fetchall())
+
+    def get_merge_aggregate(self, run: str, bot_name: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        """(aggregates, CSV rows) cached for a bot, or None"""
+        row = self.conn.execute(
+            "SELECT aggregates, csv_rows FROM merge_aggregates WHERE run = ? AND bot_name = ?",
+            (run, bot_name)).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def put_merge_aggregate(self, run: str, bot_name: str, fingerprint: str,
+                            aggregates: Dict[str, Any], csv_rows: str):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO merge_aggregates (run, bot_name, fingerprint, aggregates, csv_rows) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (run, bot_name, fingerprint, json.dumps(aggregates), csv_rows))
+
+    def delete_merge_aggregates(self, run: str, bot_names: List[str]):
+        with self.conn:
+            self.conn.executemany(
+                "DELETE FROM merge_aggregates WHERE run = ? AND bot_name = ?", [(run, bot) for bot in bot_names])
+
+    def statuses(self, run: str) -> List[tuple]:
+        """(bot_name, query_index, failure_reason) for every result of a run"""
+        self.flush()
+        return self.conn.execute(
+            "SELECT bot_name, query_index, failure_reason FROM results WHERE run = ? "
+            "ORDER BY bot_name, query_index", (run,)).fetchall()
+
+    def keys(self, run: str) -> Set[Tuple[str, int]]:
+        """(bot_name, query_index) of every result of a run"""
+        self.flush()
+        return set(self.conn.execute("SELECT bot_name, query_index FROM results WHERE run = ?", (run,)).fetchall())
+
+    def count(self, run: str) -> int:
+        self.flush()
+        return self.conn.execute("SELECT COUNT(*) FROM results WHERE run = ?", (run,)).fetchone()[0]
+
+    def runs(self) -> Dict[str, int]:
+        """Result count per run"""
+        self.flush()
+        return dict(self.conn.execute("SELECT run, COUNT(*) FROM results GROUP BY run ORDER BY run").fetchall())
+
+    def delete(self, run: str, bot_names: Optional[List[str]] = None) -> int:
+        """Delete a run's results (only those of `bot_names` if given)"""
+        self.flush()
+        with self.conn:
+            if bot_names:
+                cursor = self.conn.executemany(
+                    "DELETE FROM results WHERE run = ? AND bot_name = ?", [(run, bot) for bot in bot_names])
+            else:
+                cursor = self.conn.execute("DELETE FROM results WHERE run = ?", (run,))
+        return cursor.rowcount
+
+    def import_directory(self, run: str, directory: Optional[str] = None) -> int:
+        """Load every <bot>_query_NNN.json of an individual/ tree into a run"""
+        directory = directory or individual_dir(run)
+        return self.import_files(run, sorted(glob.glob(f"{directory}/*.json")))
+
+    def import_files(self, run: str, filepaths: List[str]) -> int:
+        """Load result JSON files into a run, skipping any that aren't results"""
+        imported = 0
+        for filepath in filepaths:
+            try:
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    result = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"   ⚠ Skipping {filepath}: {e}")
+                continue
+            if not isinstance(result, dict) or not all(k in result for k in ('bot_name', 'query_index', 'user_query')):
+                print(f"   ⚠ Skipping {filepath}: not an evaluation result")
+                continue
+            self.put(run, result)
+            imported += 1
+        self.flush()
+        return imported
+
+    def export_run(self, run: str, directory: Optional[str] = None) -> int:
+        """Write a run back out as individual/<bot>_query_NNN.json files"""
+        directory = directory or individual_dir(run)
+        os.makedirs(directory, exist_ok=True)
+        exported = 0
+        for result in self.results(run):
+            filename = f"{directory}/{result['bot_name']}_query_{result['query_index']:03d}.json"
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2, ensure_ascii=False)
+            exported += 1
+        return exported
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+
+def result_file_key(filepath: str) -> Optional[Tuple[str, int]]:
+    """(bot_name, query_index) from a <bot>_query_NNN.json filename (None if it isn't one)"""
+    match = RESULT_FILENAME_PATTERN.match(os.path.basename(filepath))
+    return (match.group(1), int(match.group(2))) if match else None
+
+
+def ensure_imported(store: ResultsStore, run: str) -> int:
+    """
+    Import a run's individual/ files that the store doesn't have a result for,
+    so results saved outside the store (before it existed, or by an older
+    checkout) aren't re-evaluated. Results already in the store are kept.
+    """
+    filepaths = sorted(glob.glob(f"{individual_dir(run)}/*.json"))
+    if not filepaths:
+        return 0
+    stored = store.keys(run)
+    if stored:
+        missing = [filepath for filepath in filepaths
+                   if result_file_key(filepath) is not None and result_file_key(filepath) not in stored]
+    else:
+        missing = filepaths
+    if not missing:
+        return 0
+    imported = store.import_files(run, missing)
+    if imported:
+        print(f"   Imported {imported} result files from {individual_dir(run)}/ into {store.filepath}")
+    return imported
+
+
+def add_store_arguments(parser):
+    """Add --results-store to an argparse parser"""
+    parser.add_argument('--results-store', default=RESULTS_STORE_FILE,
+                        help=f'Results database (default: {RESULTS_STORE_FILE})')
+
+
+def store_flag(args) -> str:
+    """' --results-store <path>' for printed follow-up commands ('' for the default store)"""
+    return f" --results-store {args.results_store}" if args.results_store != RESULTS_STORE_FILE else ""
+
+
+def results_store_from_args(args) -> ResultsStore:
+    """Open the store configured by add_store_arguments"""
+    directory = os.path.dirname(args.results_store)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    return ResultsStore(args.results_store)
+
+
+def discover_result_dirs() -> List[str]:
+    """Every results directory (and archived run inside one) with an individual/ tree"""
+    candidates = glob.glob("evaluation_results*/individual") + glob.glob("evaluation_results*/*/individual")
+    return sorted(os.path.dirname(path).replace(os.sep, '/') for path in candidates)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import, export and list evaluation results in the results store")
+    add_store_arguments(parser)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    import_parser = subparsers.add_parser('import', help='Load individual/ JSON trees into the store')
+    import_parser.add_argument('runs', nargs='*', metavar='results_dir',
+                               help='Results directories to import (default: every evaluation_results*/ tree)')
+    export_parser = subparsers.add_parser('export', help='Write runs back out as individual/ JSON files')
+    export_parser.add_argument('runs', nargs='*', metavar='run',
+                               help='Runs to export (default: all)')
+    subparsers.add_parser('list', help='Show runs and result counts')
+    clear_parser = subparsers.add_parser('clear', help='Delete results so they are evaluated again')
+    clear_parser.add_argument('run', help='Run to clear (e.g. evaluation_results_no_gt)')
+    clear_parser.add_argument('--bot', action='append', dest='bot_names', metavar='BOT_NAME',
+                              help='Only clear this bot (repeatable)')
+    args = parser.parse_args()
+
+    store = results_store_from_args(args)
+    try:
+        if args.command == 'import':
+            runs = [run.rstrip('/') for run in args.runs] or discover_result_dirs()
+            if not runs:
+                print("No evaluation_results*/individual/ directories found")
+            for run in runs:
+                imported = store.import_directory(run)
+                print(f"✓ {run}: imported {imported} results")
+        elif args.command == 'export':
+            for run in args.runs or list(store.runs()):
+                exported = store.export_run(run)
+                print(f"✓ {run}: exported {exported} results to {individual_dir(run)}/")
+        elif args.command == 'clear':
+            deleted = store.delete(args.run, args.bot_names)
+            print(f"✓ {args.run}: deleted {deleted} results")
+            stored = store.keys(args.run)
+            leftover = [filepath for filepath in glob.glob(f"{individual_dir(args.run)}/*.json")
+                        if result_file_key(filepath) not in stored]
+            if leftover:
+                print(f"   ⚠ {individual_dir(args.run)}/ still has {len(leftover)} JSON files of cleared results; "
+                      f"delete them too or the next run imports them again")
+        else:
+            runs = store.runs()
+            if not runs:
+                print(f"{store.filepath} is empty")
+            for run, count in runs.items():
+                print(f"{run:50s} {count:6d} results")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+The rubric's scored dimensions
+
+Both evaluator rubrics (with and without ground truth) score the same eight
+dimensions. Kept in a module of its own so the judge helpers (judge_schema,
+judge_cascade, local_scorer) and the reports can import them without pulling
+in the evaluation engine, which itself builds on those helpers.
+"""
+
+DIMENSIONS = [
+    'warmth_validation', 'prose_vs_bullets', 'emoji_usage',
+    'conversational_tone', 'practical_advice', 'followup_question',
+    'support_solutions_balance', 'length_conciseness'
+]
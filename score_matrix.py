@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Dense bots × queries × scores matrix of a results run (requires NumPy)
+
+merge_results.py writes it to <results_dir>/score_matrix.npz and computes the
+summary statistics, rankings, biggest differentiator, bootstrap confidence
+intervals and paired tests between bots from it as vectorized operations. Scripts and notebooks can load scores without parsing JSON:
+
+    from score_matrix import ScoreMatrix
+    matrix = ScoreMatrix.load("evaluation_results_no_gt/score_matrix.npz")
+    matrix.scores[:, :, matrix.names.index('warmth_validation')]   # bots × queries
+
+Usage: python score_matrix.py [<score_matrix.npz>]   # print per-bot means
+"""
+
+import sys
+import warnings
+from collections import namedtuple
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+SCORE_MATRIX_FILENAME = "score_matrix.npz"
+
+# Same attributes as merge_results.RunningStats, so the report can use either
+ScoreSummary = namedtuple('ScoreSummary', ['count', 'mean', 'std', 'minimum', 'maximum'])
+
+# Paired per-query comparison of bot_a against bot_b on the queries both have results for
+# p_adjusted is Holm-Bonferroni adjusted over all pairs tested together
+PairedTest = namedtuple('PairedTest', ['bot_a', 'bot_b', 'common', 'mean_diff', 'lower', 'upper', 'p_value',
+                                       'p_adjusted'])
+
+DEFAULT_RESAMPLES = 2000
+DEFAULT_CONFIDENCE = 0.95
+
+
+def holm_adjust(p_values: np.ndarray) -> np.ndarray:
+    """Holm-Bonferroni adjusted p-values (reject where adjusted p < alpha)"""
+    m = len(p_values)
+    order = np.argsort(p_values)
+    scaled = np.minimum(1.0, np.maximum.accumulate((m - np.arange(m)) * p_values[order]))
+    adjusted = np.empty(m)
+    adjusted[order] = scaled
+    return adjusted
+
+
+class ScoreMatrix:
+    """
+    scores[b, q, s]: score `names[s]` of bot `bots[b]` on query `queries[q]`
+    mask[b, q]: whether that bot has a result for that query (scores are 0 where it doesn't)
+    A result without some score (bullet_count in compact mode) has NaN there,
+    and statistics of that score leave it out.
+    """
+
+    def __init__(self, bots: List[str], queries: np.ndarray, names: List[str],
+                 scores: np.ndarray, mask: np.ndarray):
+        self.bots = bots
+        self.queries = queries
+        self.names = names
+        self.scores = scores
+        self.mask = mask
+
+    @classmethod
+    def from_rows(cls, bot_rows: Dict[str, List[Sequence[float]]], names: List[str]) -> 'ScoreMatrix':
+        """Build from {bot: [[query_index, score for each name...], ...]} (None for a missing score)"""
+        bots = sorted(bot_rows)
+        queries = np.unique(np.array(
+            [row[0] for rows in bot_rows.values() for row in rows], dtype=np.int32))
+        scores = np.zeros((len(bots), len(queries), len(names)), dtype=np.float64)
+        mask = np.zeros((len(bots), len(queries)), dtype=bool)
+        for b, bot in enumerate(bots):
+            rows = np.asarray(bot_rows[bot], dtype=np.float64).reshape(-1, len(names) + 1)
+            q = np.searchsorted(queries, rows[:, 0].astype(np.int32))
+            scores[b, q] = rows[:, 1:]
+            mask[b, q] = True
+        return cls(bots, queries, list(names), scores, mask)
+
+    def save(self, filepath: str):
+        np.savez_compressed(filepath, bots=np.array(self.bots), queries=self.queries,
+                            names=np.array(self.names), scores=self.scores, mask=self.mask)
+
+    @classmethod
+    def load(cls, filepath: str) -> 'ScoreMatrix':
+        with np.load(filepath) as data:
+            return cls([str(b) for b in data['bots']], data['queries'], [str(n) for n in data['names']],
+                       data['scores'], data['mask'])
+
+    def counts(self) -> np.ndarray:
+        """Results per bot, shape (bots,)"""
+        return self.mask.sum(axis=1)
+
+    def present(self) -> np.ndarray:
+        """Whether each bot has each score for each query, shape (bots, queries, names)"""
+        return self.mask[:, :, None] & ~np.isnan(self.scores)
+
+    def score_counts(self) -> np.ndarray:
+        """Results per bot that have each score, shape (bots, names)"""
+        return self.present().sum(axis=1)
+
+    def means(self) -> np.ndarray:
+        """Mean of every score per bot over the queries it has that score for, shape (bots, names)"""
+        totals = np.where(self.present(), self.scores, 0).sum(axis=1, dtype=np.float64)
+        return totals / np.maximum(self.score_counts(), 1)
+
+    def stds(self) -> np.ndarray:
+        """Sample standard deviation per bot and score (0 with fewer than two values)"""
+        counts = self.score_counts()
+        deviations = np.where(self.present(), self.scores - self.means()[:, None, :], 0)
+        squares = (deviations.astype(np.float64) ** 2).sum(axis=1)
+        return np.sqrt(np.where(counts > 1, squares / np.maximum(counts - 1, 1), 0.0))
+
+    def summaries(self) -> Dict[str, Dict[str, ScoreSummary]]:
+        """{bot: {score name: ScoreSummary}} for the summary report"""
+        present = self.present()
+        counts = self.score_counts()
+        means = self.means()
+        stds = self.stds()
+        minimums = np.where(present, self.scores, np.inf).min(axis=1)
+        maximums = np.where(present, self.scores, -np.inf).max(axis=1)
+        return {
+            bot: {
+                name: ScoreSummary(int(counts[b, s]), float(means[b, s]), float(stds[b, s]),
+                                   float(minimums[b, s]), float(maximums[b, s]))
+                for s, name in enumerate(self.names)
+            }
+            for b, bot in enumerate(self.bots)
+        }
+
+    def ranking(self, name: str = 'overall_score') -> List[str]:
+        """Bots by mean `name`, best first (ties keep bot name order)"""
+        means = self.means()[:, self.names.index(name)]
+        return [self.bots[b] for b in np.argsort(-means, kind='stable')]
+
+    def biggest_differentiator(self, names: Sequence[str]) -> Tuple[str, float]:
+        """The score among `names` whose bot means span the widest range, and that range"""
+        columns = [self.names.index(name) for name in names]
+        spread = np.ptp(self.means()[:, columns], axis=0)
+        best = int(np.argmax(spread))
+        return names[best], float(spread[best])
+
+    def _bootstrap_weights(self, resamples: int, rng: np.random.Generator) -> np.ndarray:
+        """How often each query is drawn in each resample, shape (resamples, queries)"""
+        q = len(self.queries)
+        return rng.multinomial(q, np.full(q, 1.0 / q), size=resamples).astype(np.float64)
+
+    def bootstrap_intervals(self, resamples: int = DEFAULT_RESAMPLES, confidence: float = DEFAULT_CONFIDENCE,
+                            seed: int = 0) -> Dict[str, Dict[str, Tuple[float, float]]]:
+        """
+        Percentile bootstrap confidence intervals of every bot's mean scores
+        Queries are resampled with replacement, the same draws for every bot;
+        all resamples are computed in one matrix product.
+        Returns {bot: {score name: (lower, upper)}}.
+        """
+        rng = np.random.default_rng(seed)
+        weights = self._bootstrap_weights(resamples, rng)
+        bots, queries, names = self.scores.shape
+        present = self.present()
+        values = np.where(present, self.scores, 0).transpose(1, 0, 2).reshape(queries, -1)
+        totals = (weights @ values).reshape(resamples, bots, names)
+        counts = (weights @ present.transpose(1, 0, 2).reshape(queries, -1).astype(np.float64)).reshape(
+            resamples, bots, names)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(counts > 0, totals / counts, np.nan)
+        alpha = (1 - confidence) / 2
+        with warnings.catch_warnings():
+            # A bot with no values of a score (bullet_count in compact mode) gets a NaN interval
+            warnings.simplefilter('ignore', RuntimeWarning)
+            lower, upper = np.nanquantile(means, [alpha, 1 - alpha], axis=0)
+        return {
+            bot: {name: (float(lower[b, s]), float(upper[b, s])) for s, name in enumerate(self.names)}
+            for b, bot in enumerate(self.bots)
+        }
+
+    def paired_tests(self, pairs: Sequence[Tuple[str, str]], name: str = 'overall_score',
+                     resamples: int = DEFAULT_RESAMPLES, confidence: float = DEFAULT_CONFIDENCE,
+                     seed: int = 0) -> List[PairedTest]:
+        """
+        Compare bots pairwise on the per-query differences of `name`
+        The confidence interval of the mean difference is a paired bootstrap; the
+        two-sided p-value is a sign-flip permutation test (no difference between
+        the two bots means each difference is equally likely to have either sign).
+        All pairs and resamples are computed at once. p_adjusted applies the
+        Holm-Bonferroni correction across all the pairs, so comparing every
+        pair of bots doesn't produce false significant gaps by chance.
+        """
+        if not pairs:
+            return []
+        rng = np.random.default_rng(seed)
+        s = self.names.index(name)
+        a = [self.bots.index(bot_a) for bot_a, _ in pairs]
+        b = [self.bots.index(bot_b) for _, bot_b in pairs]
+        present = self.present()[:, :, s]
+        common = present[a] & present[b]                                         # pairs × queries
+        diffs = np.where(common, self.scores[a, :, s] - self.scores[b, :, s], 0)
+        n = common.sum(axis=1)
+        observed = diffs.sum(axis=1) / np.maximum(n, 1)
+
+        weights = self._bootstrap_weights(resamples, rng)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            boot = (weights @ diffs.T) / (weights @ common.T.astype(np.float64))   # resamples × pairs
+        alpha = (1 - confidence) / 2
+        lower, upper = np.nanquantile(boot, [alpha, 1 - alpha], axis=0)
+
+        signs = rng.choice(np.array([-1.0, 1.0]), size=(resamples, len(self.queries)))
+        null = (signs @ diffs.T) / np.maximum(n, 1)
+        extreme = (np.abs(null) >= np.abs(observed) - 1e-12).sum(axis=0)
+        p_values = np.where(n > 0, (extreme + 1) / (resamples + 1), 1.0)
+        p_adjusted = holm_adjust(p_values)
+
+        return [
+            PairedTest(bot_a, bot_b, int(n[i]), float(observed[i]), float(lower[i]), float(upper[i]),
+                       float(p_values[i]), float(p_adjusted[i]))
+            for i, (bot_a, bot_b) in enumerate(pairs)
+        ]
+
+
+def main():
+    filepath = sys.argv[1] if len(sys.argv) > 1 else f"evaluation_results_no_gt/{SCORE_MATRIX_FILENAME}"
+    matrix = ScoreMatrix.load(filepath)
+    print(f"{filepath}: {len(matrix.bots)} bots × {len(matrix.queries)} queries × {len(matrix.names)} scores, "
+          f"{int(matrix.mask.sum())} results")
+    means = matrix.means()
+    overall = matrix.names.index('overall_score')
+    for bot in matrix.ranking():
+        b = matrix.bots.index(bot)
+        print(f"  {bot:24s} {means[b, overall]:5.2f}  ({int(matrix.counts()[b])} responses)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Offline surrogate judge (requires NumPy)
+
+Learns to predict the LLM judge's scores from cheap text features of a
+response: local_scorer's structural counts, person and contraction rates,
+validation / advice / formal phrase counts, sentence length and hashed word
+frequencies (plus overlap with ActualClaude's answer for the ground-truth
+rubric). One ridge regression per score (overall and the 8 dimensions) is
+fitted on a run's stored results, and scores a response in about a
+millisecond. That makes it good for pre-screening prompt variants before
+spending judge calls (--surrogate in the evaluators), not for replacing the
+judge.
+
+Agreement is measured on held-out bots: each fold's model never saw any
+response from the bots it is scored on, as with a new prompt variant.
+
+Usage:
+  python surrogate_judge.py train [--no-gt]                 # fit, report agreement, save the model
+  python surrogate_judge.py evaluate [--no-gt]              # report agreement only
+  python surrogate_judge.py score <bot_name> ... [--no-gt]  # predict scores for response files
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from gather_responses import align_responses, get_output_file_path, is_error_response, load_prompts
+from jsonl_io import iter_jsonl_fields
+from local_scorer import WORD_PATTERN, extract_features
+from response_dataset import open_dataset
+from results_store import ResultsStore, add_store_arguments, ensure_imported, results_store_from_args
+from rubric import DIMENSIONS
+
+RUN_GT = "evaluation_results"
+RUN_NO_GT = "evaluation_results_no_gt"
+MODEL_FILENAME = "surrogate_model.json"
+GROUND_TRUTH_BOT = "ActualClaude"
+
+# Bump when features change; saved models of another version must be retrained
+SURROGATE_VERSION = 1
+
+TARGETS = ['overall_score'] + DIMENSIONS
+HASH_BUCKETS = 256
+RIDGE_ALPHAS = [1.0, 10.0, 100.0, 1000.0, 10000.0]
+CV_FOLDS = 5
+AGREEMENT_TOLERANCE = 1.0
+
+FIRST_PERSON = re.compile(r"\b(?:i|i'm|i'd|i've|i'll|me|my|myself)\b")
+SECOND_PERSON = re.compile(r"\b(?:you|you're|you'd|you've|you'll|your|yours|yourself)\b")
+CONTRACTION = re.compile(r"\b\w+'(?:t|s|re|ve|ll|d|m)\b")
+SENTENCE_END = re.compile(r"[.!?]+(?:\s|$)")
+VALIDATION_PHRASES = (
+    "that sounds", "sounds like", "makes sense", "totally", "it's okay", "it's ok", "i get it",
+    "i'm sorry", "so sorry", "understandable", "valid", "frustrating", "tough", "rough", "awful", "ugh"
+)
+ADVICE_PHRASES = ("try ", "maybe", "you could", "you might", "what if", "it might help", "consider")
+FORMAL_PHRASES = (
+    "additionally", "furthermore", "moreover", "however,", "it is important", "in conclusion",
+    "here are", "key points", "tips:", "remember,"
+)
+
+
+def text_features(response: str, ground_truth: Optional[str] = None) -> Dict[str, float]:
+    """Named numeric features of a response (and its ground truth, if given)"""
+    local = extract_features(response)
+    text = response.replace('’', "'").lower()
+    words = WORD_PATTERN.findall(text)
+    word_count = max(len(words), 1)
+    sentences = [s for s in SENTENCE_END.split(text) if s.strip()]
+    paragraphs = [p for p in re.split(r'\n\s*\n', text.strip()) if p.strip()]
+    opening = paragraphs[0] if paragraphs else ""
+
+    features = {
+        "log_words": math.log1p(local["word_count"]),
+        "log_paragraphs": math.log1p(local["paragraph_count"]),
+        "log_bullets": math.log1p(local["bullet_count"]),
+        "has_bullets": float(local["bullet_count"] > 0),
+        "log_headers": math.log1p(local["header_count"]),
+        "log_bold": math.log1p(local["bold_count"]),
+        "prose_fraction": local["prose_percentage"] / 100,
+        "emoji": min(local["emoji_count"], 5),
+        "no_emoji": float(local["emoji_count"] == 0),
+        "one_emoji": float(local["emoji_count"] == 1),
+        "questions": min(local["question_count"], 5),
+        "ends_with_question": float(local["ends_with_question"]),
+        "multiple_questions": float(local["question_count"] > 1),
+        "exclamations": min(text.count('!'), 5),
+        "first_person_rate": 100 * len(FIRST_PERSON.findall(text)) / word_count,
+        "second_person_rate": 100 * len(SECOND_PERSON.findall(text)) / word_count,
+        "contraction_rate": 100 * len(CONTRACTION.findall(text)) / word_count,
+        "validation_phrases": sum(text.count(phrase) for phrase in VALIDATION_PHRASES),
+        "validating_opening": float(any(phrase in opening for phrase in VALIDATION_PHRASES)),
+        "advice_phrases": sum(text.count(phrase) for phrase in ADVICE_PHRASES),
+        "formal_phrases": sum(text.count(phrase) for phrase in FORMAL_PHRASES),
+        "words_per_sentence": word_count / max(len(sentences), 1),
+    }
+    if ground_truth is not None:
+        truth_words = WORD_PATTERN.findall(ground_truth.replace('’', "'").lower())
+        shared = set(words) & set(truth_words)
+        union = set(words) | set(truth_words)
+        features["truth_overlap"] = len(shared) / len(union) if union else 0.0
+        features["truth_length_ratio"] = math.log((len(words) + 1) / (len(truth_words) + 1))
+        features["truth_bullet_diff"] = abs(local["bullet_count"] - extract_features(ground_truth)["bullet_count"])
+    return features
+
+
+def feature_vector(response: str, ground_truth: Optional[str] = None) -> List[float]:
+    """Named features followed by hashed word frequencies"""
+    named = list(text_features(response, ground_truth).values())
+    buckets = [0.0] * HASH_BUCKETS
+    words = WORD_PATTERN.findall(response.replace('’', "'").lower())
+    for word in words:
+        buckets[zlib.crc32(word.encode('utf-8')) % HASH_BUCKETS] += 1.0 / len(words)
+    return named + buckets
+
+
+def feature_names(uses_ground_truth: bool) -> List[str]:
+    sample = text_features("", "" if uses_ground_truth else None)
+    return list(sample) + [f"word_hash_{i}" for i in range(HASH_BUCKETS)]
+
+
+class SurrogateJudge:
+    """Standardized ridge regression from feature vectors to judge scores"""
+
+    def __init__(self, uses_ground_truth: bool, alpha: float, mean: np.ndarray, scale: np.ndarray,
+                 weights: np.ndarray, bias: np.ndarray, metrics: Optional[Dict[str, Any]] = None):
+        self.uses_ground_truth = uses_ground_truth
+        self.alpha = alpha
+        self.mean = mean
+        self.scale = scale
+        self.weights = weights    # features × targets
+        self.bias = bias          # targets
+        self.metrics = metrics or {}
+
+    @classmethod
+    def fit(cls, X: np.ndarray, Y: np.ndarray, alpha: float, uses_ground_truth: bool) -> 'SurrogateJudge':
+        mean = X.mean(axis=0)
+        scale = X.std(axis=0)
+        scale[scale == 0] = 1.0
+        Xs = (X - mean) / scale
+        bias = Y.mean(axis=0)
+        gram = Xs.T @ Xs + alpha * np.eye(X.shape[1])
+        weights = np.linalg.solve(gram, Xs.T @ (Y - bias))
+        return cls(uses_ground_truth, alpha, mean, scale, weights, bias)
+
+    def predict_matrix(self, X: np.ndarray) -> np.ndarray:
+        """Scores for each row of X, shape (rows, TARGETS), clipped to 0-10"""
+        return np.clip(((X - self.mean) / self.scale) @ self.weights + self.bias, 0, 10)
+
+    def predict(self, response: str, ground_truth: Optional[str] = None) -> Dict[str, float]:
+        row = self.predict_matrix(np.array([feature_vector(response, ground_truth)]))[0]
+        return {name: float(score) for name, score in zip(TARGETS, row)}
+
+    def save(self, filepath: str, run: str, trained_on: int):
+        model = {
+            "version": SURROGATE_VERSION,
+            "run": run,
+            "trained_on": trained_on,
+            "uses_ground_truth": self.uses_ground_truth,
+            "alpha": self.alpha,
+            "targets": TARGETS,
+            "features": feature_names(self.uses_ground_truth),
+            "mean": self.mean.tolist(),
+            "scale": self.scale.tolist(),
+            "weights": self.weights.tolist(),
+            "bias": self.bias.tolist(),
+            "metrics": self.metrics,
+        }
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(model, f)
+
+    @classmethod
+    def load(cls, filepath: str) -> 'SurrogateJudge':
+        with open(filepath, 'r', encoding='utf-8') as f:
+            model = json.load(f)
+        if model.get("version") != SURROGATE_VERSION or model.get("targets") != TARGETS:
+            raise ValueError(f"{filepath} was trained by another version; retrain it")
+        return cls(model["uses_ground_truth"], model["alpha"], np.array(model["mean"]),
+                   np.array(model["scale"]), np.array(model["weights"]), np.array(model["bias"]),
+                   model.get("metrics"))
+
+
+def load_responses(bot_name: str) -> Optional[List[Optional[Dict[str, Any]]]]:
+    """A bot's response to each prompt, matched by query (None where it has none); None if it has no file"""
+    dataset = open_dataset()
+    if dataset and dataset.has_bot(bot_name):
+        return align_responses(dataset.prompts(), dataset.iter_responses(bot_name))
+    path = get_output_file_path(bot_name)
+    if not os.path.exists(path):
+        return None
+    return align_responses(load_prompts(), iter_jsonl_fields(path, ('query', 'response')))
+
+
+def load_training_data(store: ResultsStore, run: str) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """(features, judge scores, bot of each row) for every successful result of a run"""
+    uses_ground_truth = run == RUN_GT
+    ground_truth = load_responses(GROUND_TRUTH_BOT) if uses_ground_truth else None
+    if uses_ground_truth and ground_truth is None:
+        raise FileNotFoundError(get_output_file_path(GROUND_TRUTH_BOT))
+
+    rows, targets, bots = [], [], []
+    for bot_name in sorted({bot for bot, _ in store.manifest(run)}):
+        responses = load_responses(bot_name)
+        if responses is None:
+            print(f"   ⚠ {get_output_file_path(bot_name)} not found, skipping {bot_name}")
+            continue
+        for result in store.results(run, bot_name):
+            evaluation = result['evaluation']
+            dimension_scores = evaluation.get('dimension_scores', {})
+            index = result['query_index'] - 1
+            if 'error' in evaluation or not evaluation.get('overall_score') or index >= len(responses):
+                continue
+            if any(not isinstance(dimension_scores.get(dim), (int, float)) for dim in DIMENSIONS):
+                continue
+            response = responses[index]
+            truth = ground_truth[index] if ground_truth and index < len(ground_truth) else None
+            if (response is None or is_error_response(response)
+                    or (uses_ground_truth and (truth is None or is_error_response(truth)))):
+                continue
+            rows.append(feature_vector(response['response'], truth['response'] if truth else None))
+            targets.append([float(evaluation['overall_score'])] + [float(dimension_scores[dim]) for dim in DIMENSIONS])
+            bots.append(bot_name)
+    return np.array(rows), np.array(targets), bots
+
+
+def bot_folds(bots: List[str], folds: int) -> np.ndarray:
+    """Fold number of each row; all of a bot's rows share a fold"""
+    names = sorted(set(bots))
+    fold_of = {bot: i % folds for i, bot in enumerate(names)}
+    return np.array([fold_of[bot] for bot in bots])
+
+
+def cross_validate(X: np.ndarray, Y: np.ndarray, bots: List[str], alpha: float,
+                   uses_ground_truth: bool, folds: int = CV_FOLDS) -> np.ndarray:
+    """Out-of-fold predictions for every row, holding out whole bots"""
+    fold = bot_folds(bots, min(folds, len(set(bots))))
+    predictions = np.zeros_like(Y)
+    for k in np.unique(fold):
+        held_out = fold == k
+        model = SurrogateJudge.fit(X[~held_out], Y[~held_out], alpha, uses_ground_truth)
+        predictions[held_out] = model.predict_matrix(X[held_out])
+    return predictions
+
+
+def rank_correlation(a: np.ndarray, b: np.ndarray) -> float:
+    """Spearman correlation (average ranks for ties)"""
+    def ranks(values):
+        order = np.argsort(values, kind='stable')
+        ranked = np.empty(len(values))
+        ranked[order] = np.arange(len(values))
+        for value in np.unique(values):
+            tied = values == value
+            ranked[tied] = ranked[tied].mean()
+        return ranked
+    if len(a) < 2:
+        return float('nan')
+    return float(np.corrcoef(ranks(a), ranks(b))[0, 1])
+
+
+def agreement_metrics(Y: np.ndarray, predictions: np.ndarray, bots: List[str]) -> Dict[str, Any]:
+    """Per-score and per-bot agreement between held-out predictions and the judge"""
+    metrics: Dict[str, Any] = {"scores": {}}
+    for t, name in enumerate(TARGETS):
+        errors = np.abs(predictions[:, t] - Y[:, t])
+        correlation = np.corrcoef(predictions[:, t], Y[:, t])[0, 1] if Y[:, t].std() > 0 else float('nan')
+        metrics["scores"][name] = {
+            "mae": float(errors.mean()),
+            "correlation": float(correlation),
+            "within_tolerance": float((errors <= AGREEMENT_TOLERANCE).mean()),
+        }
+    names = sorted(set(bots))
+    bot_array = np.array(bots)
+    judged = np.array([Y[bot_array == bot, 0].mean() for bot in names])
+    predicted = np.array([predictions[bot_array == bot, 0].mean() for bot in names])
+    metrics["bots"] = {bot: {"judge": float(j), "surrogate": float(p)} for bot, j, p in zip(names, judged, predicted)}
+    metrics["bot_rank_correlation"] = rank_correlation(judged, predicted)
+    metrics["bot_mean_mae"] = float(np.abs(judged - predicted).mean())
+    return metrics
+
+
+def print_agreement(metrics: Dict[str, Any]):
+    print(f"\nAgreement with the judge on held-out bots (|diff| <= {AGREEMENT_TOLERANCE} counts as agreeing):")
+    print(f"   {'Score':30s} {'MAE':>6s} {'Corr.':>6s} {'Agree':>6s}")
+    for name, score in metrics["scores"].items():
+        print(f"   {name:30s} {score['mae']:6.2f} {score['correlation']:6.2f} {score['within_tolerance']:6.0%}")
+    print(f"\n   {'Bot':24s} {'Judge':>6s} {'Surrogate':>10s}")
+    for bot, means in sorted(metrics["bots"].items(), key=lambda item: item[1]["judge"], reverse=True):
+        print(f"   {bot:24s} {means['judge']:6.2f} {means['surrogate']:10.2f}")
+    print(f"\n   Bot ranking (Spearman): {metrics['bot_rank_correlation']:.2f}, "
+          f"mean |diff| of bot averages: {metrics['bot_mean_mae']:.2f}")
+
+
+def train(store: ResultsStore, run: str, save: bool = True) -> int:
+    ensure_imported(store, run)
+    print(f"Loading results of run '{run}'...")
+    X, Y, bots = load_training_data(store, run)
+    if len(set(bots)) < 2:
+        print(f"Need results for at least 2 bots in run '{run}' to train and evaluate")
+        return 1
+    uses_ground_truth = run == RUN_GT
+    print(f"   {len(Y)} judged responses from {len(set(bots))} bots, {X.shape[1]} features")
+    if len(set(bots)) < CV_FOLDS:
+        print(f"   ⚠ Only {len(set(bots))} bots: held-out agreement (and the model) will be unreliable")
+
+    start = time.monotonic()
+    best_alpha, best_mae, best_predictions = None, math.inf, None
+    for alpha in RIDGE_ALPHAS:
+        predictions = cross_validate(X, Y, bots, alpha, uses_ground_truth)
+        mae = float(np.abs(predictions - Y).mean())
+        if mae < best_mae:
+            best_alpha, best_mae, best_predictions = alpha, mae, predictions
+    print(f"   Ridge alpha {best_alpha} (chosen by held-out MAE over {RIDGE_ALPHAS}), "
+          f"{time.monotonic() - start:.2f}s")
+
+    metrics = agreement_metrics(Y, best_predictions, bots)
+    print_agreement(metrics)
+
+    if save:
+        model = SurrogateJudge.fit(X, Y, best_alpha, uses_ground_truth)
+        model.metrics = {"overall_mae": metrics["scores"]["overall_score"]["mae"],
+                         "bot_rank_correlation": metrics["bot_rank_correlation"]}
+        filepath = f"{run}/{MODEL_FILENAME}"
+        model.save(filepath, run, len(Y))
+        print(f"\n✓ Surrogate model saved to: {filepath}")
+    return 0
+
+
+def prescreen(bot_names: List[str], run: str) -> int:
+    """Print surrogate scores for bots' response files; nothing is saved"""
+    filepath = f"{run}/{MODEL_FILENAME}"
+    if not os.path.exists(filepath):
+        print(f"Error: no surrogate model at {filepath}")
+        print(f"Train it first: python surrogate_judge.py train{' --no-gt' if run == RUN_NO_GT else ''}")
+        return 1
+    try:
+        model = SurrogateJudge.load(filepath)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    ground_truth = load_responses(GROUND_TRUTH_BOT) if model.uses_ground_truth else None
+    if model.uses_ground_truth and ground_truth is None:
+        print(f"Error: ground truth not found: {get_output_file_path(GROUND_TRUTH_BOT)}")
+        return 1
+
+    start = time.monotonic()
+    scored = 0
+    bot_scores: Dict[str, np.ndarray] = {}
+    for bot_name in bot_names:
+        responses = load_responses(bot_name)
+        if responses is None:
+            print(f"⚠ {get_output_file_path(bot_name)} not found, skipping {bot_name}")
+            continue
+        rows = []
+        for i, response in enumerate(responses):
+            truth = ground_truth[i] if ground_truth and i < len(ground_truth) else None
+            if (response is None or is_error_response(response)
+                    or (model.uses_ground_truth and (truth is None or is_error_response(truth)))):
+                continue
+            rows.append(feature_vector(response['response'], truth['response'] if truth else None))
+        if rows:
+            bot_scores[bot_name] = model.predict_matrix(np.array(rows))
+            scored += len(rows)
+    elapsed = time.monotonic() - start
+
+    if not bot_scores:
+        print("No responses to score")
+        return 1
+
+    print(f"\nSurrogate scores ({run} rubric, no judge calls), best first:")
+    short = [dim.split('_')[0][:8] for dim in DIMENSIONS]
+    print(f"   {'Bot':24s} {'N':>4s} {'Overall':>8s} " + " ".join(f"{name:>8s}" for name in short))
+    for bot_name, scores in sorted(bot_scores.items(), key=lambda item: item[1][:, 0].mean(), reverse=True):
+        means = scores.mean(axis=0)
+        print(f"   {bot_name:24s} {len(scores):4d} {means[0]:8.2f} " + " ".join(f"{m:8.2f}" for m in means[1:]))
+    print(f"\n   Scored {scored} responses in {elapsed * 1000:.0f} ms")
+    if model.metrics:
+        print(f"   Held-out agreement when trained: overall MAE {model.metrics['overall_mae']:.2f}, "
+              f"bot ranking Spearman {model.metrics['bot_rank_correlation']:.2f}")
+    print("   Pre-screening only: confirm promising variants with the LLM judge.")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline surrogate of the LLM judge")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for command, help_text in [('train', 'Fit on stored results, report agreement and save the model'),
+                               ('evaluate', 'Report held-out agreement without saving a model')]:
+        sub = subparsers.add_parser(command, help=help_text)
+        sub.add_argument('--no-gt', action='store_true', help=f'Use the no-ground-truth run ({RUN_NO_GT})')
+        add_store_arguments(sub)
+    score = subparsers.add_parser('score', help='Predict scores for bots\' response files')
+    score.add_argument('bot_names', nargs='+', metavar='bot_name')
+    score.add_argument('--no-gt', action='store_true', help=f'Use the model of the no-ground-truth run ({RUN_NO_GT})')
+    args = parser.parse_args()
+
+    run = RUN_NO_GT if args.no_gt else RUN_GT
+    if args.command == 'score':
+        sys.exit(prescreen(args.bot_names, run))
+    store = results_store_from_args(args)
+    try:
+        code = train(store, run, save=args.command == 'train')
+    finally:
+        store.close()
+    sys.exit(code)
+
+
+if __name__ == "__main__":
+    main()